@@ -20,6 +20,8 @@ from app.db.models import (
     alerts,
     incidents,
     propagation,
+    ingestion,
+    notifications,
 )
 
 config = context.config
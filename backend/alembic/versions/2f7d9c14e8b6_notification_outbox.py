@@ -0,0 +1,45 @@
+"""notification outbox
+
+Revision ID: 2f7d9c14e8b6
+Revises: 9b2e61d4a7c3
+Create Date: 2026-10-18 14:05:32.118406
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# === REQUIRED BY ALEMBIC ===
+revision = "2f7d9c14e8b6"
+down_revision = "9b2e61d4a7c3"
+branch_labels = None
+depends_on = None
+# ===========================
+
+
+def upgrade():
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.Text(), nullable=False),
+        sa.Column("recipient", sa.Text(), nullable=False),
+        sa.Column("subject", sa.Text(), nullable=False),
+        sa.Column("body_text", sa.Text(), nullable=False),
+        sa.Column("body_html", sa.Text(), nullable=True),
+        sa.Column("status", sa.Text(), server_default="PENDING", nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column("next_attempt_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column("sent_at", sa.TIMESTAMP(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_notification_outbox_due",
+        "notification_outbox",
+        ["status", "next_attempt_at"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_notification_outbox_due", table_name="notification_outbox")
+    op.drop_table("notification_outbox")
@@ -0,0 +1,66 @@
+"""add narrow signal_points value store
+
+Revision ID: 3de0243ac344
+Revises: 4cac3247ff0b
+Create Date: 2026-10-18 09:12:41.530114
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# === REQUIRED BY ALEMBIC ===
+revision = "3de0243ac344"
+down_revision = "4cac3247ff0b"
+branch_labels = None
+depends_on = None
+# ===========================
+
+
+def upgrade():
+    # 1️⃣ integer surrogate key on signals (filled for existing rows)
+    op.add_column(
+        "signals",
+        sa.Column("id", sa.Integer(), sa.Identity(), nullable=False),
+    )
+    op.create_unique_constraint("uq_signals_id", "signals", ["id"])
+
+    # 2️⃣ narrow value table: (signal_id, tick) -> value
+    op.create_table(
+        "signal_points",
+        sa.Column("signal_id", sa.Integer(), nullable=False),
+        sa.Column("tick", sa.Integer(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["signal_id"], ["signals.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("signal_id", "tick"),
+    )
+
+    # 3️⃣ timestamps are still read from timeseries_points -> index-only lookup
+    op.execute("""
+        CREATE INDEX ix_timeseries_points_component_tick
+        ON timeseries_points (component_code, tick)
+        INCLUDE (timestamp)
+    """)
+
+    # 4️⃣ backfill from existing payloads (last row wins on duplicate ticks)
+    op.execute("""
+        INSERT INTO signal_points (signal_id, tick, value)
+        SELECT DISTINCT ON (s.id, tp.tick)
+               s.id,
+               tp.tick,
+               CASE
+                   WHEN jsonb_typeof(tp.payload -> s.column_name) = 'number'
+                   THEN (tp.payload ->> s.column_name)::double precision
+               END
+        FROM signals s
+        JOIN timeseries_points tp
+          ON tp.component_code = s.component_code
+         AND tp.payload ? s.column_name
+        ORDER BY s.id, tp.tick, tp.id DESC
+    """)
+
+
+def downgrade():
+    op.drop_index("ix_timeseries_points_component_tick", table_name="timeseries_points")
+    op.drop_table("signal_points")
+    op.drop_constraint("uq_signals_id", "signals", type_="unique")
+    op.drop_column("signals", "id")
@@ -0,0 +1,151 @@
+"""range-partition timeseries_points and signal_points by tick
+
+Revision ID: 4c73a3ca44e4
+Revises: 3de0243ac344
+Create Date: 2026-10-18 10:02:17.204418
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+from app.core.config import settings
+
+# === REQUIRED BY ALEMBIC ===
+revision = "4c73a3ca44e4"
+down_revision = "3de0243ac344"
+branch_labels = None
+depends_on = None
+# ===========================
+
+
+# frozen copy of the naming used by app.services.partition_service
+def _partition_name(table, start):
+    return f"{table}_p{start:010d}" if start >= 0 else f"{table}_m{-start:010d}"
+
+
+def _create_range_partitions(table, span, premake):
+    bind = op.get_bind()
+    min_tick, max_tick = bind.execute(
+        text(f"SELECT min(tick), max(tick) FROM {table}_legacy")
+    ).one()
+
+    min_tick = 0 if min_tick is None else int(min_tick)
+    max_tick = 0 if max_tick is None else int(max_tick)
+
+    first = (min_tick // span) * span
+    last = (max_tick // span) * span + premake * span
+
+    for start in range(first, last + 1, span):
+        op.execute(
+            f'CREATE TABLE "{_partition_name(table, start)}" PARTITION OF {table} '
+            f"FOR VALUES FROM ({start}) TO ({start + span})"
+        )
+
+    # safety net: out-of-range ticks land here until the manager moves them
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def upgrade():
+    span = settings.PARTITION_TICK_SPAN
+    premake = settings.PARTITION_PREMAKE
+
+    # ---------------- timeseries_points ----------------
+    op.execute("ALTER TABLE timeseries_points RENAME TO timeseries_points_legacy")
+    op.execute("ALTER TABLE timeseries_points_legacy RENAME CONSTRAINT timeseries_points_pkey TO timeseries_points_legacy_pkey")
+    op.execute("DROP INDEX ix_timeseries_points_component_code")
+    op.execute("DROP INDEX ix_timeseries_points_tick")
+    op.execute("DROP INDEX ix_timeseries_points_component_tick")
+    op.execute("ALTER SEQUENCE timeseries_points_id_seq OWNED BY NONE")
+
+    op.execute("""
+        CREATE TABLE timeseries_points (
+            id BIGINT NOT NULL DEFAULT nextval('timeseries_points_id_seq'),
+            component_code TEXT NOT NULL,
+            tick INTEGER NOT NULL,
+            timestamp BIGINT NOT NULL,
+            payload JSONB NOT NULL,
+            CONSTRAINT timeseries_points_pkey PRIMARY KEY (id, tick)
+        ) PARTITION BY RANGE (tick)
+    """)
+    op.execute("ALTER SEQUENCE timeseries_points_id_seq OWNED BY timeseries_points.id")
+    op.execute("""
+        CREATE INDEX ix_timeseries_points_component_tick
+        ON timeseries_points (component_code, tick)
+        INCLUDE (timestamp)
+    """)
+    op.execute("CREATE INDEX ix_timeseries_points_tick ON timeseries_points (tick)")
+
+    _create_range_partitions("timeseries_points", span, premake)
+
+    op.execute("""
+        INSERT INTO timeseries_points (id, component_code, tick, timestamp, payload)
+        SELECT id, component_code, tick, timestamp, payload
+        FROM timeseries_points_legacy
+    """)
+    op.execute("DROP TABLE timeseries_points_legacy")
+
+    # ---------------- signal_points ----------------
+    op.execute("ALTER TABLE signal_points RENAME TO signal_points_legacy")
+    op.execute("ALTER TABLE signal_points_legacy RENAME CONSTRAINT signal_points_pkey TO signal_points_legacy_pkey")
+
+    op.execute("""
+        CREATE TABLE signal_points (
+            signal_id INTEGER NOT NULL REFERENCES signals (id) ON DELETE CASCADE,
+            tick INTEGER NOT NULL,
+            value DOUBLE PRECISION,
+            CONSTRAINT signal_points_pkey PRIMARY KEY (signal_id, tick)
+        ) PARTITION BY RANGE (tick)
+    """)
+
+    _create_range_partitions("signal_points", span, premake)
+
+    op.execute("INSERT INTO signal_points SELECT signal_id, tick, value FROM signal_points_legacy")
+    op.execute("DROP TABLE signal_points_legacy")
+
+
+def downgrade():
+    # ---------------- signal_points ----------------
+    op.execute("ALTER TABLE signal_points RENAME TO signal_points_partitioned")
+    op.execute("ALTER TABLE signal_points_partitioned RENAME CONSTRAINT signal_points_pkey TO signal_points_partitioned_pkey")
+    op.execute("""
+        CREATE TABLE signal_points (
+            signal_id INTEGER NOT NULL REFERENCES signals (id) ON DELETE CASCADE,
+            tick INTEGER NOT NULL,
+            value DOUBLE PRECISION,
+            CONSTRAINT signal_points_pkey PRIMARY KEY (signal_id, tick)
+        )
+    """)
+    op.execute("INSERT INTO signal_points SELECT signal_id, tick, value FROM signal_points_partitioned")
+    op.execute("DROP TABLE signal_points_partitioned CASCADE")
+
+    # ---------------- timeseries_points ----------------
+    op.execute("ALTER TABLE timeseries_points RENAME TO timeseries_points_partitioned")
+    op.execute("ALTER TABLE timeseries_points_partitioned RENAME CONSTRAINT timeseries_points_pkey TO timeseries_points_partitioned_pkey")
+    op.execute("DROP INDEX ix_timeseries_points_component_tick")
+    op.execute("DROP INDEX ix_timeseries_points_tick")
+    op.execute("ALTER SEQUENCE timeseries_points_id_seq OWNED BY NONE")
+    op.execute("""
+        CREATE TABLE timeseries_points (
+            id BIGINT NOT NULL DEFAULT nextval('timeseries_points_id_seq'),
+            component_code TEXT NOT NULL,
+            tick INTEGER NOT NULL,
+            timestamp BIGINT NOT NULL,
+            payload JSONB NOT NULL,
+            CONSTRAINT timeseries_points_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("ALTER SEQUENCE timeseries_points_id_seq OWNED BY timeseries_points.id")
+    op.execute("""
+        INSERT INTO timeseries_points (id, component_code, tick, timestamp, payload)
+        SELECT id, component_code, tick, timestamp, payload
+        FROM timeseries_points_partitioned
+    """)
+    op.execute("DROP TABLE timeseries_points_partitioned CASCADE")
+
+    op.execute("CREATE INDEX ix_timeseries_points_component_code ON timeseries_points (component_code)")
+    op.execute("CREATE INDEX ix_timeseries_points_tick ON timeseries_points (tick)")
+    op.execute("""
+        CREATE INDEX ix_timeseries_points_component_tick
+        ON timeseries_points (component_code, tick)
+        INCLUDE (timestamp)
+    """)
@@ -0,0 +1,37 @@
+"""signal baseline cache
+
+Revision ID: 6a1c3e5f9d20
+Revises: 2f7d9c14e8b6
+Create Date: 2026-10-18 15:12:47.905311
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# === REQUIRED BY ALEMBIC ===
+revision = "6a1c3e5f9d20"
+down_revision = "2f7d9c14e8b6"
+branch_labels = None
+depends_on = None
+# ===========================
+
+
+def upgrade():
+    op.create_table(
+        "signal_baselines",
+        sa.Column("signal_id", sa.Integer(), nullable=False),
+        sa.Column("window_size", sa.Integer(), nullable=False),
+        sa.Column("last_tick", sa.Integer(), nullable=False),
+        sa.Column("n", sa.Integer(), nullable=False),
+        sa.Column("mean", sa.Float(), nullable=True),
+        sa.Column("p95", sa.Float(), nullable=True),
+        sa.Column("max_value", sa.Float(), nullable=True),
+        sa.Column("stdev", sa.Float(), nullable=True),
+        sa.Column("computed_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["signal_id"], ["signals.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("signal_id", "window_size"),
+    )
+
+
+def downgrade():
+    op.drop_table("signal_baselines")
@@ -0,0 +1,42 @@
+"""component health snapshots
+
+Revision ID: 7e4b0a92c5d1
+Revises: 6a1c3e5f9d20
+Create Date: 2026-10-18 18:40:12.517204
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# === REQUIRED BY ALEMBIC ===
+revision = "7e4b0a92c5d1"
+down_revision = "6a1c3e5f9d20"
+branch_labels = None
+depends_on = None
+# ===========================
+
+
+def upgrade():
+    op.create_table(
+        "component_health_snapshots",
+        sa.Column("component_code", sa.Text(), nullable=False),
+        sa.Column("tick", sa.Integer(), nullable=False),
+        sa.Column("health", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("component_code", "tick"),
+    )
+
+    # history for the data already loaded
+    op.execute("""
+        INSERT INTO component_health_snapshots (component_code, tick, health)
+        SELECT s.component_code,
+               sp.tick,
+               COALESCE(GREATEST(0.0, 100.0 - avg(sp.value)), 100.0)
+        FROM signals s
+        JOIN signal_points sp ON sp.signal_id = s.id
+        WHERE s.signal_type = 'yi'
+        GROUP BY s.component_code, sp.tick
+    """)
+
+
+def downgrade():
+    op.drop_table("component_health_snapshots")
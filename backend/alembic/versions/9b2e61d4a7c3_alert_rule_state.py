@@ -0,0 +1,36 @@
+"""per-rule incremental alert evaluation state
+
+Revision ID: 9b2e61d4a7c3
+Revises: fc58869f0a8e
+Create Date: 2026-10-18 12:41:09.337215
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# === REQUIRED BY ALEMBIC ===
+revision = "9b2e61d4a7c3"
+down_revision = "fc58869f0a8e"
+branch_labels = None
+depends_on = None
+# ===========================
+
+
+def upgrade():
+    op.create_table(
+        "alert_rule_state",
+        sa.Column("rule_id", sa.Integer(), nullable=False),
+        sa.Column("origin", sa.Text(), nullable=False),
+        sa.Column("last_tick", sa.Integer(), nullable=True),
+        sa.Column("streak", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("streak_start_tick", sa.Integer(), nullable=True),
+        sa.Column("peak_value", sa.Float(), nullable=True),
+        sa.Column("open_event_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["rule_id"], ["alert_rules.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["open_event_id"], ["alert_events.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("rule_id", "origin"),
+    )
+
+
+def downgrade():
+    op.drop_table("alert_rule_state")
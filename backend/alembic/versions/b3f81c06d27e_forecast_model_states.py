@@ -0,0 +1,34 @@
+"""forecast model states
+
+Revision ID: b3f81c06d27e
+Revises: 7e4b0a92c5d1
+Create Date: 2026-10-18 20:05:31.640118
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# === REQUIRED BY ALEMBIC ===
+revision = "b3f81c06d27e"
+down_revision = "7e4b0a92c5d1"
+branch_labels = None
+depends_on = None
+# ===========================
+
+
+def upgrade():
+    op.create_table(
+        "forecast_model_states",
+        sa.Column("signal_id", sa.Integer(), nullable=False),
+        sa.Column("model", sa.Text(), nullable=False),
+        sa.Column("last_tick", sa.Integer(), nullable=False),
+        sa.Column("state", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["signal_id"], ["signals.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("signal_id", "model"),
+    )
+
+
+def downgrade():
+    op.drop_table("forecast_model_states")
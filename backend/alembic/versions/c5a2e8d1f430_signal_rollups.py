@@ -0,0 +1,71 @@
+"""signal rollup pyramid
+
+Revision ID: c5a2e8d1f430
+Revises: b3f81c06d27e
+Create Date: 2026-10-18 23:12:48.093561
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+# === REQUIRED BY ALEMBIC ===
+revision = "c5a2e8d1f430"
+down_revision = "b3f81c06d27e"
+branch_labels = None
+depends_on = None
+# ===========================
+
+
+# frozen copy of the level planning in app.services.rollup_service
+def _levels(resolutions):
+    levels = []
+    for r in sorted(set(int(r) for r in resolutions if int(r) > 1)):
+        child = None
+        for finer, _ in levels:
+            if r % finer == 0:
+                child = finer
+        levels.append((r, child))
+    return levels
+
+
+def upgrade():
+    op.create_table(
+        "signal_rollups",
+        sa.Column("signal_id", sa.Integer(), nullable=False),
+        sa.Column("resolution", sa.Integer(), nullable=False),
+        sa.Column("bucket", sa.Integer(), nullable=False),
+        sa.Column("n", sa.Integer(), nullable=False),
+        sa.Column("vmin", sa.Float(), nullable=True),
+        sa.Column("vmax", sa.Float(), nullable=True),
+        sa.Column("vsum", sa.Float(), nullable=False),
+        sa.Column("vsumsq", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["signal_id"], ["signals.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("signal_id", "resolution", "bucket"),
+    )
+
+    # pyramid for the data already loaded, finest level first
+    for r, child in _levels(settings.ROLLUP_RESOLUTIONS):
+        if child is None:
+            op.execute(f"""
+                INSERT INTO signal_rollups (signal_id, resolution, bucket, n, vmin, vmax, vsum, vsumsq)
+                SELECT signal_id, {r}, tick - mod(mod(tick, {r}) + {r}, {r}),
+                       count(value), min(value), max(value),
+                       COALESCE(sum(value), 0), COALESCE(sum(value * value), 0)
+                FROM signal_points
+                GROUP BY 1, 3
+            """)
+        else:
+            op.execute(f"""
+                INSERT INTO signal_rollups (signal_id, resolution, bucket, n, vmin, vmax, vsum, vsumsq)
+                SELECT signal_id, {r}, bucket - mod(mod(bucket, {r}) + {r}, {r}),
+                       sum(n), min(vmin), max(vmax), sum(vsum), sum(vsumsq)
+                FROM signal_rollups
+                WHERE resolution = {child}
+                GROUP BY 1, 3
+            """)
+
+
+def downgrade():
+    op.drop_table("signal_rollups")
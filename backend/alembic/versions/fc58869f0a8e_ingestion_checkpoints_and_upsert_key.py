@@ -0,0 +1,59 @@
+"""ingestion checkpoints + unique (component_code, tick)
+
+Revision ID: fc58869f0a8e
+Revises: 4c73a3ca44e4
+Create Date: 2026-10-18 11:20:54.018733
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# === REQUIRED BY ALEMBIC ===
+revision = "fc58869f0a8e"
+down_revision = "4c73a3ca44e4"
+branch_labels = None
+depends_on = None
+# ===========================
+
+
+def upgrade():
+    # 1️⃣ drop duplicate (component_code, tick) rows, newest row wins
+    op.execute("""
+        DELETE FROM timeseries_points a
+        USING timeseries_points b
+        WHERE a.component_code = b.component_code
+          AND a.tick = b.tick
+          AND a.id < b.id
+    """)
+
+    # 2️⃣ upsert key (includes the partition key, so allowed on the parent)
+    op.execute("DROP INDEX ix_timeseries_points_component_tick")
+    op.execute("""
+        CREATE UNIQUE INDEX uq_timeseries_points_component_tick
+        ON timeseries_points (component_code, tick)
+        INCLUDE (timestamp)
+    """)
+
+    # 3️⃣ per-component resume state
+    op.create_table(
+        "ingestion_checkpoints",
+        sa.Column("component_code", sa.Text(), nullable=False),
+        sa.Column("source_file", sa.Text(), nullable=False),
+        sa.Column("source_mtime", sa.BigInteger(), nullable=False),
+        sa.Column("last_tick", sa.Integer(), nullable=True),
+        sa.Column("rows_loaded", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("status", sa.Text(), server_default="RUNNING", nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("component_code"),
+    )
+
+
+def downgrade():
+    op.drop_table("ingestion_checkpoints")
+    op.execute("DROP INDEX uq_timeseries_points_component_tick")
+    op.execute("""
+        CREATE INDEX ix_timeseries_points_component_tick
+        ON timeseries_points (component_code, tick)
+        INCLUDE (timestamp)
+    """)
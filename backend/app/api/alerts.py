@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
 
 from app.db.models.incidents import IncidentAlert
 from app.db.session import get_db
@@ -8,7 +8,8 @@ from app.db.models.alerts import AlertRule, AlertEvent
 from app.db.models.signals import Signal
 
 from app.services.alerts_insight_service import alert_summary, alerts_by_component
-from app.services.alert_service import evaluate_alerts
+from app.services.alert_service import evaluate_alerts, reset_alert_state
+from app.services.alert_replay_service import replay_alerts
 
 
 router = APIRouter(prefix="/api/alerts", tags=["Alerts"])
@@ -50,12 +51,14 @@ def generate_all_rules(db: Session = Depends(get_db)):
 def evaluate(
     lookback_ticks: int = 200,
     simulation_mode: bool = False,
+    full_rescan: bool = False,
     db: Session = Depends(get_db),
 ):
     return evaluate_alerts(
         db=db,
         lookback_ticks=lookback_ticks,
         simulation_mode=simulation_mode,
+        full_rescan=full_rescan,
     )
 
 
@@ -64,6 +67,7 @@ def reset_and_evaluate(
     lookback_ticks: int = 200,
     db: Session = Depends(get_db),
 ):
+    reset_alert_state(db)
     db.query(IncidentAlert).delete()
     db.query(AlertEvent).delete()
     db.commit()
@@ -75,6 +79,19 @@ def reset_and_evaluate(
     )
 
 
+@router.post("/replay")
+def replay(
+    from_tick: int,
+    to_tick: Optional[int] = None,
+    rule_ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_db),
+):
+    try:
+        return replay_alerts(db, from_tick=from_tick, to_tick=to_tick, rule_ids=rule_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # ------------------------------------------------------------------
 # EVENTS & INSIGHTS
 # ------------------------------------------------------------------
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
@@ -10,6 +10,7 @@ from app.services.analytics_service import (
     compute_volatility,
     detect_degradation,
     component_health,
+    components_health,
     global_health,
 
     # NEW
@@ -27,10 +28,13 @@ from app.services.analytics_service import (
 )
 
 from app.services.analytics_service import component_regimes
-from app.services.analytics_service import signal_influence
+from app.services.analytics_service import signal_influence, influence_matrix
 from app.services.analytics_service import signal_envelope 
 from app.services.analytics_service import component_stress_curve
 from app.services.analytics_service import signal_change_impact
+from app.services.health_snapshot_service import component_health_history
+from app.services.forecast_service import forecast_breaches
+from app.services.forecast_models import list_models
 
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
@@ -60,6 +64,28 @@ def component_health_api(component_code: str, db: Session = Depends(get_db)):
     }
 
 
+@router.get("/component-health")
+def components_health_api(db: Session = Depends(get_db)):
+    return [
+        {"component_code": code, "health_score": health}
+        for code, health in sorted(components_health(db).items())
+    ]
+
+
+@router.get("/component-health/{component_code}/history")
+def component_health_history_api(
+    component_code: str,
+    from_tick: Optional[int] = None,
+    to_tick: Optional[int] = None,
+    limit: Optional[int] = 1440,
+    db: Session = Depends(get_db),
+):
+    return {
+        "component_code": component_code,
+        "points": component_health_history(db, component_code, from_tick, to_tick, limit),
+    }
+
+
 @router.get("/global-health")
 def global_health_api(db: Session = Depends(get_db)):
     return global_health(db)
@@ -130,30 +156,58 @@ def component_time_analysis_api(
     return component_time_analysis(db, component_code, max_ticks)
 
 
+@router.get("/forecast/models")
+def forecast_models_api():
+    return list_models()
+
+
 @router.get("/forecast/signal")
 def forecast_signal_api(
     signal_code: str,
-    horizon_ticks: int = 30,
+    horizon_ticks: int = Query(30, ge=1),
+    model: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    return forecast_signal(
-        db,
-        signal_code=signal_code,
-        horizon_ticks=horizon_ticks,
-    )
+    try:
+        return forecast_signal(
+            db,
+            signal_code=signal_code,
+            horizon_ticks=horizon_ticks,
+            model=model,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/forecast/component/{component_code}")
 def forecast_component_api(
     component_code: str,
-    horizon_ticks: int = 30,
+    horizon_ticks: int = Query(30, ge=1),
+    model: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    return forecast_component(
-        db,
-        component_code=component_code,
-        horizon_ticks=horizon_ticks,
-    )
+    try:
+        return forecast_component(
+            db,
+            component_code=component_code,
+            horizon_ticks=horizon_ticks,
+            model=model,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/forecast/breaches")
+def forecast_breaches_api(
+    horizon_ticks: int = Query(30, ge=1),
+    limit: int = 50,
+    model: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    try:
+        return forecast_breaches(db, horizon_ticks=horizon_ticks, limit=limit, model=model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/component-regimes/{component_code}")
@@ -171,6 +225,27 @@ def component_regimes_api(
     )
 
 
+@router.get("/signal-influence")
+def signal_influence_api(
+    signal_code: str,
+    window: int = 500,
+    lag_window: int = 20,
+    db: Session = Depends(get_db),
+):
+    return signal_influence(db, signal_code, window, lag_window)
+
+
+@router.get("/influence-matrix")
+def influence_matrix_api(
+    window: int = 500,
+    lag_window: int = 20,
+    min_occurrences: int = 3,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+):
+    return influence_matrix(db, window, lag_window, min_occurrences, limit)
+
+
 @router.get("/signal-envelope")
 def signal_envelope_api(
     signal_code: str,
@@ -0,0 +1,129 @@
+# app/api/columnar.py
+"""
+Columnar response bodies for the timeseries endpoints.
+
+JSON stays the default. A client opts in with the Accept header (or the
+`format` query parameter, handy from notebooks):
+
+  application/vnd.apache.arrow.stream   (format=arrow, needs pyarrow:
+                                         pip install .[arrow])
+      Arrow IPC stream: one record batch per signal with columns
+      signal_code (dictionary), tick int64, timestamp int64 (null when
+      unknown), value float64 (null when NULL).
+
+  application/vnd.platformops.columns   (format=raw)
+      [uint32 LE header length][JSON header][8-byte aligned buffers]
+      The header lists every series and, per column, its dtype ("<i8" /
+      "<f8"), byte offset (from the start of the buffer section) and
+      length. value NaN = NULL, timestamp -1 = unknown.
+      NumPy: np.frombuffer(body, dtype, count, offset=start + offset).
+"""
+import json
+import struct
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+RAW_COLUMNS = "application/vnd.platformops.columns"
+
+FORMATS = {"json": None, "arrow": ARROW_STREAM, "raw": RAW_COLUMNS}
+
+COLUMN_DTYPES = {"tick": "<i8", "timestamp": "<i8", "value": "<f8"}
+
+
+def negotiate_format(request: Request, format: Optional[str] = None) -> str:
+    """
+    "json" | "arrow" | "raw": explicit ?format= first, then Accept.
+    """
+    if format is not None:
+        if format not in FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unknown format '{format}' (expected one of {sorted(FORMATS)})")
+        return format
+
+    accept = request.headers.get("accept", "")
+    if ARROW_STREAM in accept:
+        return "arrow"
+    if RAW_COLUMNS in accept:
+        return "raw"
+    return "json"
+
+
+def points_to_columns(points: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    [{tick, timestamp, value}] -> columns (for endpoints that build dicts).
+    """
+    n = len(points)
+    return {
+        "tick": np.fromiter((p["tick"] for p in points), dtype=np.int64, count=n),
+        "timestamp": np.fromiter(
+            (-1 if p["timestamp"] is None else p["timestamp"] for p in points), dtype=np.int64, count=n
+        ),
+        "value": np.fromiter(
+            (np.nan if p["value"] is None else p["value"] for p in points), dtype=np.float64, count=n
+        ),
+    }
+
+
+# ---------- RAW BUFFERS ----------
+def _raw_body(series: Dict[str, Dict[str, np.ndarray]], errors: Dict[str, str]) -> bytes:
+    header: Dict[str, Any] = {"format": "platformops.columns/1", "series": [], "errors": errors}
+    buffers: List[memoryview] = []
+    offset = 0
+
+    for code, columns in series.items():
+        entry = {"signal_code": code, "length": int(len(columns["tick"])), "columns": []}
+        for name, dtype in COLUMN_DTYPES.items():
+            arr = np.ascontiguousarray(columns[name], dtype=dtype)
+            entry["columns"].append({"name": name, "dtype": dtype, "offset": offset, "nbytes": arr.nbytes})
+            buffers.append(memoryview(arr).cast("B"))
+            offset += arr.nbytes   # itemsize 8: every buffer stays 8-byte aligned
+        header["series"].append(entry)
+
+    head = json.dumps(header).encode()
+    head += b" " * (-(4 + len(head)) % 8)
+    return b"".join([struct.pack("<I", len(head)), head, *buffers])
+
+
+# ---------- ARROW ----------
+def _arrow_body(series: Dict[str, Dict[str, np.ndarray]]) -> bytes:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=406, detail="Arrow responses need pyarrow on the server (pip install .[arrow]); use format=raw")
+
+    schema = pa.schema([
+        ("signal_code", pa.dictionary(pa.int32(), pa.string())),
+        ("tick", pa.int64()),
+        ("timestamp", pa.int64()),
+        ("value", pa.float64()),
+    ])
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for code, columns in series.items():
+            n = len(columns["tick"])
+            writer.write_batch(pa.record_batch(
+                [
+                    pa.DictionaryArray.from_arrays(pa.array(np.zeros(n, dtype=np.int32)), pa.array([code])),
+                    pa.array(columns["tick"]),
+                    pa.array(columns["timestamp"], mask=columns["timestamp"] < 0),
+                    pa.array(columns["value"], mask=np.isnan(columns["value"])),
+                ],
+                schema=schema,
+            ))
+    return sink.getvalue().to_pybytes()
+
+
+def columnar_response(
+    series: Dict[str, Dict[str, np.ndarray]],
+    fmt: str,
+    errors: Optional[Dict[str, str]] = None,
+) -> Response:
+    if fmt == "arrow":
+        # per-signal failures (e.g. unknown codes in /multi) travel in a header
+        headers = {"X-Series-Errors": json.dumps(errors)} if errors else None
+        return Response(content=_arrow_body(series), media_type=ARROW_STREAM, headers=headers)
+    return Response(content=_raw_body(series, errors or {}), media_type=RAW_COLUMNS)
@@ -0,0 +1,56 @@
+# app/api/ingest.py
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.ingestion.live_writer import IngestQueueFull, live_writer, parse_tick_batch
+
+
+router = APIRouter(prefix="/api/ingest", tags=["Ingestion"])
+
+
+@router.post("/ticks", status_code=202)
+async def ingest_ticks(request: Request):
+    """
+    Accepts NDJSON row records or columnar JSON for any number of components.
+    Returns as soon as the batch is queued; the background writer persists it.
+    """
+    body = await request.body()
+
+    try:
+        # pandas parsing is CPU-bound: keep it off the event loop
+        frames = await run_in_threadpool(parse_tick_batch, body, request.headers.get("content-type"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        ticks = live_writer.submit(frames)
+    except IngestQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Ingestion queue full, retry later",
+            headers={"Retry-After": "1"},
+        )
+
+    return {
+        "accepted_ticks": ticks,
+        "components": sorted(frames),
+        "queue_depth": live_writer.queue.qsize(),
+        "queue_capacity": live_writer.queue.maxsize,
+    }
+
+
+@router.get("/stats")
+def ingest_stats():
+    return live_writer.snapshot()
+
+
+@router.post("/dead-letters/requeue")
+def requeue_dead_letters():
+    """
+    Retry the batches the writer gave up on (after the database recovered).
+    """
+    requeued = live_writer.requeue_dead_letters()
+    return {
+        "requeued_batches": requeued,
+        "dead_letter_batches": len(live_writer.dead_letters),
+    }
@@ -12,6 +12,7 @@ def propagation(
     source_signal: str,
     target_signal: str,
     window: int = 30,
+    include_curve: bool = False,
     db: Session = Depends(get_db),
 ):
     try:
@@ -20,6 +21,7 @@ def propagation(
             source_signal=source_signal,
             target_signal=target_signal,
             window=window,
+            include_curve=include_curve,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -5,8 +5,22 @@ from sqlalchemy import func
 from app.db.session import get_db
 from app.db.models.signals import Signal
 from app.db.models.alerts import AlertEvent
-from app.services.analytics_service import component_health
+from app.services.analytics_service import (
+    component_alert_counts,
+    component_health,
+    components_health,
+)
 from app.services.email_service import send_email
+from app.services.notification_dispatcher import (
+    dispatch_due,
+    notification_dispatcher,
+    outbox_stats,
+)
+from app.services.partition_service import (
+    PARTITIONED_TABLES,
+    list_partitions,
+    maintain_partitions,
+)
 
 
 router = APIRouter(prefix="/api/system", tags=["System"])
@@ -21,15 +35,12 @@ def system_overview(db: Session = Depends(get_db)):
     )
 
     result = []
+    healths = components_health(db, [c for (c,) in components])
+    counts = component_alert_counts(db)
 
     for (component_code,) in components:
-        health = component_health(db, component_code)
-
-        active_alerts = (
-            db.query(AlertEvent)
-            .filter(AlertEvent.component_code == component_code)
-            .count()
-        )
+        health = healths[component_code]
+        active_alerts = counts.get(component_code, {}).get("total", 0)
 
         result.append({
             "component_code": component_code,
@@ -92,6 +103,32 @@ def component_details(component_code: str, db: Session = Depends(get_db)):
 
 
 
+@router.get("/partitions")
+def partitions(db: Session = Depends(get_db)):
+    return {
+        table: list_partitions(db, table)
+        for table in PARTITIONED_TABLES
+    }
+
+
+@router.post("/partitions/maintain")
+def partitions_maintain(db: Session = Depends(get_db)):
+    return maintain_partitions(db)
+
+
+@router.get("/notifications")
+def notifications(db: Session = Depends(get_db)):
+    return {
+        "outbox": outbox_stats(db),
+        "dispatcher": notification_dispatcher.snapshot(),
+    }
+
+
+@router.post("/notifications/dispatch")
+def notifications_dispatch(db: Session = Depends(get_db)):
+    return dispatch_due(db)
+
+
 @router.post("/test-email")
 def test_email():
     send_email(
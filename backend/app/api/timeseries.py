@@ -1,17 +1,23 @@
 from typing import Optional, List
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.api.columnar import columnar_response, negotiate_format, points_to_columns
 from app.db.session import get_db
+from app.services.export_service import EXPORT_FORMATS, export_stream, resolve_export_signals
 from app.services.timeseries_service import (
     get_timeseries,
+    timeseries_columns,
     compute_volatility,
     detect_degradation,
     component_health,
     global_health,
     multi_signal,
+    multi_signal_columns,
     aggregate_signal,
+    rollup_timeseries,
     derivative_signal,
     normalize_signal,
 )
@@ -19,17 +25,56 @@ from app.services.timeseries_service import (
 router = APIRouter(prefix="/api/timeseries", tags=["Timeseries"])
 
 
+# ---------------------------------------------------------
+# STREAMING EXPORT (declared before /{signal_code})
+# ---------------------------------------------------------
+@router.get("/export")
+def export_timeseries(
+    signal_codes: Optional[List[str]] = Query(None),
+    component_codes: Optional[List[str]] = Query(None),
+    from_tick: Optional[int] = Query(None),
+    to_tick: Optional[int] = Query(None),
+    format: str = Query("ndjson", description="ndjson | csv"),
+    chunk_size: Optional[int] = Query(None, ge=100, le=100000),
+    db: Session = Depends(get_db),
+):
+    try:
+        signals = resolve_export_signals(db, signal_codes, component_codes)
+        body = export_stream(signals, format, from_tick, to_tick, chunk_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    extension = "csv" if format == "csv" else "ndjson"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="timeseries-export.{extension}"'},
+    )
+
+
 # ---------------------------------------------------------
 # SINGLE SIGNAL
 # ---------------------------------------------------------
 @router.get("/{signal_code}")
 def fetch_timeseries(
+    request: Request,
     signal_code: str,
     from_tick: Optional[int] = Query(None),
     to_tick: Optional[int] = Query(None),
+    max_points: Optional[int] = Query(None, ge=4),
+    downsample: str = Query("lttb"),
+    format: Optional[str] = Query(None, description="json | arrow | raw (default: Accept header)"),
     db: Session = Depends(get_db),
 ):
-    return get_timeseries(db, signal_code, from_tick, to_tick)
+    fmt = negotiate_format(request, format)
+    try:
+        if fmt == "json":
+            return get_timeseries(db, signal_code, from_tick, to_tick, max_points, downsample)
+        columns = timeseries_columns(db, signal_code, from_tick, to_tick, max_points, downsample)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return columnar_response({signal_code: columns}, fmt)
 
 
 # ---------------------------------------------------------
@@ -37,10 +82,27 @@ def fetch_timeseries(
 # ---------------------------------------------------------
 @router.post("/multi")
 def multi_fetch(
+    request: Request,
     signal_codes: List[str],
+    from_tick: Optional[int] = Query(None),
+    to_tick: Optional[int] = Query(None),
+    max_points: Optional[int] = Query(None, ge=4),
+    downsample: str = Query("lttb"),
+    align: bool = Query(False, description="One shared tick axis for all signals"),
+    format: Optional[str] = Query(None, description="json | arrow | raw (default: Accept header)"),
     db: Session = Depends(get_db),
 ):
-    return multi_signal(db, signal_codes)
+    fmt = negotiate_format(request, format)
+    try:
+        if fmt == "json":
+            return multi_signal(db, signal_codes, max_points, downsample, from_tick, to_tick, align)
+        series, errors = multi_signal_columns(
+            db, signal_codes, from_tick, to_tick, max_points, downsample, align
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return columnar_response(series, fmt, errors)
 
 
 # ---------------------------------------------------------
@@ -93,17 +155,46 @@ def global_health_endpoint(db: Session = Depends(get_db)):
     return global_health(db)
 
 
+# ---------------------------------------------------------
+# ROLLUP PYRAMID (zoomable charts)
+# ---------------------------------------------------------
+@router.get("/rollup/{signal_code}")
+def rollup(
+    signal_code: str,
+    from_tick: Optional[int] = Query(None),
+    to_tick: Optional[int] = Query(None),
+    max_points: int = Query(500, ge=10, le=10000),
+    db: Session = Depends(get_db),
+):
+    try:
+        return rollup_timeseries(db, signal_code, from_tick, to_tick, max_points)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # ---------------------------------------------------------
 # AGGREGATIONS
 # ---------------------------------------------------------
 @router.get("/aggregate/{signal_code}")
 def aggregate(
+    request: Request,
     signal_code: str,
     window: int = 10,
     agg_type: str = "avg",
+    max_points: Optional[int] = Query(None, ge=4),
+    downsample: str = Query("lttb"),
+    format: Optional[str] = Query(None, description="json | arrow | raw (default: Accept header)"),
     db: Session = Depends(get_db),
 ):
-    return aggregate_signal(db, signal_code, window, agg_type)
+    fmt = negotiate_format(request, format)
+    try:
+        points = aggregate_signal(db, signal_code, window, agg_type, max_points, downsample)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if fmt == "json":
+        return points
+    return columnar_response({signal_code: points_to_columns(points)}, fmt)
 
 
 # ---------------------------------------------------------
@@ -111,10 +202,22 @@ def aggregate(
 # ---------------------------------------------------------
 @router.get("/derivative/{signal_code}")
 def derivative(
+    request: Request,
     signal_code: str,
+    max_points: Optional[int] = Query(None, ge=4),
+    downsample: str = Query("lttb"),
+    format: Optional[str] = Query(None, description="json | arrow | raw (default: Accept header)"),
     db: Session = Depends(get_db),
 ):
-    return derivative_signal(db, signal_code)
+    fmt = negotiate_format(request, format)
+    try:
+        points = derivative_signal(db, signal_code, max_points, downsample)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if fmt == "json":
+        return points
+    return columnar_response({signal_code: points_to_columns(points)}, fmt)
 
 
 # ---------------------------------------------------------
@@ -122,7 +225,19 @@ def derivative(
 # ---------------------------------------------------------
 @router.get("/normalize/{signal_code}")
 def normalize(
+    request: Request,
     signal_code: str,
+    max_points: Optional[int] = Query(None, ge=4),
+    downsample: str = Query("lttb"),
+    format: Optional[str] = Query(None, description="json | arrow | raw (default: Accept header)"),
     db: Session = Depends(get_db),
 ):
-    return normalize_signal(db, signal_code)
+    fmt = negotiate_format(request, format)
+    try:
+        points = normalize_signal(db, signal_code, max_points, downsample)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if fmt == "json":
+        return points
+    return columnar_response({signal_code: points_to_columns(points)}, fmt)
@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -28,6 +28,34 @@ class Settings(BaseSettings):
     SMTP_USERNAME: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
     SMTP_FROM_EMAIL: str = "platformops@local.test"
+    SMTP_TIMEOUT: int = 10
+
+    # Notification outbox dispatcher
+    NOTIFY_DISPATCHER_ENABLED: bool = True
+    NOTIFY_POLL_SECONDS: int = 5        # also the burst coalescing window
+    NOTIFY_BATCH_SIZE: int = 100
+    NOTIFY_MAX_ATTEMPTS: int = 6
+    NOTIFY_BACKOFF_SECONDS: int = 30    # doubled after every failed attempt
+
+    # Tick range partitioning (timeseries_points / signal_points)
+    PARTITION_TICK_SPAN: int = 10000
+    PARTITION_PREMAKE: int = 2                      # future partitions kept ahead
+    PARTITION_RETENTION_TICKS: Optional[int] = None  # None = keep everything
+    PARTITION_RETENTION_MODE: str = "detach"         # detach | drop
+    PARTITION_BY_COMPONENT: bool = False             # LIST sub-partitions per component
+
+    # Live tick ingestion (POST /api/ingest/ticks)
+    LIVE_INGEST_QUEUE_BATCHES: int = 1000   # queued request batches before 503
+    LIVE_INGEST_MAX_DRAIN: int = 200        # batches merged into one COPY transaction
+    LIVE_INGEST_MAX_ATTEMPTS: int = 3       # tries per drain before batches are isolated
+    LIVE_INGEST_RETRY_SECONDS: float = 0.5  # doubled after every failed attempt
+    LIVE_INGEST_DEAD_LETTERS: int = 100     # failed batches kept for requeue
+
+    # Streaming export (GET /api/timeseries/export)
+    EXPORT_CHUNK_SIZE: int = 5000           # rows per server-side cursor fetch / response chunk
+
+    # Rollup pyramid (signal_rollups); changing it needs a rebuild_signal_rollups()
+    ROLLUP_RESOLUTIONS: List[int] = [10, 60, 600]   # bucket sizes in ticks, finest first
 
     model_config = SettingsConfigDict(
         env_file=".env",
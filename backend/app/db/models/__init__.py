@@ -1,6 +1,8 @@
-from .timeseries import TimeSeriesPoint
-from .signals import Signal
+from .timeseries import TimeSeriesPoint, SignalPoint
+from .signals import Signal, SignalBaseline
 from .users import User, Role, UserRole
-from .alerts import AlertRule, AlertEvent
+from .alerts import AlertRule, AlertEvent, AlertRuleState
 from .incidents import Incident, IncidentAlert
 from .propagation import SignalDependency, PropagationEvidence
+from .ingestion import IngestionCheckpoint
+from .notifications import NotificationOutbox
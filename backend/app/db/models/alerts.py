@@ -31,3 +31,21 @@ class AlertEvent(Base):
 
     # 🔥 NEW
     origin = Column(Text, default="REAL")   # REAL | SIMULATED
+
+
+class AlertRuleState(Base):
+    """
+    Incremental evaluation state of one rule (per origin):
+    everything up to last_tick has already been folded in.
+    """
+    __tablename__ = "alert_rule_state"
+
+    rule_id = Column(Integer, ForeignKey("alert_rules.id", ondelete="CASCADE"), primary_key=True)
+    origin = Column(Text, primary_key=True)             # REAL | SIMULATED
+
+    last_tick = Column(Integer)                         # watermark
+    streak = Column(Integer, nullable=False, default=0)
+    streak_start_tick = Column(Integer)
+    peak_value = Column(Float)                          # running peak of the current streak
+
+    open_event_id = Column(Integer, ForeignKey("alert_events.id", ondelete="SET NULL"))
@@ -0,0 +1,24 @@
+# app/db/models/ingestion.py
+from sqlalchemy import Column, Integer, BigInteger, Text, TIMESTAMP
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class IngestionCheckpoint(Base):
+    """
+    One row per component: how far the last CSV load got.
+    last_tick is only advanced in the same transaction as the rows it covers.
+    """
+    __tablename__ = "ingestion_checkpoints"
+
+    component_code = Column(Text, primary_key=True)
+    source_file = Column(Text, nullable=False)
+    source_mtime = Column(BigInteger, nullable=False)   # ns, detects a replaced file
+
+    last_tick = Column(Integer)
+    rows_loaded = Column(BigInteger, nullable=False, default=0)
+
+    status = Column(Text, nullable=False, default="RUNNING")   # RUNNING | DONE | FAILED
+    error = Column(Text)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -0,0 +1,32 @@
+# app/db/models/notifications.py
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, Index
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class NotificationOutbox(Base):
+    """
+    Emails are written here in the same transaction as the alerts/incidents
+    they describe; app.services.notification_dispatcher delivers them.
+    """
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index("ix_notification_outbox_due", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    kind = Column(Text, nullable=False)          # alert_summary | incident_report | ...
+    recipient = Column(Text, nullable=False)
+    subject = Column(Text, nullable=False)
+    body_text = Column(Text, nullable=False)
+    body_html = Column(Text)
+
+    status = Column(Text, nullable=False, default="PENDING")   # PENDING | SENT | FAILED
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    next_attempt_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    sent_at = Column(TIMESTAMP)
@@ -1,11 +1,17 @@
 # app/db/models/signals.py
-from sqlalchemy import Column, Text, ARRAY
+from sqlalchemy import Column, Integer, Identity, Text, Float, ARRAY, ForeignKey, TIMESTAMP
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
 from app.db.base import Base
 
 class Signal(Base):
     __tablename__ = "signals"
 
     signal_code = Column(Text, primary_key=True)
+
+    # compact surrogate key used by signal_points (4 bytes instead of text)
+    id = Column(Integer, Identity(), unique=True, nullable=False)
+
     component_code = Column(Text, nullable=False)
     column_name = Column(Text, nullable=False)
     signal_type = Column(Text, nullable=False)
@@ -14,3 +20,37 @@ class Signal(Base):
     description = Column(Text)
     visible_to_roles = Column(ARRAY(Text))
     family = Column(Text)
+
+
+class SignalBaseline(Base):
+    """
+    Cached baseline statistics per (signal, window); valid while the
+    signal's latest tick is still last_tick (see app.observability.baseline).
+    """
+    __tablename__ = "signal_baselines"
+
+    signal_id = Column(Integer, ForeignKey("signals.id", ondelete="CASCADE"), primary_key=True)
+    window_size = Column(Integer, primary_key=True)
+
+    last_tick = Column(Integer, nullable=False)
+    n = Column(Integer, nullable=False)
+    mean = Column(Float)
+    p95 = Column(Float)
+    max_value = Column(Float)
+    stdev = Column(Float)
+    computed_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+
+class ForecastModelState(Base):
+    """
+    Fitted state of an incremental forecast model per signal, folded up to
+    last_tick (see app.services.forecast_models).
+    """
+    __tablename__ = "forecast_model_states"
+
+    signal_id = Column(Integer, ForeignKey("signals.id", ondelete="CASCADE"), primary_key=True)
+    model = Column(Text, primary_key=True)
+
+    last_tick = Column(Integer, nullable=False)
+    state = Column(JSONB, nullable=False)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
@@ -1,13 +1,81 @@
 # app/db/models/timeseries.py
-from sqlalchemy import Column, BigInteger, Integer, Text
+from sqlalchemy import Column, BigInteger, Integer, Text, Float, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from app.db.base import Base
 
 class TimeSeriesPoint(Base):
+    """
+    Range-partitioned by tick (see app.services.partition_service).
+    The partition key has to be part of the primary key.
+    """
     __tablename__ = "timeseries_points"
+    __table_args__ = (
+        # one row per (component, tick): re-ingestion upserts instead of duplicating
+        Index(
+            "uq_timeseries_points_component_tick",
+            "component_code",
+            "tick",
+            unique=True,
+            postgresql_include=["timestamp"],
+        ),
+        {"postgresql_partition_by": "RANGE (tick)"},
+    )
 
-    id = Column(BigInteger, primary_key=True)
-    component_code = Column(Text, nullable=False, index=True)
-    tick = Column(Integer, nullable=False, index=True)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    component_code = Column(Text, nullable=False)
+    tick = Column(Integer, primary_key=True, index=True)
     timestamp = Column(BigInteger, nullable=False)
     payload = Column(JSONB, nullable=False)
+
+
+class SignalPoint(Base):
+    """
+    Narrow per-signal value store (one row per signal per tick).
+    Kept in sync with timeseries_points.payload by every writer.
+    Range-partitioned by tick with the same spans as timeseries_points.
+    """
+    __tablename__ = "signal_points"
+    __table_args__ = {"postgresql_partition_by": "RANGE (tick)"}
+
+    signal_id = Column(
+        Integer,
+        ForeignKey("signals.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    tick = Column(Integer, primary_key=True)
+    value = Column(Float)   # NULL when the payload key holds NaN / inf / non-numeric
+
+
+class ComponentHealthSnapshot(Base):
+    """
+    Health score of a component at a tick (100 - mean of its yi values).
+    Maintained by every point writer (see app.services.health_snapshot_service).
+    """
+    __tablename__ = "component_health_snapshots"
+
+    component_code = Column(Text, primary_key=True)
+    tick = Column(Integer, primary_key=True)
+    health = Column(Float, nullable=False)
+
+
+class SignalRollup(Base):
+    """
+    Pre-aggregated signal_points: count / min / max / sum / sum of squares
+    of a signal over [bucket, bucket + resolution) ticks, for every
+    resolution in settings.ROLLUP_RESOLUTIONS.
+    Maintained by every point writer (see app.services.rollup_service).
+    """
+    __tablename__ = "signal_rollups"
+
+    signal_id = Column(
+        Integer,
+        ForeignKey("signals.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    resolution = Column(Integer, primary_key=True)
+    bucket = Column(Integer, primary_key=True)     # first tick of the bucket
+    n = Column(Integer, nullable=False)            # non-NULL values
+    vmin = Column(Float)
+    vmax = Column(Float)
+    vsum = Column(Float, nullable=False)
+    vsumsq = Column(Float, nullable=False)
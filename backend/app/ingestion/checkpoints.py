@@ -0,0 +1,78 @@
+# app/ingestion/checkpoints.py
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+from app.db.models.ingestion import IngestionCheckpoint
+
+
+def get_checkpoint(db: Session, component_code: str) -> Optional[IngestionCheckpoint]:
+    return (
+        db.query(IngestionCheckpoint)
+        .filter(IngestionCheckpoint.component_code == component_code)
+        .one_or_none()
+    )
+
+
+def resumable_checkpoint(
+    db: Session,
+    component_code: str,
+    csv_path: Path,
+) -> Optional[IngestionCheckpoint]:
+    """
+    Checkpoint for the SAME file (path + mtime); a replaced file starts over.
+    """
+    cp = get_checkpoint(db, component_code)
+    if not cp:
+        return None
+
+    if cp.source_file != str(csv_path) or cp.source_mtime != csv_path.stat().st_mtime_ns:
+        return None
+
+    return cp
+
+
+def save_checkpoint(
+    db: Session,
+    component_code: str,
+    csv_path: Path,
+    last_tick: Optional[int],
+    rows_loaded: int,
+    status: str,
+    error: Optional[str] = None,
+):
+    """
+    Upsert the component checkpoint. Does NOT commit: it must land in the
+    same transaction as the rows it describes.
+    """
+    db.execute(
+        text("""
+            INSERT INTO ingestion_checkpoints (
+                component_code, source_file, source_mtime,
+                last_tick, rows_loaded, status, error, updated_at
+            )
+            VALUES (
+                :component, :source_file, :source_mtime,
+                :last_tick, :rows_loaded, :status, :error, now()
+            )
+            ON CONFLICT (component_code) DO UPDATE SET
+                source_file = EXCLUDED.source_file,
+                source_mtime = EXCLUDED.source_mtime,
+                last_tick = EXCLUDED.last_tick,
+                rows_loaded = EXCLUDED.rows_loaded,
+                status = EXCLUDED.status,
+                error = EXCLUDED.error,
+                updated_at = now()
+        """),
+        {
+            "component": component_code,
+            "source_file": str(csv_path),
+            "source_mtime": csv_path.stat().st_mtime_ns,
+            "last_tick": last_tick,
+            "rows_loaded": rows_loaded,
+            "status": status,
+            "error": error,
+        },
+    )
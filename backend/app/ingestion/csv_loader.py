@@ -1,55 +1,298 @@
 # app/ingestion/csv_loader.py
+import io
+import json
+import time
 from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
 import pandas as pd
-import math
 from sqlalchemy.orm import Session
-from app.db.models.timeseries import TimeSeriesPoint
 
+from app.ingestion.checkpoints import resumable_checkpoint, save_checkpoint
+from app.observability.baseline import STAGE_INVALIDATE_BASELINES_SQL
+from app.services.signal_points_service import signal_ids_by_column
+from app.services.partition_service import ensure_partitions
+from app.services.health_snapshot_service import STAGE_SNAPSHOT_SQL
+from app.services.rollup_service import stage_rollup_statements
+from app.services.forecast_service import STAGE_INVALIDATE_MODEL_STATES_SQL
+from app.services.alert_service import STAGE_INVALIDATE_ALERT_STATE_SQL
+
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# enough digits for every float64 to survive the COPY text round trip
+FLOAT_DIGITS = 17
 
+REQUIRED_COLS = {"tick", "timestamp"}
 
-def _sanitize_payload(payload: dict) -> dict:
+
+def _sanitize_frame(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Convert NaN / inf values to None so JSONB is valid.
+    Vectorized NaN / inf handling: inf -> NaN, which both JSON (null)
+    and COPY (empty field = NULL) treat as missing.
     """
-    clean = {}
-    for k, v in payload.items():
-        if isinstance(v, float):
-            if math.isnan(v) or math.isinf(v):
-                clean[k] = None
-            else:
-                clean[k] = v
-        else:
-            clean[k] = v
-    return clean
+    return df.replace([np.inf, -np.inf], np.nan)
 
 
-def load_csv_to_db(
+def _copy_csv(cursor, table: str, columns: str, frame: pd.DataFrame):
+    """
+    Stream a DataFrame through COPY ... FROM STDIN (CSV text protocol).
+    The chunk is serialized once into a buffer; nothing is kept afterwards.
+    """
+    buffer = io.StringIO()
+    frame.to_csv(
+        buffer,
+        header=False,
+        index=False,
+        na_rep="",
+        float_format=f"%.{FLOAT_DIGITS}g",
+    )
+
+    with cursor.copy(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)") as copy:
+        copy.write(buffer.getvalue())
+
+
+def _payload_frame(chunk: pd.DataFrame, component_code: str, metric_cols) -> pd.DataFrame:
+    # json.dumps writes floats with repr (exact round trip); pandas'
+    # to_json caps double_precision at 15 digits
+    metrics = chunk[metric_cols]
+    records = metrics.astype(object).where(metrics.notna(), None).to_dict("records")
+    payload = [json.dumps(r) for r in records]
+
+    return pd.DataFrame({
+        "component_code": component_code,
+        "tick": chunk["tick"].astype("int64").to_numpy(),
+        "timestamp": chunk["timestamp"].astype("int64").to_numpy(),
+        "payload": payload,
+    })
+
+
+def _signal_points_frame(chunk: pd.DataFrame, signal_ids: Dict[str, int]) -> pd.DataFrame:
+    columns = [c for c in chunk.columns if c in signal_ids]
+    if not columns:
+        return pd.DataFrame(columns=["signal_id", "tick", "value"])
+
+    numeric = chunk[columns].apply(pd.to_numeric, errors="coerce")
+
+    long = numeric.set_axis(
+        [signal_ids[c] for c in columns], axis=1
+    ).assign(tick=chunk["tick"].astype("int64").to_numpy())
+
+    long = long.melt(id_vars="tick", var_name="signal_id", value_name="value")
+    return long[["signal_id", "tick", "value"]]
+
+
+def ensure_stage_tables(cursor):
+    """
+    Session-lifetime staging tables; rows vanish at every commit.
+    """
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS _timeseries_points_stage (
+            component_code TEXT,
+            tick INTEGER,
+            timestamp BIGINT,
+            payload JSONB
+        ) ON COMMIT DELETE ROWS
+    """)
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS _signal_points_stage (
+            signal_id INTEGER,
+            tick INTEGER,
+            value DOUBLE PRECISION
+        ) ON COMMIT DELETE ROWS
+    """)
+
+
+def write_point_frames(db: Session, payloads: pd.DataFrame, points: pd.DataFrame):
+    """
+    COPY both frames into the stage tables, then upsert:
+      timeseries_points          on (component_code, tick)
+      signal_points              on (signal_id, tick)
+      component_health_snapshots on (component_code, tick)
+      signal_rollups             buckets touched by the new points
+    and drops the signal_baselines, forecast_model_states and
+    alert_rule_state watermarks already covering a written tick.
+    Re-running the same data is a no-op in terms of row count.
+    Runs in the session's current transaction. Does NOT commit.
+    """
+    # the session may hand out another pooled connection after each commit
+    cursor = db.connection().connection.driver_connection.cursor()
+    ensure_stage_tables(cursor)
+    cursor.execute("TRUNCATE _timeseries_points_stage, _signal_points_stage")
+
+    _copy_csv(
+        cursor,
+        "_timeseries_points_stage",
+        "component_code, tick, timestamp, payload",
+        payloads,
+    )
+    cursor.execute("""
+        INSERT INTO timeseries_points (component_code, tick, timestamp, payload)
+        SELECT DISTINCT ON (component_code, tick) component_code, tick, timestamp, payload
+        FROM _timeseries_points_stage
+        ORDER BY component_code, tick
+        ON CONFLICT (component_code, tick) DO UPDATE SET
+            timestamp = EXCLUDED.timestamp,
+            payload = EXCLUDED.payload
+    """)
+
+    # dual write into the narrow per-signal store (same transaction)
+    if len(points):
+        _copy_csv(cursor, "_signal_points_stage", "signal_id, tick, value", points)
+        cursor.execute("""
+            INSERT INTO signal_points (signal_id, tick, value)
+            SELECT DISTINCT ON (signal_id, tick) signal_id, tick, value
+            FROM _signal_points_stage
+            ORDER BY signal_id, tick
+            ON CONFLICT (signal_id, tick) DO UPDATE SET value = EXCLUDED.value
+        """)
+        cursor.execute(STAGE_SNAPSHOT_SQL)
+        for sql in stage_rollup_statements():
+            cursor.execute(sql)
+        # caches keyed on last_tick only notice newer ticks, not rewrites
+        cursor.execute(STAGE_INVALIDATE_BASELINES_SQL)
+        cursor.execute(STAGE_INVALIDATE_MODEL_STATES_SQL)
+        cursor.execute(STAGE_INVALIDATE_ALERT_STATE_SQL)
+
+
+def stream_csv_to_db(
     db: Session,
     csv_path: Path,
     component_code: str,
-):
-    df = pd.read_csv(csv_path)
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    resume: bool = True,
+) -> Dict[str, Any]:
+    """
+    Constant-memory, resumable CSV ingestion:
+      - pandas reads `chunk_size` rows at a time
+      - payload JSON + signal_points rows are built column-wise
+      - both go to Postgres through COPY + upsert (no ORM objects)
+      - every chunk commits together with the component checkpoint,
+        so a failed run resumes after the last committed tick
+    Assumes the CSV is ordered by tick (simulator output is).
+    """
+    started = time.perf_counter()
 
-    required_cols = {"tick", "timestamp"}
-    if not required_cols.issubset(df.columns):
-        raise ValueError(f"{csv_path.name} missing required columns")
+    resume_after = None
+    rows_loaded = 0
 
-    records = []
+    if resume:
+        cp = resumable_checkpoint(db, component_code, csv_path)
+        if cp and cp.status == "DONE":
+            return {
+                "component_code": component_code,
+                "rows": 0,
+                "chunks": 0,
+                "seconds": 0.0,
+                "rows_per_sec": 0.0,
+                "resumed_after_tick": cp.last_tick,
+                "skipped": True,
+            }
+        if cp and cp.last_tick is not None:
+            resume_after = int(cp.last_tick)
+            rows_loaded = int(cp.rows_loaded or 0)
 
-    for _, row in df.iterrows():
-        raw_payload = row.drop(labels=["tick", "timestamp"]).to_dict()
-        payload = _sanitize_payload(raw_payload)
+    signal_ids = signal_ids_by_column(db, component_code)
 
-        records.append(
-            TimeSeriesPoint(
-                component_code=component_code,
-                tick=int(row["tick"]),
-                timestamp=int(row["timestamp"]),
-                payload=payload,
+    last_tick = resume_after
+    rows = 0
+    chunks = 0
+
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+            if not REQUIRED_COLS.issubset(chunk.columns):
+                raise ValueError(f"{csv_path.name} missing required columns")
+
+            if resume_after is not None:
+                chunk = chunk[chunk["tick"] > resume_after]
+                if chunk.empty:
+                    continue
+
+            chunk = _sanitize_frame(chunk)
+            metric_cols = [c for c in chunk.columns if c not in REQUIRED_COLS]
+
+            # tick partitions must exist before rows arrive (else they land in DEFAULT);
+            # commit right away so the partition lock is not held across the COPY
+            if ensure_partitions(
+                db,
+                from_tick=int(chunk["tick"].min()),
+                to_tick=int(chunk["tick"].max()),
+            ):
+                db.commit()
+
+            write_point_frames(
+                db,
+                _payload_frame(chunk, component_code, metric_cols),
+                _signal_points_frame(chunk, signal_ids),
             )
+
+            rows += len(chunk)
+            chunks += 1
+            chunk_max = int(chunk["tick"].max())
+            last_tick = chunk_max if last_tick is None else max(last_tick, chunk_max)
+
+            save_checkpoint(
+                db,
+                component_code,
+                csv_path,
+                last_tick=last_tick,
+                rows_loaded=rows_loaded + rows,
+                status="RUNNING",
+            )
+            db.commit()
+
+            if progress:
+                elapsed = time.perf_counter() - started
+                progress({
+                    "component_code": component_code,
+                    "chunks": chunks,
+                    "rows": rows,
+                    "last_tick": last_tick,
+                    "rows_per_sec": rows / elapsed if elapsed > 0 else 0.0,
+                })
+
+        save_checkpoint(
+            db,
+            component_code,
+            csv_path,
+            last_tick=last_tick,
+            rows_loaded=rows_loaded + rows,
+            status="DONE",
+        )
+        db.commit()
+
+    except Exception as e:
+        db.rollback()
+        save_checkpoint(
+            db,
+            component_code,
+            csv_path,
+            last_tick=last_tick,
+            rows_loaded=rows_loaded + rows,
+            status="FAILED",
+            error=str(e),
         )
+        db.commit()
+        raise
 
-    db.bulk_save_objects(records)
-    db.commit()
+    elapsed = time.perf_counter() - started
+    return {
+        "component_code": component_code,
+        "rows": rows,
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+        "resumed_after_tick": resume_after,
+        "skipped": False,
+    }
 
-    return len(records)
+
+def load_csv_to_db(
+    db: Session,
+    csv_path: Path,
+    component_code: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    return stream_csv_to_db(db, csv_path, component_code, chunk_size, resume=False)["rows"]
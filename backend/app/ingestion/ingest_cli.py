@@ -1,8 +1,12 @@
 # app/ingestion/ingest_cli.py
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from sqlalchemy.orm import Session
+from sqlalchemy import text
+from app.db import session as db_session
 from app.db.session import SessionLocal
-from app.ingestion.csv_loader import load_csv_to_db
+from app.ingestion.csv_loader import DEFAULT_CHUNK_SIZE, stream_csv_to_db
 
 CSV_ROOT = Path(
     r"C:\Users\h50048240\3D Objects\PlatformOPS\simulator\output\csv"
@@ -22,21 +26,138 @@ COMPONENT_FILES = {
 }
 
 
-def run_ingestion():
-    db: Session = SessionLocal()
+def _print_progress(p):
+    print(
+        f"  ... {p['component_code']}: {p['rows']} rows "
+        f"({p['rows_per_sec']:.0f} rows/sec)",
+        end="\r",
+    )
 
-    try:
-        for component, filename in COMPONENT_FILES.items():
-            csv_path = CSV_ROOT / filename
-            if not csv_path.exists():
-                raise FileNotFoundError(csv_path)
 
-            count = load_csv_to_db(db, csv_path, component)
-            print(f"[OK] {component}: {count} rows ingested")
+def _print_result(stats):
+    if stats["skipped"]:
+        print(f"[SKIP] {stats['component_code']}: already ingested (checkpoint DONE)")
+        return
+
+    resumed = ""
+    if stats["resumed_after_tick"] is not None:
+        resumed = f", resumed after tick {stats['resumed_after_tick']}"
+
+    print(
+        f"[OK] {stats['component_code']}: {stats['rows']} rows ingested "
+        f"in {stats['seconds']}s ({stats['rows_per_sec']} rows/sec{resumed})"
+    )
+
+
+def _reset_checkpoints(db: Session, components):
+    db.execute(
+        text("DELETE FROM ingestion_checkpoints WHERE component_code = ANY(:codes)"),
+        {"codes": list(components)},
+    )
+    db.commit()
+
 
+def _csv_path(filename: str) -> Path:
+    csv_path = CSV_ROOT / filename
+    if not csv_path.exists():
+        raise FileNotFoundError(csv_path)
+    return csv_path
+
+
+# ---------- PARALLEL WORKERS ----------
+def _init_worker():
+    # pooled connections inherited through fork must not be reused by the child
+    if db_session.engine is not None:
+        db_session.engine.dispose(close=False)
+
+
+def _ingest_component(component: str, csv_path: str, chunk_size: int):
+    """
+    Runs in a worker process: one session, one component, one file.
+    """
+    db: Session = db_session.SessionLocal()
+    try:
+        return stream_csv_to_db(db, Path(csv_path), component, chunk_size=chunk_size)
     finally:
         db.close()
 
 
+def run_ingestion(
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+    restart: bool = False,
+):
+    files = {c: _csv_path(f) for c, f in COMPONENT_FILES.items()}
+
+    if restart:
+        db: Session = SessionLocal()
+        try:
+            _reset_checkpoints(db, files.keys())
+        finally:
+            db.close()
+
+    if workers <= 1:
+        db: Session = SessionLocal()
+        try:
+            for component, csv_path in files.items():
+                stats = stream_csv_to_db(
+                    db,
+                    csv_path,
+                    component,
+                    chunk_size=chunk_size,
+                    progress=_print_progress,
+                )
+                _print_result(stats)
+        finally:
+            db.close()
+        return
+
+    failed = {}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {
+            pool.submit(_ingest_component, component, str(csv_path), chunk_size): component
+            for component, csv_path in files.items()
+        }
+
+        for future in as_completed(futures):
+            component = futures[future]
+            try:
+                _print_result(future.result())
+            except Exception as e:
+                failed[component] = e
+                print(f"[FAIL] {component}: {e} (checkpoint kept, rerun to resume)")
+
+    if failed:
+        raise RuntimeError(f"Ingestion failed for: {', '.join(sorted(failed))}")
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Load simulator CSV output into PlatformOPS")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"rows read and COPY'd per batch (default {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="components ingested in parallel, one process each (default 1)",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="ignore saved checkpoints and reload every component from tick 0",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    run_ingestion()
+    args = _parse_args()
+    run_ingestion(
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        restart=args.restart,
+    )
@@ -0,0 +1,397 @@
+# app/ingestion/live_writer.py
+import json
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.db import session as db_session
+from app.ingestion.csv_loader import (
+    REQUIRED_COLS,
+    _payload_frame,
+    _sanitize_frame,
+    _signal_points_frame,
+    write_point_frames,
+)
+from app.services.partition_service import ensure_partitions
+from app.services.signal_points_service import signal_ids_by_column
+
+
+class IngestQueueFull(Exception):
+    pass
+
+
+# ---------- BODY PARSING ----------
+def _records_to_frames(records: List[Dict[str, Any]]) -> Dict[str, pd.DataFrame]:
+    """
+    Row records -> one DataFrame per component.
+    A record is {"component_code", "tick", "timestamp", <metric>: value, ...}
+    or the same with metrics nested under "values".
+    """
+    flat = []
+    for n, r in enumerate(records):
+        if not isinstance(r, dict):
+            raise ValueError("Each tick record must be a JSON object")
+        if r.get("component_code") in (None, ""):
+            # groupby would silently drop it
+            raise ValueError(f"Record {n}: missing component_code")
+        if "values" in r and isinstance(r["values"], dict):
+            r = {**{k: v for k, v in r.items() if k != "values"}, **r["values"]}
+        flat.append(r)
+
+    if not flat:
+        return {}
+
+    df = pd.DataFrame.from_records(flat)
+    if "component_code" not in df.columns:
+        raise ValueError("Missing component_code")
+
+    # columns that belong to other components come back all-NaN; drop them
+    return {
+        str(component): (
+            group.drop(columns="component_code")
+            .dropna(axis=1, how="all")
+            .reset_index(drop=True)
+        )
+        for component, group in df.groupby("component_code", sort=False)
+    }
+
+
+def _columnar_to_frame(block: Dict[str, Any]) -> pd.DataFrame:
+    """
+    {"component_code": "C1", "tick": [...], "timestamp": [...],
+     "columns": {"cpu_pct": [...], ...}}
+    """
+    columns = block.get("columns") or {}
+    if not isinstance(columns, dict):
+        raise ValueError("'columns' must be an object of equal-length arrays")
+
+    data = {"tick": block.get("tick"), "timestamp": block.get("timestamp"), **columns}
+    lengths = {len(v) for v in data.values() if isinstance(v, list)}
+    if len(lengths) != 1 or not all(isinstance(v, list) for v in data.values()):
+        raise ValueError("tick, timestamp and every column must be arrays of the same length")
+
+    return pd.DataFrame(data)
+
+
+def parse_tick_batch(body: bytes, content_type: Optional[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Accepted shapes:
+      - NDJSON (application/x-ndjson): one row record per line
+      - JSON list of row records
+      - columnar JSON: one block, or {"components": [block, ...]}
+    Returns {component_code: frame(tick, timestamp, metrics...)}.
+    """
+    content_type = (content_type or "").split(";")[0].strip().lower()
+
+    try:
+        if content_type in ("application/x-ndjson", "application/jsonl", "application/ndjson"):
+            text_body = body.decode("utf-8")
+            return _validate(_records_to_frames([
+                json.loads(line) for line in text_body.splitlines() if line.strip()
+            ]))
+
+        data = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Malformed body: {e}")
+
+    if isinstance(data, list):
+        return _validate(_records_to_frames(data))
+
+    if not isinstance(data, dict):
+        raise ValueError("Unsupported body shape")
+
+    blocks = data.get("components", [data])
+    frames: Dict[str, List[pd.DataFrame]] = {}
+    for block in blocks:
+        if not isinstance(block, dict) or not block.get("component_code"):
+            raise ValueError("Missing component_code")
+        frames.setdefault(str(block["component_code"]), []).append(_columnar_to_frame(block))
+
+    return _validate({c: pd.concat(f, ignore_index=True) for c, f in frames.items()})
+
+
+def _validate(frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    for component, frame in frames.items():
+        if not REQUIRED_COLS.issubset(frame.columns):
+            raise ValueError(f"{component}: tick and timestamp are required")
+        if frame[list(REQUIRED_COLS)].isna().any().any():
+            raise ValueError(f"{component}: tick and timestamp must not be null")
+
+        frame["tick"] = pd.to_numeric(frame["tick"], errors="raise").astype("int64")
+        frame["timestamp"] = pd.to_numeric(frame["timestamp"], errors="raise").astype("int64")
+
+    return frames
+
+
+# ---------- WRITER ----------
+class LiveTickWriter:
+    """
+    Bounded in-process queue drained by one background thread.
+    The request path only parses + enqueues; the writer merges everything
+    queued into one COPY/upsert transaction per drain.
+    """
+
+    def __init__(
+        self,
+        max_batches: int,
+        max_drain: int,
+        latency_window: int = 200,
+        max_attempts: int = 3,
+        retry_seconds: float = 0.5,
+        dead_letters: int = 100,
+    ):
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_batches)
+        self.max_drain = max_drain
+        self.max_attempts = max(1, max_attempts)
+        self.retry_seconds = retry_seconds
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._signal_ids: Dict[str, Dict[str, int]] = {}
+
+        self._write_ms: deque = deque(maxlen=latency_window)
+        self._lag_ms: deque = deque(maxlen=latency_window)
+        # batches that failed every attempt, even on their own
+        self.dead_letters: deque = deque(maxlen=dead_letters)
+        self.stats: Dict[str, Any] = {
+            "accepted_batches": 0,
+            "accepted_ticks": 0,
+            "rejected_batches": 0,
+            "written_batches": 0,
+            "written_ticks": 0,
+            "failed_batches": 0,
+            "retried_writes": 0,
+            "last_error": None,
+            "last_write_at": None,
+        }
+
+    # ---- producer side ----
+    def submit(self, frames: Dict[str, pd.DataFrame]) -> int:
+        ticks = sum(len(f) for f in frames.values())
+        if not ticks:
+            return 0
+
+        self.start()
+        try:
+            self.queue.put_nowait((time.perf_counter(), frames))
+        except queue.Full:
+            with self._lock:
+                self.stats["rejected_batches"] += 1
+            raise IngestQueueFull()
+
+        with self._lock:
+            self.stats["accepted_batches"] += 1
+            self.stats["accepted_ticks"] += ticks
+        return ticks
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="live-tick-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Flush what is queued, then stop the thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    # ---- consumer side ----
+    def _drain(self) -> List:
+        try:
+            items = [self.queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        while len(items) < self.max_drain:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self):
+        while True:
+            items = self._drain()
+            if not items:
+                if self._stop.is_set():
+                    return
+                continue
+
+            started = time.perf_counter()
+            try:
+                ticks = self._write_with_retry(items)
+            except Exception:
+                # one bad batch must not take the whole drain down with it
+                if len(items) > 1:
+                    for item in items:
+                        self._write_alone(item)
+                else:
+                    self._dead_letter(items[0])
+                continue
+
+            self._record(items, ticks, started)
+
+    def _record(self, items: List, ticks: int, started: float):
+        done = time.perf_counter()
+        with self._lock:
+            self.stats["written_batches"] += len(items)
+            self.stats["written_ticks"] += ticks
+            self.stats["last_write_at"] = time.time()
+            self._write_ms.append((done - started) * 1000.0)
+            self._lag_ms.extend((done - enqueued) * 1000.0 for enqueued, _ in items)
+
+    def _write_with_retry(self, items: List) -> int:
+        """
+        _write with exponential backoff; re-raises the last error.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return self._write(items)
+            except Exception as e:
+                with self._lock:
+                    self.stats["last_error"] = str(e)
+                if attempt == self.max_attempts:
+                    raise
+                with self._lock:
+                    self.stats["retried_writes"] += 1
+                # wakes up early on stop(), the remaining attempts still run
+                self._stop.wait(self.retry_seconds * 2 ** (attempt - 1))
+
+    def _write_alone(self, item):
+        started = time.perf_counter()
+        try:
+            ticks = self._write_with_retry([item])
+        except Exception:
+            self._dead_letter(item)
+            return
+        self._record([item], ticks, started)
+
+    def _dead_letter(self, item):
+        with self._lock:
+            self.stats["failed_batches"] += 1
+            self.dead_letters.append((item, self.stats["last_error"]))
+
+    def requeue_dead_letters(self) -> int:
+        """
+        Put dead-lettered batches back on the queue (e.g. after the database
+        came back). Returns how many were requeued; the rest stay.
+        """
+        requeued = 0
+        self.start()
+        while self.dead_letters:
+            (enqueued, frames), _ = self.dead_letters[0]
+            try:
+                self.queue.put_nowait((enqueued, frames))
+            except queue.Full:
+                break
+            self.dead_letters.popleft()
+            requeued += 1
+        return requeued
+
+    def _write(self, items: List) -> int:
+        merged: Dict[str, List[pd.DataFrame]] = {}
+        for _, frames in items:
+            for component, frame in frames.items():
+                merged.setdefault(component, []).append(frame)
+
+        db = db_session.SessionLocal()
+        try:
+            payloads, points = [], []
+            ticks = 0
+
+            for component, parts in merged.items():
+                # later batches win for the same tick
+                frame = pd.concat(parts, ignore_index=True)
+                frame = frame.drop_duplicates(subset="tick", keep="last")
+                frame = _sanitize_frame(frame)
+
+                metric_cols = [c for c in frame.columns if c not in REQUIRED_COLS]
+
+                # reload on a column the cache does not know yet: its signal
+                # may have been generated since (an empty map included)
+                known = self._signal_ids.get(component)
+                if known is None or any(c not in known for c in metric_cols):
+                    self._signal_ids[component] = signal_ids_by_column(db, component)
+                payloads.append(_payload_frame(frame, component, metric_cols))
+                points.append(_signal_points_frame(frame, self._signal_ids[component]))
+                ticks += len(frame)
+
+            payloads = pd.concat(payloads, ignore_index=True)
+            points = pd.concat(points, ignore_index=True)
+
+            if ensure_partitions(
+                db,
+                from_tick=int(payloads["tick"].min()),
+                to_tick=int(payloads["tick"].max()),
+            ):
+                db.commit()
+
+            write_point_frames(db, payloads, points)
+            db.commit()
+            return ticks
+
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def forget_signals(self, component_code: Optional[str] = None):
+        """
+        Drop cached column -> signal_id maps (after signal bootstrap / regeneration).
+        """
+        if component_code is None:
+            self._signal_ids.clear()
+        else:
+            self._signal_ids.pop(component_code, None)
+
+    # ---- observability ----
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            write_ms = np.array(self._write_ms) if self._write_ms else None
+            lag_ms = np.array(self._lag_ms) if self._lag_ms else None
+            stats = dict(self.stats)
+            dead_letters = len(self.dead_letters)
+
+        def _pct(values, q):
+            return round(float(np.percentile(values, q)), 2) if values is not None else None
+
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            **stats,
+            "dead_letter_batches": dead_letters,
+            "write_ms": {
+                "last": round(float(write_ms[-1]), 2) if write_ms is not None else None,
+                "p50": _pct(write_ms, 50),
+                "p95": _pct(write_ms, 95),
+            },
+            "enqueue_to_commit_ms": {
+                "p50": _pct(lag_ms, 50),
+                "p95": _pct(lag_ms, 95),
+            },
+        }
+
+
+live_writer = LiveTickWriter(
+    max_batches=settings.LIVE_INGEST_QUEUE_BATCHES,
+    max_drain=settings.LIVE_INGEST_MAX_DRAIN,
+    max_attempts=settings.LIVE_INGEST_MAX_ATTEMPTS,
+    retry_seconds=settings.LIVE_INGEST_RETRY_SECONDS,
+    dead_letters=settings.LIVE_INGEST_DEAD_LETTERS,
+)
@@ -7,6 +7,10 @@ from app.api import system, patterns, simulator
 from app.api import anomalies
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import incidents
+from app.api import ingest
+from app.ingestion.live_writer import live_writer
+from app.core.config import settings
+from app.services.notification_dispatcher import notification_dispatcher
 from fastapi import status
 
 
@@ -35,6 +39,18 @@ app.add_middleware(
 def health_check():
     return {"status": "ok Lionel messi"}
 
+
+@app.on_event("startup")
+def start_notification_dispatcher():
+    if settings.NOTIFY_DISPATCHER_ENABLED:
+        notification_dispatcher.start()
+
+
+@app.on_event("shutdown")
+def flush_live_ingest():
+    live_writer.stop()
+    notification_dispatcher.stop()
+
 app.include_router(timeseries.router)
 app.include_router(signals.router)
 app.include_router(propagation.router)
@@ -48,6 +64,7 @@ app.include_router(simulator.router)
 app.include_router(anomalies.router)
 app.include_router(incidents.router)
 app.include_router(components.router)
+app.include_router(ingest.router)
 
 
 
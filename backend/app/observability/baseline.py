@@ -1,40 +1,188 @@
-# app/observability/baseline.py
-import statistics
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
 from sqlalchemy import text
 
+from app.db.models.signals import Signal
+from app.observability.window_stats import exclusive_quantile
+from app.services.signal_points_service import fetch_signal_matrix, latest_signal_ticks
+
 DEFAULT_BASELINE_WINDOW = 200
+MIN_BASELINE_POINTS = 5
 
 
-def metric_baseline(db, component: str, column: str, window: int = DEFAULT_BASELINE_WINDOW):
-    sql = text("""
-        SELECT (payload ->> :column)::double precision AS v
-        FROM timeseries_points
-        WHERE component_code = :component
-          AND payload ? :column
-        ORDER BY tick DESC
-        LIMIT :window
-    """)
+# ---------- NUMPY ----------
+def baseline_matrix(values: np.ndarray, present: np.ndarray, window: int) -> Dict[str, np.ndarray]:
+    """
+    Baselines for every column of a ticks x signals matrix in one pass,
+    over each column's last `window` stored rows (NULL values skipped).
+    """
+    # rank rows from the end per column, keep the last `window` stored ones
+    from_end = np.cumsum(present[::-1], axis=0)[::-1]
+    in_window = present & (from_end <= window)
+
+    X = np.where(in_window, values, np.nan)
+    counts = (~np.isnan(X)).sum(axis=0)
+
+    # moments from plain sums: np.nanmean / nanstd warn on empty columns
+    # (signals with no value in the window), and errstate cannot mute that
+    missing = np.isnan(X)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(counts > 0, np.where(missing, 0.0, X).sum(axis=0) / np.maximum(counts, 1), np.nan)
+        dev = np.where(missing, 0.0, X - mean)
+        stdev = np.where(counts > 1, np.sqrt((dev * dev).sum(axis=0) / np.maximum(counts - 1, 1)), np.nan)
+    max_v = (
+        np.where(counts > 0, np.where(missing, -np.inf, X).max(axis=0), np.nan)
+        if len(X) else np.full(X.shape[1], np.nan)
+    )
+
+    p95 = exclusive_quantile(np.sort(X, axis=0), counts, 19, 20) if len(X) else np.full(X.shape[1], np.nan)
+
+    return {"n": counts, "mean": mean, "p95": p95, "max": max_v, "stdev": stdev}
 
+
+# ---------- CACHE ----------
+def _cached(db, signal_ids: List[int], window: int) -> Dict[int, dict]:
     rows = db.execute(
-        sql,
-        {
-            "component": component,
-            "column": column,
-            "window": window,   # 🔒 ALWAYS BOUND
-        },
+        text("""
+            SELECT signal_id, last_tick, n, mean, p95, max_value, stdev
+            FROM signal_baselines
+            WHERE window_size = :window AND signal_id = ANY(:ids)
+        """),
+        {"window": window, "ids": signal_ids},
     ).fetchall()
+    return {r.signal_id: r for r in rows}
+
+
+def _store(db, window: int, rows: List[dict]):
+    if not rows:
+        return
+    db.execute(
+        text("""
+            INSERT INTO signal_baselines (
+                signal_id, window_size, last_tick, n, mean, p95, max_value, stdev, computed_at
+            )
+            VALUES (:signal_id, :window, :last_tick, :n, :mean, :p95, :max, :stdev, now())
+            ON CONFLICT (signal_id, window_size) DO UPDATE SET
+                last_tick = EXCLUDED.last_tick,
+                n = EXCLUDED.n,
+                mean = EXCLUDED.mean,
+                p95 = EXCLUDED.p95,
+                max_value = EXCLUDED.max_value,
+                stdev = EXCLUDED.stdev,
+                computed_at = now()
+        """),
+        [{**r, "window": window} for r in rows],
+    )
+
+
+# used by the COPY loader, on its raw cursor, right after the signal_points
+# upsert: drop cached baselines that already covered a (re)written tick
+STAGE_INVALIDATE_BASELINES_SQL = """
+    DELETE FROM signal_baselines b
+    USING (
+        SELECT signal_id, min(tick) AS first_tick
+        FROM _signal_points_stage
+        GROUP BY signal_id
+    ) s
+    WHERE b.signal_id = s.signal_id
+      AND b.last_tick >= s.first_tick
+"""
+
+
+def invalidate_baselines(db, signal_ids: Iterable[int]):
+    """
+    Drop the cached baselines of signals whose past values were rewritten
+    (the cache only notices new ticks). Does NOT commit.
+    """
+    ids = sorted(set(int(i) for i in signal_ids))
+    if not ids:
+        return
+    db.execute(
+        text("DELETE FROM signal_baselines WHERE signal_id = ANY(:ids)"),
+        {"ids": ids},
+    )
 
-    values = [r.v for r in rows if r.v is not None]
 
-    if len(values) < 5:
+def _as_baseline(n, mean, p95, max_v, stdev) -> Optional[dict]:
+    if n is None or n < MIN_BASELINE_POINTS:
         return None
+    return {"mean": mean, "p95": p95, "max": max_v, "stdev": stdev}
 
-    mean = statistics.mean(values)
-    p95 = statistics.quantiles(values, n=20)[18]
-    max_v = max(values)
 
-    return {
-        "mean": mean,
-        "p95": p95,
-        "max": max_v,
-    }
+# ---------- PUBLIC ----------
+def bulk_baselines(
+    db,
+    signals: Iterable[Signal],
+    window: int = DEFAULT_BASELINE_WINDOW,
+    use_cache: bool = True,
+) -> Dict[str, Optional[dict]]:
+    """
+    {signal_code: {"mean", "p95", "max", "stdev"} | None} for many signals.
+      - one latest-tick probe + one matrix fetch per component
+      - all statistics in NumPy
+      - results cached in signal_baselines, reused while the signal's
+        latest tick has not moved
+    Does NOT commit (the cache write rides on the caller's transaction).
+    """
+    by_component: Dict[str, List[Signal]] = {}
+    for s in signals:
+        by_component.setdefault(s.component_code, []).append(s)
+
+    result: Dict[str, Optional[dict]] = {}
+
+    for component_signals in by_component.values():
+        ids = [s.id for s in component_signals]
+        latest = latest_signal_ticks(db, ids)
+        cache = _cached(db, ids, window) if use_cache else {}
+
+        stale = []
+        for s in component_signals:
+            if s.id not in latest:
+                result[s.signal_code] = None
+                continue
+
+            c = cache.get(s.id)
+            if c is not None and c.last_tick == latest[s.id]:
+                result[s.signal_code] = _as_baseline(c.n, c.mean, c.p95, c.max_value, c.stdev)
+            else:
+                stale.append(s)
+
+        if not stale:
+            continue
+
+        stale_ids = [s.id for s in stale]
+        from_tick = min(latest[i] for i in stale_ids) - window + 1
+        _, values, present = fetch_signal_matrix(db, stale_ids, from_tick=from_tick)
+        stats = baseline_matrix(values, present, window)
+
+        fresh = []
+        for k, s in enumerate(stale):
+            n = int(stats["n"][k])
+            row = {
+                "signal_id": s.id,
+                "last_tick": latest[s.id],
+                "n": n,
+                "mean": float(stats["mean"][k]) if n else None,
+                "p95": float(stats["p95"][k]) if n >= MIN_BASELINE_POINTS else None,
+                "max": float(stats["max"][k]) if n else None,
+                "stdev": float(stats["stdev"][k]) if n > 1 else None,
+            }
+            fresh.append(row)
+            result[s.signal_code] = _as_baseline(n, row["mean"], row["p95"], row["max"], row["stdev"])
+
+        _store(db, window, fresh)
+
+    return result
+
+
+def metric_baseline(db, component: str, column: str, window: int = DEFAULT_BASELINE_WINDOW):
+    signal = (
+        db.query(Signal)
+        .filter(Signal.component_code == component, Signal.column_name == column)
+        .one_or_none()
+    )
+    if signal is None:
+        return None
+
+    return bulk_baselines(db, [signal], window).get(signal.signal_code)
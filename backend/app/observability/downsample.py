@@ -0,0 +1,155 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Visual downsampling of (x, y) series: both functions return the sorted
+# indices of the points to keep, so callers can pick from whatever row
+# objects they hold. NaN values never win a bucket unless the bucket has
+# nothing else.
+#
+# y may also be n x S (several series on one x axis): the picks are then
+# shared by every column, each column scaled to its own range first so no
+# series dominates, and the max_points bound holds for the whole axis.
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+def _scale_columns(y: np.ndarray) -> np.ndarray:
+    """
+    Every column mapped onto [0, 1] by its own min / max (constant columns
+    to 0, all-NaN columns left NaN).
+    """
+    y = np.asarray(y, dtype=float)
+    seen = ~np.isnan(y).all(axis=0)
+    lo = np.zeros(y.shape[1])
+    span = np.ones(y.shape[1])
+    lo[seen] = np.nanmin(y[:, seen], axis=0)
+    span[seen] = np.nanmax(y[:, seen], axis=0) - lo[seen]
+    return (y - lo) / np.where(span > 0, span, 1.0)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: first and last point kept, the rest
+    split into max_points - 2 buckets; from each bucket the point forming
+    the largest triangle with the previously kept point and the next
+    bucket's mean is kept (areas summed over the columns of a 2-D y).
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float).reshape(n, -1)
+
+    # bucket b covers [edges[b], edges[b + 1]) of the inner points 1..n-2
+    edges = np.floor(np.linspace(1, n - 1, max_points - 1)).astype(np.int64)
+
+    # mean point of every bucket (the "third" vertex of the previous one)
+    counts = np.diff(edges)
+    y_filled = np.where(np.isnan(y), 0.0, y)
+    y_valid = (~np.isnan(y)).astype(float)
+    x_mean = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    y_sum = np.add.reduceat(y_filled[:-1], edges[:-1], axis=0)
+    y_cnt = np.add.reduceat(y_valid[:-1], edges[:-1], axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        y_mean = np.where(y_cnt > 0, y_sum / np.maximum(y_cnt, 1), np.nan)
+
+    # next-bucket vertex for the last bucket is the last point
+    next_x = np.append(x_mean[1:], x[-1])
+    next_y = np.concatenate([y_mean[1:], y[-1:]])
+
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    a = 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+
+        with np.errstate(invalid="ignore"):
+            area = np.abs(
+                (x[a] - next_x[b]) * (by - y[a])
+                - (x[a] - bx)[:, None] * (next_y[b] - y[a])
+            )
+        # NaN only where every column is NaN
+        area = np.where(np.isnan(area).all(axis=1), np.nan, np.nansum(area, axis=1))
+
+        if np.isnan(area).all():
+            a = lo
+        else:
+            a = lo + int(np.nanargmax(area))
+        keep[b + 1] = a
+
+    return keep
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Min and max of max_points // 2 equal buckets (one pair per pixel
+    column), plus the first and last point. With a 2-D y, the rows
+    holding the lowest and highest value of any column in the bucket.
+    """
+    n = len(y)
+    if max_points >= n or max_points < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float).reshape(n, -1)
+    S = y.shape[1]
+    buckets = (max_points - 2) // 2
+    size = -(-n // buckets)
+
+    padded = np.full((buckets * size, S), np.nan)
+    padded[:n] = y
+    M = padded.reshape(buckets, size * S)
+
+    empty = np.isnan(M).all(axis=1)
+    lo = np.argmin(np.where(np.isnan(M), np.inf, M), axis=1) // S
+    hi = np.argmax(np.where(np.isnan(M), -np.inf, M), axis=1) // S
+
+    base = np.arange(buckets) * size
+    picked = np.concatenate([
+        [0, n - 1],
+        (base + lo)[~empty],
+        (base + hi)[~empty],
+        base[empty & (base < n)],
+    ])
+    return np.unique(picked[picked < n])
+
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, max_points: Optional[int], method: str = "lttb") -> np.ndarray:
+    """
+    Indices of the points to keep (all of them when max_points is None).
+    A 2-D y (n x S) is downsampled as a whole: at most max_points rows.
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}' (expected one of {DOWNSAMPLE_METHODS})")
+    if not max_points or len(y) <= max_points:
+        return np.arange(len(y))
+    if np.ndim(y) == 2:
+        y = _scale_columns(y)
+    if method == "minmax":
+        return minmax_indices(y, max_points)
+    return lttb_indices(x, y, max_points)
+
+
+def downsample_points(
+    points: List[Dict[str, Any]],
+    max_points: Optional[int],
+    method: str = "lttb",
+    x_key: str = "tick",
+    y_key: str = "value",
+) -> List[Dict[str, Any]]:
+    """
+    Keep at most max_points of a list of point dicts (None = all).
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}' (expected one of {DOWNSAMPLE_METHODS})")
+    if not max_points or len(points) <= max_points:
+        return points
+
+    x = np.array([p[x_key] for p in points], dtype=float)
+    y = np.array([np.nan if p[y_key] is None else p[y_key] for p in points], dtype=float)
+
+    return [points[i] for i in downsample_indices(x, y, max_points, method)]
@@ -0,0 +1,72 @@
+from typing import Dict, Sequence
+
+import numpy as np
+
+
+# Column-wise statistics over a (rows x columns) matrix where NaN means
+# "no value". Each column is one window / bucket. Quantiles follow
+# statistics.quantiles(..., method="exclusive") exactly, so results match
+# the scalar code they replace.
+
+
+def exclusive_quantile(sorted_values: np.ndarray, counts: np.ndarray, i: int, n: int) -> np.ndarray:
+    """
+    statistics.quantiles(column, n=n)[i - 1] for every column
+    (including its extrapolation for short series). NaNs sorted last.
+    """
+    m = counts + 1
+    j = np.clip((i * m) // n, 1, np.maximum(counts - 1, 1))
+    delta = i * m - j * n
+
+    cols = np.arange(sorted_values.shape[1])
+    lo = sorted_values[j - 1, cols]
+    hi = sorted_values[np.minimum(j, sorted_values.shape[0] - 1), cols]
+    return (lo * (n - delta) + hi * delta) / n
+
+
+def median(sorted_values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    cols = np.arange(sorted_values.shape[1])
+    upper = sorted_values[np.clip(counts // 2, 0, None), cols]
+    lower = sorted_values[np.clip((counts - 1) // 2, 0, None), cols]
+    return (upper + lower) / 2
+
+
+def column_stats(X: np.ndarray, quantiles: Sequence[int] = (10, 50, 90, 95)) -> Dict[str, np.ndarray]:
+    """
+    n, mean and p<q> for every column of X (one sort for all quantiles).
+    Columns with no value get NaN statistics.
+    """
+    if X.ndim == 1:
+        X = X[:, None]
+
+    counts = (~np.isnan(X)).sum(axis=0)
+    out: Dict[str, np.ndarray] = {"n": counts}
+
+    if X.shape[0] == 0:
+        for name in ["mean"] + [f"p{q}" for q in quantiles]:
+            out[name] = np.full(X.shape[1], np.nan)
+        return out
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["mean"] = np.where(counts > 0, np.nansum(X, axis=0) / np.maximum(counts, 1), np.nan)
+
+    S = np.sort(X, axis=0)
+    for q in quantiles:
+        out[f"p{q}"] = median(S, counts) if q == 50 else exclusive_quantile(S, counts, q, 100)
+
+    empty = counts == 0
+    for name, arr in out.items():
+        if name != "n":
+            arr[empty] = np.nan
+    return out
+
+
+def bucket_matrix(values: np.ndarray, size: int) -> np.ndarray:
+    """
+    Lay a 1-D series out as (size x buckets) columns of consecutive
+    values; the last bucket is padded with NaN.
+    """
+    buckets = -(-len(values) // size)
+    padded = np.full(buckets * size, np.nan)
+    padded[: len(values)] = values
+    return padded.reshape(buckets, size).T
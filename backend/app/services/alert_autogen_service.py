@@ -1,55 +1,30 @@
 # app/services/alert_autogen_service.py
-import statistics
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from app.db.models.signals import Signal
 from app.db.models.alerts import AlertRule
+from app.observability.baseline import bulk_baselines
 
 
-def _baseline(db: Session, signal: Signal, window: int = 50):
-    sql = """
-        SELECT
-            (payload ->> :column)::double precision AS value
-        FROM timeseries_points
-        WHERE component_code = :component
-          AND payload ? :column
-        ORDER BY tick DESC
-        LIMIT :window
+def _baselines(db: Session, signals, window: int = 50):
     """
-
-    rows = db.execute(
-        text(sql),
-        {
-            "column": signal.column_name,
-            "component": signal.component_code,
-            "window": window,
-        },
-    ).fetchall()
-
-    values = [r.value for r in rows if r.value is not None]
-
-    if len(values) < 5:
-        return None, None
-
-    return statistics.mean(values), statistics.stdev(values)
+    {signal_code: (mean, stdev)}; (None, None) when there is too little data.
+    """
+    return {
+        code: (b["mean"], b["stdev"]) if b else (None, None)
+        for code, b in bulk_baselines(db, signals, window).items()
+    }
 
 
 def autogenerate_alert_rules(db: Session):
     created = 0
 
-    signals = db.query(Signal).all()
+    # Avoid duplicates
+    existing = {r.signal_code for r in db.query(AlertRule.signal_code).all()}
+    signals = [s for s in db.query(Signal).all() if s.signal_code not in existing]
+    baselines = _baselines(db, [s for s in signals if s.signal_type == "xi"])
 
     for s in signals:
-        # Avoid duplicates
-        exists = (
-            db.query(AlertRule)
-            .filter(AlertRule.signal_code == s.signal_code)
-            .first()
-        )
-        if exists:
-            continue
-
-        mean, std = _baseline(db, s)
+        mean, std = baselines.get(s.signal_code, (None, None))
 
         # ---------- xi ----------
         if s.signal_type == "xi" and mean is not None:
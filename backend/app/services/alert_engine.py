@@ -0,0 +1,176 @@
+# app/services/alert_engine.py
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+OPERATORS = {
+    "gt":  np.greater,
+    "gte": np.greater_equal,
+    "lt":  np.less,
+    "lte": np.less_equal,
+    "eq":  np.equal,
+    "ne":  np.not_equal,
+}
+
+
+def violation_matrix(
+    values: np.ndarray,
+    rule_cols: np.ndarray,
+    operators: Sequence[str],
+    thresholds: np.ndarray,
+) -> np.ndarray:
+    """
+    ticks x rules: True where the rule's column holds a violating value
+    (NULL / NaN never violates).
+    """
+    X = values[:, rule_cols]
+    V = np.zeros(X.shape, dtype=bool)
+    with np.errstate(invalid="ignore"):
+        for name in set(operators):
+            cols = np.flatnonzero(np.asarray(operators) == name)
+            V[:, cols] = OPERATORS[name](X[:, cols], thresholds[cols])
+    return V & ~np.isnan(X)
+
+
+def fold_rule_matrix(
+    ticks: np.ndarray,
+    values: np.ndarray,
+    present: np.ndarray,
+    rule_cols: np.ndarray,
+    operators: Sequence[str],
+    thresholds: np.ndarray,
+    durations: np.ndarray,
+    start_ticks: np.ndarray,
+    streak: np.ndarray,
+    streak_start: np.ndarray,
+    peak: np.ndarray,
+    is_open: np.ndarray,
+) -> Dict[str, Any]:
+    """
+    Advance R rules over a ticks x signals matrix in one pass of NumPy
+    run-length arithmetic (no per-tick Python loop).
+
+    Per rule, the semantics are the streaming streak machine:
+      - a present, violating value extends the streak
+      - a present NULL or non-violating value resets it (and closes an open episode)
+      - a missing row neither extends nor resets
+      - an episode opens when the streak reaches its duration and extends
+        tick_end / peak while violations continue
+    Rows with tick < start_ticks[r] are ignored for rule r.
+
+    State in/out (length R, NaN = None): streak, streak_start, peak, is_open.
+    Splitting the same rows across calls gives the same episodes.
+    """
+    T = len(ticks)
+    R = len(rule_cols)
+
+    out = {
+        "episodes": [],
+        "streak": streak.copy(),
+        "streak_start": streak_start.copy(),
+        "peak": peak.copy(),
+        "is_open": is_open.copy(),
+        "last_tick": np.full(R, np.nan),
+        "rows": np.zeros(R, dtype=np.int64),
+    }
+    if T == 0 or R == 0:
+        return out
+
+    X = values[:, rule_cols]
+    P = present[:, rule_cols] & (ticks[:, None] >= start_ticks[None, :])
+
+    V = violation_matrix(values, rule_cols, operators, thresholds) & P
+    B = P & ~V
+
+    # run id of every cell = row of the last reset at or before it (-1: run carried in)
+    rows = np.arange(T)[:, None]
+    last_break = np.maximum.accumulate(np.where(B, rows, -1), axis=0)
+
+    C = np.cumsum(V, axis=0)
+    C_at_break = np.take_along_axis(C, np.clip(last_break, 0, None), axis=0)
+    S = np.where(last_break >= 0, C - C_at_break, C + streak[None, :])
+
+    final_break = last_break[-1]
+    any_rows = P.any(axis=0)
+    last_row = T - 1 - np.argmax(P[::-1], axis=0)
+    out["last_tick"] = np.where(any_rows, ticks[last_row].astype(float), np.nan)
+    out["rows"] = P.sum(axis=0)
+    out["streak"] = S[-1].copy()
+
+    carried = streak > 0
+
+    # ---------- runs: group violating cells by (rule, run id) ----------
+    vr, vc = np.nonzero(V)
+    groups: list = []
+    if len(vr):
+        run = last_break[vr, vc]
+        order = np.lexsort((vr, run, vc))
+        vr, vc, run = vr[order], vc[order], run[order]
+
+        change = np.ones(len(vr), dtype=bool)
+        change[1:] = (vc[1:] != vc[:-1]) | (run[1:] != run[:-1])
+        starts = np.flatnonzero(change)
+        ends = np.append(starts[1:], len(vr)) - 1
+
+        g_col = vc[starts]
+        g_run = run[starts]
+        g_first = vr[starts]
+        g_last = vr[ends]
+        g_max = np.maximum.reduceat(X[vr, vc], starts)
+        g_streak = np.maximum.reduceat(S[vr, vc], starts)
+
+        g_continues = (g_run == -1) & carried[g_col]
+        g_start = np.where(g_continues, streak_start[g_col], ticks[g_first].astype(float))
+        g_peak = np.where(g_continues, np.fmax(g_max, peak[g_col]), g_max)
+        g_adopted = (g_run == -1) & is_open[g_col]
+        g_episode = g_adopted | (g_streak >= durations[g_col])
+        g_closed = g_run != final_break[g_col]
+
+        groups = list(zip(g_col, g_run, g_last, g_max, g_start, g_peak, g_adopted, g_episode, g_closed))
+        seen_adopted = np.isin(np.arange(R), g_col[g_adopted])
+    else:
+        seen_adopted = np.zeros(R, dtype=bool)
+
+    out["is_open"] = is_open & (final_break == -1)
+
+    # a reset closes the carried-in episode even if it saw no violation here
+    # (emitted first: per rule, episodes come out in tick order)
+    for col in np.flatnonzero(is_open & ~seen_adopted & (final_break >= 0)):
+        out["episodes"].append({
+            "rule": int(col),
+            "adopted": True,
+            "tick_start": None,
+            "tick_end": None,
+            "peak": None,
+            "closed": True,
+        })
+
+    for col, run, last, g_max_v, g_start_v, g_peak_v, adopted, episode, closed in groups:
+        if run == final_break[col]:
+            # run still going at the end of the batch
+            out["streak_start"][col] = g_start_v
+            out["peak"][col] = g_peak_v
+
+        if not episode:
+            continue
+
+        out["episodes"].append({
+            "rule": int(col),
+            "adopted": bool(adopted),
+            "tick_start": None if np.isnan(g_start_v) else int(g_start_v),
+            "tick_end": int(ticks[last]),
+            "peak": float(g_max_v if adopted else g_peak_v),
+            "closed": bool(closed),
+        })
+        if not closed:
+            out["is_open"][col] = True
+
+    # current run has no violation yet (reset at the end of the batch)
+    reset_now = final_break >= 0
+    no_current_run = reset_now & (out["streak"] == 0)
+    out["streak_start"][no_current_run] = np.nan
+    out["peak"][no_current_run] = np.nan
+
+    return out
+
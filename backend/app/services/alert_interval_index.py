@@ -0,0 +1,120 @@
+# app/services/alert_interval_index.py
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.db.models.alerts import AlertEvent
+
+
+class AlertIntervalIndex:
+    """
+    Sorted-endpoint index over alert intervals [tick_start, tick_end].
+
+    Overlap with a window [lo, hi] (same test as
+    `tick_start <= hi AND tick_end >= lo`) is counted as
+        #(start <= hi) - #(end < lo)
+    with two binary searches, so N windows over E intervals cost
+    O((N + E) log E). Events with a NULL end never overlap (as in SQL).
+    Inverted intervals (start > end) are rare and counted directly.
+    """
+
+    def __init__(self, starts, ends, severities=None):
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        severities = np.asarray(
+            severities if severities is not None else [None] * len(starts),
+            dtype=object,
+        )
+
+        ok = starts <= ends
+        self._starts = np.sort(starts[ok])
+        self._ends = np.sort(ends[ok])
+        self._odd_starts = starts[~ok]
+        self._odd_ends = ends[~ok]
+
+        # raw arrays kept for severity sub-indexes
+        self._raw = (starts, ends, severities)
+
+    def __len__(self) -> int:
+        return len(self._raw[0])
+
+    # ---------- BUILDERS ----------
+    @classmethod
+    def from_events(cls, events: Iterable) -> "AlertIntervalIndex":
+        events = [e for e in events if e.tick_start is not None and e.tick_end is not None]
+        return cls(
+            [e.tick_start for e in events],
+            [e.tick_end for e in events],
+            [e.severity for e in events],
+        )
+
+    @classmethod
+    def load(
+        cls,
+        db: Session,
+        component_code: Optional[str] = None,
+        origin: Optional[str] = None,
+        status: Optional[str] = None,
+        from_tick: Optional[int] = None,
+        to_tick: Optional[int] = None,
+    ) -> "AlertIntervalIndex":
+        """
+        One query; from_tick / to_tick prune events that cannot overlap the
+        range that will be asked about.
+        """
+        q = db.query(AlertEvent.tick_start, AlertEvent.tick_end, AlertEvent.severity).filter(
+            AlertEvent.tick_start.isnot(None),
+            AlertEvent.tick_end.isnot(None),
+        )
+        if component_code is not None:
+            q = q.filter(AlertEvent.component_code == component_code)
+        if origin is not None:
+            q = q.filter(AlertEvent.origin == origin)
+        if status is not None:
+            q = q.filter(AlertEvent.status == status)
+        if to_tick is not None:
+            q = q.filter(AlertEvent.tick_start <= to_tick)
+        if from_tick is not None:
+            q = q.filter(AlertEvent.tick_end >= from_tick)
+
+        return cls.from_events(q.all())
+
+    def with_severity(self, severity: str) -> "AlertIntervalIndex":
+        starts, ends, severities = self._raw
+        mask = severities == severity
+        return AlertIntervalIndex(starts[mask], ends[mask], severities[mask])
+
+    # ---------- QUERIES ----------
+    def overlap_counts(self, lo, hi) -> np.ndarray:
+        """
+        Number of intervals overlapping each window [lo[i], hi[i]].
+        """
+        lo = np.atleast_1d(np.asarray(lo, dtype=np.int64))
+        hi = np.atleast_1d(np.asarray(hi, dtype=np.int64))
+
+        counts = (
+            np.searchsorted(self._starts, hi, side="right")
+            - np.searchsorted(self._ends, lo, side="left")
+        )
+
+        if len(self._odd_starts):
+            counts = counts + (
+                (self._odd_starts[None, :] <= hi[:, None])
+                & (self._odd_ends[None, :] >= lo[:, None])
+            ).sum(axis=1)
+
+        return counts
+
+    def active_at(self, ticks) -> np.ndarray:
+        """
+        Number of intervals containing each tick.
+        """
+        return self.overlap_counts(ticks, ticks)
+
+    def overlap_counts_by_severity(self, lo, hi) -> Dict[str, np.ndarray]:
+        _, _, severities = self._raw
+        return {
+            sev: self.with_severity(sev).overlap_counts(lo, hi)
+            for sev in sorted({s for s in severities if s is not None})
+        }
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 
 from app.db.models.alerts import AlertEvent
 from app.core.config import settings
-from app.services.email_service import send_email
+from app.services.notification_dispatcher import enqueue_email
 
 
 def notify_admin_for_real_alerts(
@@ -11,7 +11,8 @@ def notify_admin_for_real_alerts(
     alerts: List[AlertEvent],
 ):
     """
-    Send ONE summary email for newly created REAL alerts.
+    Queue ONE summary email for newly created REAL alerts.
+    Goes to the outbox in the caller's transaction (does NOT commit).
     """
 
     if not alerts:
@@ -42,7 +43,9 @@ def notify_admin_for_real_alerts(
 
     body = "\n".join(lines)
 
-    send_email(
+    enqueue_email(
+        db,
+        kind="alert_summary",
         to_email=settings.SMTP_FROM_EMAIL,  # admin inbox (MailHog)
         subject="🚨 PlatformOPS – Alert Summary",
         text=body,
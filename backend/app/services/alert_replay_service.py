@@ -0,0 +1,427 @@
+# app/services/alert_replay_service.py
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+from app.db.models.alerts import AlertRule, AlertEvent, AlertRuleState
+from app.db.models.signals import Signal
+from app.services.alert_engine import OPERATORS, fold_rule_matrix, violation_matrix
+from app.services.alert_service import EVAL_CHUNK_TICKS
+from app.services.signal_points_service import fetch_signal_matrix, latest_signal_ticks
+
+# (lo, hi) -> (ticks, values, present) of one component, like fetch_signal_matrix
+Fetch = Callable[[int, int], Tuple[np.ndarray, np.ndarray, np.ndarray]]
+
+
+# ---------- NUMPY ----------
+def _seed_ticks(
+    fetch: Fetch,
+    rule_cols: np.ndarray,
+    operators: Sequence[str],
+    thresholds: np.ndarray,
+    from_tick: int,
+    first_stored: Optional[int],
+    chunk_ticks: int,
+) -> np.ndarray:
+    """
+    Per rule, the tick to start folding from so that the streak at
+    from_tick is exact: its last reset (present, non-violating row) before
+    from_tick, else the first stored tick. Walks back chunk by chunk.
+    """
+    R = len(rule_cols)
+    floor = from_tick if first_stored is None else min(int(first_stored), from_tick)
+    seeds = np.full(R, floor, dtype=np.int64)
+    found = np.zeros(R, dtype=bool)
+
+    hi = from_tick - 1
+    while hi >= floor and not found.all():
+        lo = max(hi - chunk_ticks + 1, floor)
+        ticks, values, present = fetch(lo, hi)
+        if len(ticks):
+            B = present[:, rule_cols] & ~violation_matrix(values, rule_cols, operators, thresholds)
+            hit = B.any(axis=0) & ~found
+            last_row = len(ticks) - 1 - np.argmax(B[::-1], axis=0)
+            seeds[hit] = ticks[last_row[hit]]
+            found |= hit
+        hi = lo - 1
+
+    return seeds
+
+
+def replay_intervals(
+    fetch: Fetch,
+    rule_cols: np.ndarray,
+    operators: Sequence[str],
+    thresholds: np.ndarray,
+    durations: np.ndarray,
+    from_tick: int,
+    end_tick: int,
+    first_stored: Optional[int],
+    last_stored: Optional[int],
+    chunk_ticks: int = EVAL_CHUNK_TICKS,
+) -> Dict[str, Any]:
+    """
+    Every violation interval of R rules that overlaps [from_tick, end_tick],
+    in full: the fold starts at each rule's last reset before from_tick
+    (so an interval already running at from_tick keeps its real
+    tick_start), and an interval still running at end_tick is followed
+    until it closes or the data ends at last_stored. first_stored is the
+    first stored tick before from_tick (None: nothing before it).
+
+    Returns {"closed": [{rule, tick_start, tick_end, peak}], "running":
+    interval or None per rule (still violating at the last scanned tick),
+    "scan_end": last tick scanned per rule, the fold state after the scan
+    ("streak", "streak_start", "peak", "last_tick"), "scanned_ticks"}.
+    """
+    R = len(rule_cols)
+    start_ticks = _seed_ticks(fetch, rule_cols, operators, thresholds, from_tick, first_stored, chunk_ticks)
+    data_end = end_tick if last_stored is None else max(int(last_stored), end_tick)
+
+    streak = np.zeros(R, dtype=np.int64)
+    streak_start = np.full(R, np.nan)
+    peak = np.full(R, np.nan)
+    is_open = np.zeros(R, dtype=bool)
+    seen_tick = np.full(R, np.nan)
+
+    closed: List[Dict[str, Any]] = []
+    running: List[Optional[Dict[str, Any]]] = [None] * R
+    scanned = 0
+
+    lo = int(start_ticks.min()) if R else end_tick + 1
+    while lo <= end_tick or (any(running) and lo <= data_end):
+        hi = lo + chunk_ticks - 1
+        if lo <= end_tick:
+            hi = min(hi, end_tick)
+        ticks, values, present = fetch(lo, hi)
+        scanned += len(ticks)
+
+        out = fold_rule_matrix(
+            ticks, values, present,
+            rule_cols, operators, thresholds, durations, start_ticks,
+            streak, streak_start, peak, is_open,
+        )
+
+        for ep in out["episodes"]:
+            i = ep["rule"]
+            if ep["adopted"]:
+                interval = running[i]
+                if interval is None:
+                    # continuation of an interval starting after end_tick
+                    continue
+                if ep["tick_end"] is not None:
+                    interval["tick_end"] = ep["tick_end"]
+                    interval["peak"] = max(interval["peak"], ep["peak"])
+            elif ep["tick_start"] > end_tick:
+                continue
+            else:
+                interval = {
+                    "rule": i,
+                    "tick_start": ep["tick_start"],
+                    "tick_end": ep["tick_end"],
+                    "peak": ep["peak"],
+                }
+
+            if ep["closed"]:
+                # intervals over before from_tick are outside the replay
+                if interval["tick_end"] >= from_tick:
+                    closed.append(interval)
+                running[i] = None
+            else:
+                running[i] = interval
+
+        streak, streak_start, peak, is_open = (
+            out["streak"], out["streak_start"], out["peak"], out["is_open"]
+        )
+        seen_tick = np.where(np.isnan(out["last_tick"]), seen_tick, out["last_tick"])
+        lo = hi + 1
+
+    # a rule's scan reaches past end_tick only to finish its interval
+    scan_end = np.full(R, end_tick, dtype=np.int64)
+    for interval in closed:
+        scan_end[interval["rule"]] = max(scan_end[interval["rule"]], interval["tick_end"])
+    for i, interval in enumerate(running):
+        if interval is not None:
+            scan_end[i] = data_end
+
+    return {
+        "closed": closed,
+        "running": running,
+        "scan_end": scan_end,
+        "streak": streak,
+        "streak_start": streak_start,
+        "peak": peak,
+        "last_tick": seen_tick,
+        "scanned_ticks": scanned,
+    }
+
+
+# ---------- DB ----------
+def _first_signal_tick(db: Session, signal_ids: List[int], before: int) -> Optional[int]:
+    return db.execute(
+        text("""
+            SELECT min(tick)
+            FROM signal_points
+            WHERE signal_id = ANY(:ids) AND tick < :before
+        """),
+        {"ids": signal_ids, "before": before},
+    ).scalar()
+
+
+def _event_row(rule: AlertRule, component_code: str, interval: Dict[str, Any], status: str) -> Dict[str, Any]:
+    return {
+        "rule_id": rule.id,
+        "component_code": component_code,
+        "signal_code": rule.signal_code,
+        "tick_start": interval["tick_start"],
+        "tick_end": interval["tick_end"],
+        "peak_value": interval["peak"],
+        "severity": rule.severity,
+        "status": status,
+        "origin": "REAL",
+    }
+
+
+_SPANS = """
+    unnest(CAST(:rule_ids AS integer[]), CAST(:los AS integer[]), CAST(:his AS integer[]))
+        AS s(rule_id, lo, hi)
+"""
+
+
+def _replace_spans(db: Session, spans: Dict[int, Tuple[int, int]]) -> Dict[str, int]:
+    """
+    Make room for the rebuilt intervals: per rule, REAL events lying inside
+    its span [lo, hi] are deleted (incident links first), events sticking
+    out of it are clipped to the part outside, so no history outside the
+    span is lost.
+    """
+    if not spans:
+        return {"deleted": 0, "clipped": 0}
+
+    rule_ids = sorted(spans)
+    params = {
+        "rule_ids": rule_ids,
+        "los": [int(spans[r][0]) for r in rule_ids],
+        "his": [int(spans[r][1]) for r in rule_ids],
+    }
+    inside = f"""
+        SELECT e.id
+        FROM alert_events e
+        JOIN {_SPANS} ON s.rule_id = e.rule_id
+        WHERE e.origin = 'REAL'
+          AND e.tick_start >= s.lo
+          AND COALESCE(e.tick_end, e.tick_start) <= s.hi
+    """
+
+    db.execute(text(f"DELETE FROM incident_alerts WHERE alert_event_id IN ({inside})"), params)
+    deleted = db.execute(text(f"DELETE FROM alert_events WHERE id IN ({inside})"), params).rowcount
+
+    # started before the span: keep the head (an event spanning both edges keeps its head only)
+    clipped = db.execute(
+        text(f"""
+            UPDATE alert_events e
+            SET tick_end = s.lo - 1, status = 'CLOSED'
+            FROM {_SPANS}
+            WHERE e.rule_id = s.rule_id
+              AND e.origin = 'REAL'
+              AND e.tick_start < s.lo
+              AND COALESCE(e.tick_end, e.tick_start) >= s.lo
+        """),
+        params,
+    ).rowcount
+
+    # runs on past the span: keep the tail
+    clipped += db.execute(
+        text(f"""
+            UPDATE alert_events e
+            SET tick_start = s.hi + 1
+            FROM {_SPANS}
+            WHERE e.rule_id = s.rule_id
+              AND e.origin = 'REAL'
+              AND e.tick_start BETWEEN s.lo AND s.hi
+              AND e.tick_end > s.hi
+        """),
+        params,
+    ).rowcount
+
+    return {"deleted": deleted or 0, "clipped": clipped or 0}
+
+
+def replay_alerts(
+    db: Session,
+    from_tick: int,
+    to_tick: Optional[int] = None,
+    rule_ids: Optional[List[int]] = None,
+) -> Dict[str, Any]:
+    """
+    Rebuild REAL alert history over [from_tick, to_tick] after rules changed.
+
+    Each component's range is scanned once (in EVAL_CHUNK_TICKS slices) and
+    every violation interval of every rule is emitted by alert_engine's
+    run-length fold, then bulk-inserted. Intervals overlapping the range
+    are rebuilt in full (replay_intervals); existing REAL events of those
+    rules inside the rebuilt span are replaced, the ones straddling its
+    edges are clipped.
+
+    With to_tick=None the replay runs to the latest tick: intervals still
+    running stay OPEN and the rules' incremental state is rebuilt, so
+    evaluate_alerts continues exactly where the replay stopped.
+    Otherwise rule state is untouched, so the rebuilt span must stay below
+    the watermark of every rule that has one, and clear of its OPEN event
+    (ValueError otherwise). Does NOT notify.
+    """
+    if to_tick is not None and to_tick < from_tick:
+        raise ValueError("to_tick must be >= from_tick")
+
+    started = time.perf_counter()
+    origin = "REAL"
+    to_latest = to_tick is None
+
+    q = db.query(AlertRule).filter(AlertRule.enabled == True)
+    if rule_ids:
+        q = q.filter(AlertRule.id.in_(rule_ids))
+    rules = [r for r in q.all() if r.operator in OPERATORS]
+
+    signals = {
+        s.signal_code: s
+        for s in db.query(Signal).filter(
+            Signal.signal_code.in_(sorted({r.signal_code for r in rules}))
+        ).all()
+    }
+    rules = [r for r in rules if r.signal_code in signals]
+
+    by_component: Dict[str, List[AlertRule]] = {}
+    for rule in rules:
+        by_component.setdefault(signals[rule.signal_code].component_code, []).append(rule)
+
+    latest = latest_signal_ticks(db, [s.id for s in signals.values()])
+    last_tick = max(latest.values()) if latest else None
+    end_tick = to_tick
+    if to_latest:
+        end_tick = from_tick if last_tick is None else max(last_tick, from_tick)
+
+    # ---------- scan (no writes yet) ----------
+    closed_rows: List[Dict[str, Any]] = []
+    running_rows: List[Tuple[AlertRule, Dict[str, Any]]] = []
+    spans: Dict[int, Tuple[int, int]] = {}
+    replayed: List[Tuple[AlertRule, Dict[str, Any], int]] = []
+    scanned_ticks = 0
+
+    for component_code, comp_rules in by_component.items():
+        signal_ids = sorted({signals[r.signal_code].id for r in comp_rules})
+        col_of = {sid: i for i, sid in enumerate(signal_ids)}
+
+        result = replay_intervals(
+            lambda lo, hi: fetch_signal_matrix(db, signal_ids, from_tick=lo, to_tick=hi),
+            np.array([col_of[signals[r.signal_code].id] for r in comp_rules]),
+            [r.operator for r in comp_rules],
+            np.array([r.threshold for r in comp_rules], dtype=float),
+            np.array([r.min_duration_ticks for r in comp_rules]),
+            from_tick,
+            end_tick,
+            _first_signal_tick(db, signal_ids, from_tick),
+            last_tick,
+        )
+        scanned_ticks += result["scanned_ticks"]
+
+        for i, rule in enumerate(comp_rules):
+            lo, hi = from_tick, int(result["scan_end"][i])
+            for interval in [c for c in result["closed"] if c["rule"] == i] + [result["running"][i]]:
+                if interval is not None:
+                    lo = min(lo, interval["tick_start"])
+            spans[rule.id] = (lo, hi)
+            replayed.append((rule, result, i))
+
+        closed_rows.extend(
+            _event_row(comp_rules[c["rule"]], component_code, c, "CLOSED") for c in result["closed"]
+        )
+        running_rows.extend(
+            (rule, _event_row(rule, component_code, result["running"][i], "OPEN"))
+            for i, rule in enumerate(comp_rules)
+            if result["running"][i] is not None
+        )
+
+    # ---------- guard the incremental state ----------
+    states = {
+        st.rule_id: st
+        for st in db.query(AlertRuleState).filter(
+            AlertRuleState.origin == origin,
+            AlertRuleState.rule_id.in_([r.id for r in rules]),
+        ).all()
+    }
+
+    if not to_latest:
+        open_ids = [st.open_event_id for st in states.values() if st.open_event_id]
+        open_starts = {
+            e.id: e.tick_start
+            for e in db.query(AlertEvent).filter(AlertEvent.id.in_(open_ids)).all()
+        } if open_ids else {}
+
+        for rule in rules:
+            state = states.get(rule.id)
+            if state is None:
+                continue
+            lo, hi = spans[rule.id]
+            if state.last_tick is not None and state.last_tick <= hi:
+                raise ValueError(
+                    f"Rule {rule.id} is evaluated up to tick {state.last_tick}, inside the replayed "
+                    f"span [{lo}, {hi}]; replay with to_tick=None (up to the latest tick) instead"
+                )
+            open_start = open_starts.get(state.open_event_id)
+            if open_start is not None and open_start <= hi:
+                raise ValueError(
+                    f"Rule {rule.id} has an OPEN alert since tick {open_start}, inside the replayed "
+                    f"span [{lo}, {hi}]; replay with to_tick=None (up to the latest tick) instead"
+                )
+
+    # ---------- write ----------
+    replaced = _replace_spans(db, spans)
+
+    if to_latest and states:
+        db.query(AlertRuleState).filter(
+            AlertRuleState.rule_id.in_(list(states))
+        ).filter(AlertRuleState.origin == origin).delete(synchronize_session=False)
+
+    # closed history in one multi-row INSERT; the few OPEN ones need ids
+    if closed_rows:
+        db.execute(AlertEvent.__table__.insert(), closed_rows)
+
+    # still running at the latest tick: OPEN (a rule without state adopts
+    # it on its next evaluation)
+    open_events = {rule.id: AlertEvent(**row) for rule, row in running_rows}
+    db.add_all(open_events.values())
+    db.flush()
+
+    rebuilt_states: List[AlertRuleState] = []
+    if to_latest:
+        for rule, result, i in replayed:
+            seen = result["last_tick"][i]
+            event = open_events.get(rule.id)
+            rebuilt_states.append(AlertRuleState(
+                rule_id=rule.id,
+                origin=origin,
+                last_tick=None if np.isnan(seen) else int(seen),
+                streak=int(result["streak"][i]),
+                streak_start_tick=None if np.isnan(result["streak_start"][i]) else int(result["streak_start"][i]),
+                peak_value=None if np.isnan(result["peak"][i]) else float(result["peak"][i]),
+                open_event_id=event.id if event is not None else None,
+            ))
+        db.add_all(rebuilt_states)
+
+    db.commit()
+
+    return {
+        "from_tick": from_tick,
+        "to_tick": end_tick,
+        "rules": len(rules),
+        "components": len(by_component),
+        "scanned_ticks": scanned_ticks,
+        "deleted_events": replaced["deleted"],
+        "clipped_events": replaced["clipped"],
+        "created_events": len(closed_rows) + len(open_events),
+        "open_events": len(open_events),
+        "state_rebuilt": to_latest,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 
 from app.db.models.alerts import AlertRule
 from app.db.models.signals import Signal
-from app.observability.baseline import metric_baseline
+from app.observability.baseline import bulk_baselines
 from app.observability.metric_families import detect_family
 
 
@@ -16,14 +16,12 @@ def generate_rules_for_all_metrics(db: Session) -> int:
     existing = {r.signal_code for r in db.query(AlertRule.signal_code).all()}
     created = 0
 
-    signals = db.query(Signal).all()
+    signals = [s for s in db.query(Signal).all() if s.signal_code not in existing]
+    baselines = bulk_baselines(db, signals)
 
     for s in signals:
-        if s.signal_code in existing:
-            continue
-
         family = detect_family(s.column_name)
-        baseline = metric_baseline(db, s.component_code, s.column_name)
+        baseline = baselines.get(s.signal_code)
 
         rules = []
 
@@ -1,34 +1,18 @@
 # app/services/alert_rule_service.py
-import statistics
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from app.db.models.alerts import AlertRule
 from app.db.models.signals import Signal
+from app.observability.baseline import bulk_baselines
 
 
-def _baseline(db: Session, signal: Signal, window: int = 50):
-    rows = db.execute(
-        text("""
-            SELECT (payload ->> :column)::double precision AS value
-            FROM timeseries_points
-            WHERE component_code = :component
-              AND payload ? :column
-            ORDER BY tick DESC
-            LIMIT :window
-        """),
-        {
-            "column": signal.column_name,
-            "component": signal.component_code,
-            "window": window,
-        },
-    ).fetchall()
-
-    values = [r.value for r in rows if r.value is not None]
-
-    if len(values) < 5:
-        return None, None
-
-    return statistics.mean(values), statistics.stdev(values)
+def _baselines(db: Session, signals, window: int = 50):
+    """
+    {signal_code: (mean, stdev)}; (None, None) when there is too little data.
+    """
+    return {
+        code: (b["mean"], b["stdev"]) if b else (None, None)
+        for code, b in bulk_baselines(db, signals, window).items()
+    }
 
 
 def generate_rules_for_all_signals(db: Session) -> int:
@@ -38,11 +22,11 @@ def generate_rules_for_all_signals(db: Session) -> int:
 
     created = 0
 
-    for s in db.query(Signal).all():
-        if s.signal_code in existing:
-            continue
+    signals = [s for s in db.query(Signal).all() if s.signal_code not in existing]
+    baselines = _baselines(db, [s for s in signals if s.signal_type == "xi"])
 
-        mean, std = _baseline(db, s)
+    for s in signals:
+        mean, std = baselines.get(s.signal_code, (None, None))
 
         # ---------------- xi ----------------
         if s.signal_type == "xi":
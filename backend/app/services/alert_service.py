@@ -1,23 +1,20 @@
 # app/services/alert_service.py
 from __future__ import annotations
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
+import numpy as np
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 
-from app.db.models.alerts import AlertRule, AlertEvent
+from app.db.models.alerts import AlertRule, AlertEvent, AlertRuleState
 from app.db.models.signals import Signal
+from app.services.alert_engine import OPERATORS, fold_rule_matrix
+from app.services.signal_points_service import fetch_signal_matrix, latest_signal_ticks
 from app.services.alert_notification_serice import notify_admin_for_real_alerts
 
 
-OPERATORS = {
-    "gt":  lambda v, t: v > t,
-    "gte": lambda v, t: v >= t,
-    "lt":  lambda v, t: v < t,
-    "lte": lambda v, t: v <= t,
-    "eq":  lambda v, t: v == t,
-    "ne":  lambda v, t: v != t,
-}
+# rows per matrix fetch; bounds memory after a long gap since the last run
+EVAL_CHUNK_TICKS = 50000
 
 
 def _close_all_open_baseline(db: Session, rule_id: int):
@@ -34,136 +31,317 @@ def _delete_simulated_for_rule(db: Session, rule_id: int):
     ).delete()
 
 
-def evaluate_alerts(
-    db: Session,
-    lookback_ticks: int = 200,
-    simulation_mode: bool = False,
-) -> Dict[str, Any]:
+def reset_alert_state(db: Session, origin: Optional[str] = None):
+    """
+    Forget every watermark (next evaluation re-scans the lookback window).
+    Does NOT commit.
+    """
+    q = db.query(AlertRuleState)
+    if origin:
+        q = q.filter(AlertRuleState.origin == origin)
+    q.delete(synchronize_session=False)
 
-    rules = db.query(AlertRule).filter(AlertRule.enabled == True).all()
-    signals = {s.signal_code: s for s in db.query(Signal).all()}
 
-    evaluated = created = closed = updated = 0
-    origin = "SIMULATED" if simulation_mode else "REAL"
-
-    # 🔔 Track newly created REAL alerts
-    new_real_alerts: List[AlertEvent] = []
+def invalidate_alert_state(
+    db: Session,
+    signal_ids: List[int],
+    from_tick: int,
+    origin: Optional[str] = None,
+):
+    """
+    Forget the watermark of every rule on `signal_ids` that already folded
+    ticks >= from_tick (their values were rewritten), so the next
+    evaluation re-scans its lookback window. Does NOT commit.
+    """
+    if not signal_ids:
+        return
+
+    rule_ids = (
+        db.query(AlertRule.id)
+        .join(Signal, Signal.signal_code == AlertRule.signal_code)
+        .filter(Signal.id.in_(list(signal_ids)))
+    )
+    q = db.query(AlertRuleState).filter(
+        AlertRuleState.rule_id.in_(rule_ids.scalar_subquery()),
+        AlertRuleState.last_tick >= from_tick,
+    )
+    if origin:
+        q = q.filter(AlertRuleState.origin == origin)
+    q.delete(synchronize_session=False)
+
+
+# used by the COPY loader, on its raw cursor, right after the signal_points
+# upsert: rules that already folded a (re)written tick re-scan (both origins,
+# see invalidate_alert_state)
+STAGE_INVALIDATE_ALERT_STATE_SQL = """
+    DELETE FROM alert_rule_state st
+    USING alert_rules r, signals sig, (
+        SELECT signal_id, min(tick) AS first_tick
+        FROM _signal_points_stage
+        GROUP BY signal_id
+    ) s
+    WHERE st.rule_id = r.id
+      AND r.signal_code = sig.signal_code
+      AND sig.id = s.signal_id
+      AND st.last_tick >= s.first_tick
+"""
+
+
+def _none_if_nan(value) -> Optional[float]:
+    return None if value is None or np.isnan(value) else float(value)
+
+
+def _nan_if_none(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+def _evaluate_component(
+    db: Session,
+    items: List[Tuple[AlertRule, Signal, AlertRuleState]],
+    open_events: Dict[int, AlertEvent],
+    lookback_ticks: int,
+    origin: str,
+    known_ends: Dict[int, int],
+    counters: Dict[str, Any],
+    new_events: List[AlertEvent],
+    open_after: List[Tuple[AlertRuleState, Optional[AlertEvent]]],
+):
+    """
+    All rules of one component against one ticks x signals matrix.
+    New events go to `new_events`; each touched state is paired with the
+    event it ends up attached to in `open_after` (ids exist after the flush).
+    Closed episodes ending at or before `known_ends[rule_id]` (the latest
+    tick_end already stored for a rule re-scanning its lookback) are
+    duplicates of existing events and are skipped.
+    """
+    signal_ids = sorted({signal.id for _, signal, _ in items})
+    col_of = {sid: i for i, sid in enumerate(signal_ids)}
+    latest = latest_signal_ticks(db, signal_ids)
+    if not latest:
+        return
+
+    rules = [rule for rule, _, _ in items]
+    states = [state for _, _, state in items]
+    R = len(items)
+
+    start_ticks = np.empty(R, dtype=np.int64)
+    for i, (rule, signal, state) in enumerate(items):
+        if state.last_tick is not None:
+            start_ticks[i] = state.last_tick + 1
+        elif signal.id in latest:
+            start_ticks[i] = latest[signal.id] - lookback_ticks + 1
+        else:
+            start_ticks[i] = np.iinfo(np.int64).max
+
+    last_needed = max(latest.values())
+    first_needed = int(start_ticks.min())
+    if first_needed > last_needed:
+        return
+
+    rule_cols = np.array([col_of[signal.id] for _, signal, _ in items])
+    operators = [rule.operator for rule in rules]
+    thresholds = np.array([rule.threshold for rule in rules], dtype=float)
+    durations = np.array([rule.min_duration_ticks for rule in rules])
+
+    streak = np.array([st.streak or 0 for st in states])
+    streak_start = np.array([_nan_if_none(st.streak_start_tick) for st in states])
+    peak = np.array([_nan_if_none(st.peak_value) for st in states])
+
+    current: List[Optional[AlertEvent]] = [
+        open_events.get(st.open_event_id) if st.open_event_id else None
+        for st in states
+    ]
+    is_open = np.array([e is not None for e in current])
+    last_tick = np.array([_nan_if_none(st.last_tick) for st in states])
+    rows = np.zeros(R, dtype=np.int64)
+
+    for lo in range(first_needed, last_needed + 1, EVAL_CHUNK_TICKS):
+        ticks, values, present = fetch_signal_matrix(
+            db, signal_ids, from_tick=lo, to_tick=lo + EVAL_CHUNK_TICKS - 1,
+        )
 
-    for rule in rules:
-        signal = signals.get(rule.signal_code)
-        if not signal:
-            continue
+        out = fold_rule_matrix(
+            ticks, values, present,
+            rule_cols, operators, thresholds, durations, start_ticks,
+            streak, streak_start, peak, is_open,
+        )
 
-        op = OPERATORS.get(rule.operator)
-        if not op:
-            continue
+        # ---------- STATE TRANSITIONS ----------
+        for ep in out["episodes"]:
+            i = ep["rule"]
+            rule = rules[i]
+
+            if ep["adopted"]:
+                alert = current[i]
+                if ep["tick_end"] is not None:
+                    alert.tick_end = ep["tick_end"]
+                    alert.peak_value = ep["peak"] if alert.peak_value is None else max(alert.peak_value, ep["peak"])
+                if ep["closed"]:
+                    alert.status = "CLOSED"
+                    counters["closed_events"] += 1
+                else:
+                    counters["updated_events"] += 1
+            else:
+                known = known_ends.get(rule.id)
+                if ep["closed"] and known is not None and ep["tick_end"] <= known:
+                    counters["skipped_events"] += 1
+                    current[i] = None
+                    continue
 
-        # Fetch existing OPEN alert (if any)
-        open_alert = (
-        db.query(AlertEvent)
-         .filter(
-            AlertEvent.rule_id == rule.id,
-            AlertEvent.component_code == signal.component_code,
-             AlertEvent.status == "OPEN",
-            AlertEvent.origin == origin,
+                signal = items[i][1]
+                alert = AlertEvent(
+                    rule_id=rule.id,
+                    component_code=signal.component_code,
+                    signal_code=signal.signal_code,
+                    tick_start=ep["tick_start"],
+                    tick_end=ep["tick_end"],
+                    peak_value=ep["peak"],
+                    severity=rule.severity,
+                    status="CLOSED" if ep["closed"] else "OPEN",
+                    origin=origin,
                 )
-        .order_by(AlertEvent.id.desc())
-        .first()
-        )
+                new_events.append(alert)
+                counters["created_events"] += 1
+
+            current[i] = None if ep["closed"] else alert
 
+        streak, streak_start, peak, is_open = (
+            out["streak"], out["streak_start"], out["peak"], out["is_open"]
+        )
+        last_tick = np.where(np.isnan(out["last_tick"]), last_tick, out["last_tick"])
+        rows += out["rows"]
 
-        sql = """
-            SELECT tick,
-                   (payload ->> :column)::double precision AS value
-            FROM timeseries_points
-            WHERE component_code = :component
-              AND payload ? :column
-            ORDER BY tick DESC
-            LIMIT :limit
-        """
-
-        rows = db.execute(
-            text(sql),
-            {
-                "component": signal.component_code,
-                "column": signal.column_name,
-                "limit": lookback_ticks,
-            },
-        ).fetchall()
-
-        if not rows:
+    for i, state in enumerate(states):
+        if not rows[i]:
             continue
+        state.last_tick = int(last_tick[i])
+        state.streak = int(streak[i])
+        state.streak_start_tick = None if np.isnan(streak_start[i]) else int(streak_start[i])
+        state.peak_value = _none_if_nan(peak[i])
+        open_after.append((state, current[i]))
+
+    counters["evaluated_rules"] += int((rows > 0).sum())
+    counters["processed_points"] += int(rows.sum())
+
+
+def _adopt_open_event(state: AlertRuleState, rule: AlertRule, alert: AlertEvent):
+    """
+    Seed a fresh state from the rule's OPEN event: the fold resumes right
+    after the event's tick_end with the violation streak still running, so
+    the ticks it already covers are neither re-closed nor re-inserted.
+    """
+    state.open_event_id = alert.id
+    last = alert.tick_end if alert.tick_end is not None else alert.tick_start
+    if last is None:
+        return
+
+    state.last_tick = int(last)
+    state.streak_start_tick = alert.tick_start
+    state.streak = max(
+        int(last - alert.tick_start + 1) if alert.tick_start is not None else 0,
+        int(rule.min_duration_ticks or 1),
+    )
+    state.peak_value = alert.peak_value
 
-        rows = list(reversed(rows))
 
-        streak = 0
-        start_tick = None
-        peak = None
-        violated_now = False
+def evaluate_alerts(
+    db: Session,
+    lookback_ticks: int = 200,
+    simulation_mode: bool = False,
+    full_rescan: bool = False,
+) -> Dict[str, Any]:
+    """
+    Incremental, vectorized evaluation of every enabled rule:
+      - one signal_points fetch per component for all of its rule columns
+      - all OPEN events and rule states loaded in one query each
+      - streaks for all rules folded with NumPy (alert_engine.fold_rule_matrix)
+    Each rule only folds ticks newer than its watermark (alert_rule_state).
+    A rule seen for the first time, or every rule with full_rescan=True,
+    starts from the last `lookback_ticks` ticks.
+    """
+    origin = "SIMULATED" if simulation_mode else "REAL"
 
-        for tick, value in rows:
-            if value is None:
-                streak = 0
-                start_tick = None
-                peak = None
-                continue
+    if full_rescan:
+        reset_alert_state(db, origin)
+        db.flush()
 
-            if op(value, rule.threshold):
-                streak += 1
-                peak = value if peak is None else max(peak, value)
-                start_tick = start_tick or tick
+    rules = db.query(AlertRule).filter(AlertRule.enabled == True).all()
+    signals = {s.signal_code: s for s in db.query(Signal).all()}
 
-                if streak >= rule.min_duration_ticks:
-                    violated_now = True
-                    break
-            else:
-                streak = 0
-                start_tick = None
-                peak = None
+    states = {
+        st.rule_id: st
+        for st in db.query(AlertRuleState).filter(AlertRuleState.origin == origin).all()
+    }
 
-        # ---------- STATE TRANSITIONS ----------
+    open_events = {
+        e.id: e
+        for e in db.query(AlertEvent).filter(
+            AlertEvent.status == "OPEN",
+            AlertEvent.origin == origin,
+        ).order_by(AlertEvent.id).all()
+    }
+    # rules without state adopt their latest OPEN event (pre-watermark data / rescan)
+    latest_open_by_rule = {e.rule_id: e for e in open_events.values()}
+
+    # ... and must not re-create episodes they already recorded
+    known_ends: Dict[int, int] = {}
+    if any(rule.id not in states for rule in rules):
+        known_ends = {
+            rule_id: int(tick_end)
+            for rule_id, tick_end in db.query(AlertEvent.rule_id, func.max(AlertEvent.tick_end))
+            .filter(AlertEvent.origin == origin, AlertEvent.tick_end.isnot(None))
+            .group_by(AlertEvent.rule_id)
+            .all()
+            if rule_id not in states
+        }
+
+    by_component: Dict[str, List[Tuple[AlertRule, Signal, AlertRuleState]]] = {}
+    for rule in rules:
+        signal = signals.get(rule.signal_code)
+        if not signal or rule.operator not in OPERATORS:
+            continue
 
-        if violated_now:
-            if open_alert:
-                open_alert.tick_end = tick
-                open_alert.peak_value = max(open_alert.peak_value, peak)
-                updated += 1
-            else:
-                alert = AlertEvent(
-                    rule_id=rule.id,
-                    component_code=signal.component_code,
-                    signal_code=signal.signal_code,
-                    tick_start=start_tick,
-                    tick_end=tick,
-                    peak_value=peak,
-                    severity=rule.severity,
-                    status="OPEN",
-                    origin=origin,
-                )
+        state = states.get(rule.id)
+        if state is None:
+            state = AlertRuleState(rule_id=rule.id, origin=origin, streak=0)
+            open_alert = latest_open_by_rule.get(rule.id)
+            if open_alert and open_alert.component_code == signal.component_code:
+                _adopt_open_event(state, rule, open_alert)
+            db.add(state)
+
+        by_component.setdefault(signal.component_code, []).append((rule, signal, state))
+
+    counters = {
+        "evaluated_rules": 0,
+        "processed_points": 0,
+        "created_events": 0,
+        "updated_events": 0,
+        "closed_events": 0,
+        "skipped_events": 0,
+    }
+    new_events: List[AlertEvent] = []
+    open_after: List[Tuple[AlertRuleState, Optional[AlertEvent]]] = []
 
-                db.add(alert)
-                created += 1
+    for items in by_component.values():
+        _evaluate_component(
+            db, items, open_events, lookback_ticks, origin, known_ends,
+            counters, new_events, open_after,
+        )
 
-                # 🔔 Collect REAL alerts only
-                if origin == "REAL":
-                    new_real_alerts.append(alert)
-        else:
-            if open_alert:
-                open_alert.status = "CLOSED"
-                closed += 1
+    # one batched INSERT for every new event, then link the states
+    db.add_all(new_events)
+    db.flush()
+    for state, alert in open_after:
+        state.open_event_id = alert.id if alert is not None else None
 
-        evaluated += 1
+    # 🔔 ONE email for REAL alerts (outbox, same transaction)
+    if origin == "REAL" and new_events:
+        notify_admin_for_real_alerts(db, new_events)
 
     db.commit()
 
-    # 🔔 Send ONE email for REAL alerts
-    if origin == "REAL" and new_real_alerts:
-        notify_admin_for_real_alerts(db, new_real_alerts)
-
     return {
-        "evaluated_rules": evaluated,
-        "created_events": created,
-        "updated_events": updated,
-        "closed_events": closed,
+        **counters,
         "origin": origin,
+        "full_rescan": full_rescan,
     }
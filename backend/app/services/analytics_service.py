@@ -2,12 +2,19 @@
 import statistics
 from typing import Dict, Any, List, Optional, Tuple
 
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import Float, func, text , case
+from sqlalchemy import Float, func, text , case, and_
 
 from app.db.models.signals import Signal
 from app.db.models.timeseries import TimeSeriesPoint
 from app.db.models.alerts import AlertRule, AlertEvent
+from app.services.signal_points_service import fetch_signal_points
+from app.services.alert_interval_index import AlertIntervalIndex
+from app.services.health_snapshot_service import latest_component_health
+from app.services.rollup_service import bucket_moments, moments_std
+from app.observability.window_stats import bucket_matrix, column_stats
+from app.services.forecast_service import forecast_signals, model_forecasts
 from typing import Dict, Any, List
 import statistics
 import math
@@ -26,17 +33,8 @@ from sqlalchemy import text
 
 # ---------- INTERNAL HELPER ----------
 def _extract_series(db: Session, component_code: str, column_name: str, limit: int = 30) -> List[float]:
-    rows = (
-        db.query(
-            TimeSeriesPoint.tick,
-            TimeSeriesPoint.payload[column_name].astext.cast(Float)
-        )
-        .filter(TimeSeriesPoint.component_code == component_code)
-        .order_by(TimeSeriesPoint.tick.desc())
-        .limit(limit)
-        .all()
-    )
-    return [r[1] for r in reversed(rows) if r[1] is not None]
+    rows = fetch_signal_points(db, component_code, column_name, limit=limit)
+    return [r.value for r in rows if r.value is not None]
 
 
 # ---------- VOLATILITY ----------
@@ -86,37 +84,21 @@ def detect_degradation(db: Session, role: str, window: int = 20):
 
 
 # ---------- COMPONENT HEALTH ----------
-def component_health(db: Session, component_code: str):
-    signals = (
-        db.query(Signal)
-        .filter(
-            Signal.component_code == component_code,
-            Signal.signal_type == "yi",
-        )
-        .all()
-    )
-
-    values = []
-
-    for s in signals:
-        series = _extract_series(
-            db,
-            component_code,
-            s.column_name,
-            limit=1
-        )
-        if series:
-            value = series[0]
-            if isinstance(value, tuple):
-                value = value[0]
-
-            if value is not None:
-                values.append(float(value))
+def components_health(db: Session, component_codes: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    {component_code: health} for many components in one query, read from
+    the latest component_health_snapshots row of each (maintained at ingest).
+    Defaults to every component known to the signal catalog.
+    """
+    if component_codes is None:
+        component_codes = [
+            c for (c,) in db.query(Signal.component_code).distinct().all() if c
+        ]
+    return latest_component_health(db, list(component_codes))
 
-    if not values:
-        return 100.0
 
-    return max(0.0, 100.0 - (sum(values) / len(values)))
+def component_health(db: Session, component_code: str):
+    return components_health(db, [component_code])[component_code]
 
 
 
@@ -331,58 +313,67 @@ def alerts_stats(
     }
 
 
-def component_rankings(db: Session, limit: int = 10) -> Dict[str, Any]:
-    components = db.query(Signal.component_code).distinct().all()
-    components = [c[0] for c in components if c and c[0]]
-
-    ranked = []
-
-    for comp in components:
-        health = float(component_health(db, comp))
-
-        open_events = (
-            db.query(func.count(AlertEvent.id))
-            .filter(AlertEvent.component_code == comp, AlertEvent.status == "OPEN")
-            .scalar()
-            or 0
-        )
-
-        critical_open = (
-            db.query(func.count(AlertEvent.id))
-            .filter(
-                AlertEvent.component_code == comp,
-                AlertEvent.status == "OPEN",
-                AlertEvent.severity == "critical",
-            )
-            .scalar()
-            or 0
+def component_alert_counts(db: Session) -> Dict[str, Dict[str, int]]:
+    """
+    {component_code: {total, open, critical_open, warning_open}} in one
+    grouped scan of alert_events. Components without events are absent.
+    """
+    is_open = AlertEvent.status == "OPEN"
+    rows = (
+        db.query(
+            AlertEvent.component_code,
+            func.count(AlertEvent.id),
+            func.sum(case((is_open, 1), else_=0)),
+            func.sum(case((and_(is_open, AlertEvent.severity == "critical"), 1), else_=0)),
+            func.sum(case((and_(is_open, AlertEvent.severity == "warning"), 1), else_=0)),
         )
+        .group_by(AlertEvent.component_code)
+        .all()
+    )
 
-        warning_open = (
-            db.query(func.count(AlertEvent.id))
-            .filter(
-                AlertEvent.component_code == comp,
-                AlertEvent.status == "OPEN",
-                AlertEvent.severity == "warning",
-            )
-            .scalar()
-            or 0
-        )
+    return {
+        comp: {
+            "total": int(total or 0),
+            "open": int(open_ or 0),
+            "critical_open": int(crit or 0),
+            "warning_open": int(warn or 0),
+        }
+        for comp, total, open_, crit, warn in rows
+    }
 
-        # Composite risk score (simple but meaningful):
-        # - critical weighs heavily
-        # - warning weighs moderately
-        # - low health increases risk
-        risk_score = (critical_open * 5.0) + (warning_open * 1.5) + max(0.0, (100.0 - health) / 10.0)
 
-        ranked.append({
+def component_rankings(db: Session, limit: int = 10) -> Dict[str, Any]:
+    components = db.query(Signal.component_code).distinct().all()
+    components = [c[0] for c in components if c and c[0]]
+    if not components:
+        return {"ranked": []}
+
+    healths = components_health(db, components)
+    counts = component_alert_counts(db)
+    empty = {"open": 0, "critical_open": 0, "warning_open": 0}
+
+    health = np.array([float(healths[c]) for c in components])
+    open_events = np.array([counts.get(c, empty)["open"] for c in components])
+    critical_open = np.array([counts.get(c, empty)["critical_open"] for c in components])
+    warning_open = np.array([counts.get(c, empty)["warning_open"] for c in components])
+
+    # Composite risk score (simple but meaningful):
+    # - critical weighs heavily
+    # - warning weighs moderately
+    # - low health increases risk
+    risk_score = (critical_open * 5.0) + (warning_open * 1.5) + np.maximum(0.0, (100.0 - health) / 10.0)
+
+    ranked = [
+        {
             "component_code": comp,
-            "health_score": health,
-            "open_alerts": int(open_events),
-            "critical_open_alerts": int(critical_open),
-            "warning_open_alerts": int(warning_open),
-            "risk_score": float(risk_score),
-        })
+            "health_score": float(health[i]),
+            "open_alerts": int(open_events[i]),
+            "critical_open_alerts": int(critical_open[i]),
+            "warning_open_alerts": int(warning_open[i]),
+            "risk_score": float(risk_score[i]),
+        }
+        for i, comp in enumerate(components)
+    ]
 
     ranked.sort(key=lambda x: x["risk_score"], reverse=True)
     return {"ranked": ranked[:limit]}
@@ -408,9 +399,21 @@ def signal_coverage(db: Session, window_ticks: int = 200, limit: int = 20) -> Di
     )
     component_points = {c: int(cnt) for c, cnt in component_points.items()}
 
-    # for each signal, count points where payload contains column
-    # We do a SQL per signal (924 signals -> still ok for a button click, but could be heavy).
-    # To keep it efficient, we compute coverage and then return only worst 'limit'.
+    # stored points per signal in window: one grouped scan of the
+    # window's signal_points partitions instead of one COUNT per signal
+    present_counts = dict(
+        db.execute(
+            text("""
+                SELECT signal_id, COUNT(*) AS present_count
+                FROM signal_points
+                WHERE tick >= :from_tick
+                  AND tick <= :to_tick
+                GROUP BY signal_id
+            """),
+            {"from_tick": from_tick, "to_tick": int(max_tick)},
+        ).fetchall()
+    )
+
     worst_list: List[Dict[str, Any]] = []
 
     signals = db.query(Signal).all()
@@ -419,23 +422,7 @@ def signal_coverage(db: Session, window_ticks: int = 200, limit: int = 20) -> Di
         if total == 0:
             continue
 
-        sql = """
-            SELECT COUNT(*) AS present_count
-            FROM timeseries_points
-            WHERE component_code = :component
-              AND tick >= :from_tick
-              AND tick <= :to_tick
-              AND payload ? :column
-        """
-        present_count = db.execute(
-            text(sql),
-            {
-                "component": s.component_code,
-                "from_tick": from_tick,
-                "to_tick": int(max_tick),
-                "column": s.column_name,
-            }
-        ).scalar() or 0
+        present_count = present_counts.get(s.id, 0)
 
         ratio = float(present_count / total) if total else 0.0
 
@@ -523,39 +510,23 @@ def component_time_analysis(
     if not ticks:
         return {"component_code": component_code, "intervals": []}
 
-    # 2️⃣ Build per-tick stress score
-    stress_by_tick = {}
-
-    for t in ticks:
-        # open alerts
-        open_alerts = (
-            db.query(func.count(AlertEvent.id))
-            .filter(
-                AlertEvent.component_code == component_code,
-                AlertEvent.status == "OPEN",
-                AlertEvent.tick_start <= t,
-                AlertEvent.tick_end >= t,
-            )
-            .scalar()
-            or 0
-        )
+    # 2️⃣ Build per-tick stress score (interval index, no per-tick queries)
+    open_index = AlertIntervalIndex.load(
+        db,
+        component_code=component_code,
+        status="OPEN",
+        from_tick=ticks[0],
+        to_tick=ticks[-1],
+    )
+    open_counts = open_index.active_at(ticks)
+    critical_counts = open_index.with_severity("critical").active_at(ticks)
 
-        critical_alerts = (
-            db.query(func.count(AlertEvent.id))
-            .filter(
-                AlertEvent.component_code == component_code,
-                AlertEvent.status == "OPEN",
-                AlertEvent.severity == "critical",
-                AlertEvent.tick_start <= t,
-                AlertEvent.tick_end >= t,
-            )
-            .scalar()
-            or 0
-        )
+    # component health is the current one (latest yi values): same for every tick
+    health = component_health(db, component_code)
 
-        # component health
-        health = component_health(db, component_code)
+    stress_by_tick = {}
 
+    for t, open_alerts, critical_alerts in zip(ticks, open_counts.tolist(), critical_counts.tolist()):
         # stress score (simple but meaningful)
         stress = (
             critical_alerts * 10.0
@@ -639,38 +610,8 @@ def component_time_analysis(
 # -------------------------------------------------
 
 def _extract_series(db, component_code, column_name, limit=1440):
-    rows = (
-        db.query(
-            TimeSeriesPoint.tick,
-            TimeSeriesPoint.payload[column_name].astext.cast(Float),
-        )
-        .filter(TimeSeriesPoint.component_code == component_code)
-        .order_by(TimeSeriesPoint.tick.desc())
-        .limit(limit)
-        .all()
-    )
-    rows = [(int(t), float(v)) for t, v in reversed(rows) if v is not None]
-    return rows
-
-
-def _linear_forecast(xs: List[int], ys: List[float]):
-    """
-    Simple least-squares linear regression.
-    Returns slope and intercept.
-    """
-    n = len(xs)
-    if n < 2:
-        return 0.0, ys[-1] if ys else 0.0
-
-    x_mean = sum(xs) / n
-    y_mean = sum(ys) / n
-
-    num = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
-    den = sum((x - x_mean) ** 2 for x in xs)
-
-    slope = num / den if den != 0 else 0.0
-    intercept = y_mean - slope * x_mean
-    return slope, intercept
+    rows = fetch_signal_points(db, component_code, column_name, limit=limit)
+    return [(int(t), float(v)) for t, v in rows if v is not None]
 
 
 # -------------------------------------------------
@@ -682,9 +623,12 @@ def forecast_signal(
     signal_code: str,
     horizon_ticks: int = 30,
     history_ticks: int = 1440,
+    model: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Forecast next N ticks for a signal.
+    model=None refits a straight line over the history; a registered model
+    name (see forecast_models) is served from its persisted state.
     """
 
     signal = (
@@ -695,86 +639,9 @@ def forecast_signal(
     if not signal:
         raise ValueError("Signal not found")
 
-    series = _extract_series(
-        db,
-        signal.component_code,
-        signal.column_name,
-        history_ticks,
-    )
-
-    if len(series) < 10:
-        return {
-            "signal_code": signal_code,
-            "status": "INSUFFICIENT_DATA",
-        }
-
-    ticks = [t for t, _ in series]
-    values = [v for _, v in series]
-
-    slope, intercept = _linear_forecast(ticks, values)
-    volatility = statistics.stdev(values) if len(values) >= 2 else 0.0
-
-    last_tick = ticks[-1]
-    last_value = values[-1]
-
-    predictions = []
-    for i in range(1, horizon_ticks + 1):
-        future_tick = last_tick + i
-        mean = slope * future_tick + intercept
-        predictions.append({
-            "tick": future_tick,
-            "expected": mean,
-            "min": mean - 2 * volatility,
-            "max": mean + 2 * volatility,
-        })
-
-    # rule-aware risk estimation
-    rule = (
-        db.query(AlertRule)
-        .filter(AlertRule.signal_code == signal_code)
-        .filter(AlertRule.enabled == True)
-        .first()
-    )
-
-    risk_ahead = None
-    breach_tick = None
-
-    if rule:
-        for p in predictions:
-            v = p["expected"]
-            if rule.operator == "gt" and v > rule.threshold:
-                risk_ahead = "LIKELY"
-                breach_tick = p["tick"]
-                break
-            if rule.operator == "lt" and v < rule.threshold:
-                risk_ahead = "LIKELY"
-                breach_tick = p["tick"]
-                break
-
-        if risk_ahead is None:
-            risk_ahead = "UNLIKELY"
-
-    return {
-        "signal_code": signal_code,
-        "component_code": signal.component_code,
-        "signal_type": signal.signal_type,
-        "polarity": signal.polarity,
-        "history_ticks_used": len(series),
-        "horizon_ticks": horizon_ticks,
-        "last_tick": last_tick,
-        "last_value": last_value,
-        "trend": {
-            "slope_per_tick": slope,
-            "direction": "UP" if slope > 0 else "DOWN" if slope < 0 else "FLAT",
-        },
-        "volatility": volatility,
-        "forecast": predictions,
-        "risk_ahead": {
-            "status": risk_ahead,
-            "breach_tick": breach_tick,
-            "rule_threshold": rule.threshold if rule else None,
-        },
-    }
+    if model is not None:
+        return model_forecasts(db, [signal], model, horizon_ticks, history_ticks)[signal_code]
+    return forecast_signals(db, [signal], horizon_ticks, history_ticks)[signal_code]
 
 
 # -------------------------------------------------
@@ -785,9 +652,10 @@ def forecast_component(
     db: Session,
     component_code: str,
     horizon_ticks: int = 30,
+    model: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
-    Forecast component health & risks.
+    Forecast component health & risks (all signals in one batch).
     """
 
     signals = (
@@ -796,27 +664,20 @@ def forecast_component(
         .all()
     )
 
-    forecasts = []
+    if model is not None:
+        forecasts = model_forecasts(db, signals, model, horizon_ticks=horizon_ticks)
+    else:
+        forecasts = forecast_signals(db, signals, horizon_ticks=horizon_ticks)
     risky_signals = []
 
     for s in signals:
-        try:
-            f = forecast_signal(
-                db,
-                s.signal_code,
-                horizon_ticks=horizon_ticks,
-            )
-        except Exception:
-            continue
-
+        f = forecasts.get(s.signal_code, {})
         if f.get("risk_ahead", {}).get("status") == "LIKELY":
             risky_signals.append({
                 "signal_code": s.signal_code,
                 "breach_tick": f["risk_ahead"]["breach_tick"],
             })
 
-        forecasts.append(f)
-
     status = "STABLE"
     if len(risky_signals) > 0:
         status = "DEGRADED"
@@ -826,6 +687,7 @@ def forecast_component(
     return {
         "component_code": component_code,
         "horizon_ticks": horizon_ticks,
+        "model": model or "linear_refit",
         "predicted_status": status,
         "risky_signals_count": len(risky_signals),
         "risky_signals": risky_signals,
@@ -854,44 +716,50 @@ def component_regimes(
     if max_tick is None:
         return {"component_code": component_code, "regimes": []}
 
+    # buckets on a fixed grid (multiples of bucket_size) so they stay put
+    # between calls and line up with the rollup pyramid
     start_tick = max(0, max_tick - window)
+    start_tick -= start_tick % bucket_size
     regimes = []
 
-    for bucket_start in range(start_tick, max_tick, bucket_size):
-        bucket_end = bucket_start + bucket_size - 1
-
-        # ---- alerts in bucket
-        alert_count = (
-            db.query(func.count(AlertEvent.id))
-            .filter(
-                AlertEvent.component_code == component_code,
-                AlertEvent.tick_start <= bucket_end,
-                AlertEvent.tick_end >= bucket_start,
-            )
-            .scalar()
-            or 0
-        )
-
-        # ---- collect numeric values
-        values = []
-        rows = (
-            db.query(TimeSeriesPoint.payload)
-            .filter(
-                TimeSeriesPoint.component_code == component_code,
-                TimeSeriesPoint.tick >= bucket_start,
-                TimeSeriesPoint.tick <= bucket_end,
-            )
-            .limit(500)
-            .all()
-        )
+    bucket_starts = list(range(start_tick, max_tick, bucket_size))
+    if not bucket_starts:
+        return {
+            "component_code": component_code,
+            "window_ticks": window,
+            "bucket_size": bucket_size,
+            "regimes": [],
+        }
 
-        for (payload,) in rows:
-            if isinstance(payload, dict):
-                for v in payload.values():
-                    if isinstance(v, (int, float)):
-                        values.append(float(v))
+    # ---- alerts per bucket: one load, bulk overlap counts
+    index = AlertIntervalIndex.load(
+        db,
+        component_code=component_code,
+        from_tick=start_tick,
+        to_tick=bucket_starts[-1] + bucket_size - 1,
+    )
+    starts_arr = np.asarray(bucket_starts)
+    alert_counts = index.overlap_counts(starts_arr, starts_arr + bucket_size - 1)
+
+    # ---- volatility of all the component's values per bucket, pooled
+    # from per-signal count / sum / sum of squares (rollups when aligned)
+    signal_ids = [
+        sid for (sid,) in db.query(Signal.id).filter(Signal.component_code == component_code).all()
+    ]
+    moments = bucket_moments(db, signal_ids, start_tick, bucket_size, len(bucket_starts))
+    volatilities = np.nan_to_num(
+        moments_std(
+            moments["n"].sum(axis=1),
+            moments["sum"].sum(axis=1),
+            moments["sumsq"].sum(axis=1),
+        ),
+        nan=0.0,
+    )
 
-        volatility = statistics.stdev(values) if len(values) >= 2 else 0.0
+    for b, bucket_start in enumerate(bucket_starts):
+        bucket_end = bucket_start + bucket_size - 1
+        alert_count = int(alert_counts[b])
+        volatility = float(volatilities[b])
 
         # ---- regime classification
         if alert_count == 0 and volatility < 2:
@@ -919,6 +787,70 @@ def component_regimes(
     }
 
 
+def _lag_pairs(ticks: np.ndarray, lag_window: int):
+    """
+    Window self-join over events sorted by tick_start: every (i, j) with
+    |ticks[j] - ticks[i]| <= lag_window, i != j, via two searchsorted
+    bounds per event instead of one range query per event.
+    """
+    left = np.searchsorted(ticks, ticks - lag_window, side="left")
+    right = np.searchsorted(ticks, ticks + lag_window, side="right")
+    sizes = right - left
+
+    base = np.repeat(np.arange(len(ticks)), sizes)
+    offsets = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    other = np.repeat(left, sizes) + offsets
+
+    keep = base != other
+    return base[keep], other[keep]
+
+
+def _influence_events(db: Session, window: int, lag_window: int):
+    """
+    (tick_start, signal_code) of the events in the last `window` ticks of
+    alert history, plus `lag_window` ticks of margin for neighbours,
+    sorted by tick_start. Returns (ticks, codes, in_window).
+    """
+    max_tick = db.query(func.max(AlertEvent.tick_start)).scalar()
+    if max_tick is None:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=object), np.empty(0, dtype=bool)
+
+    from_tick = int(max_tick) - int(window)
+    rows = (
+        db.query(AlertEvent.tick_start, AlertEvent.signal_code)
+        .filter(
+            AlertEvent.tick_start.isnot(None),
+            AlertEvent.tick_start >= from_tick - lag_window,
+        )
+        .order_by(AlertEvent.tick_start)
+        .all()
+    )
+
+    ticks = np.array([r[0] for r in rows], dtype=np.int64)
+    codes = np.array([r[1] for r in rows], dtype=object)
+    return ticks, codes, ticks >= from_tick
+
+
+def _lag_summary(codes: np.ndarray, lags: np.ndarray, min_occurrences: int = 3) -> List[Dict[str, Any]]:
+    if len(codes) == 0:
+        return []
+
+    keys, inverse = np.unique(codes.astype(str), return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(keys))
+    sums = np.bincount(inverse, weights=lags, minlength=len(keys))
+
+    out = [
+        {
+            "signal_code": str(keys[k]),
+            "avg_ticks": round(float(sums[k] / counts[k]), 2),
+            "occurrences": int(counts[k]),
+        }
+        for k in range(len(keys))
+        if counts[k] >= min_occurrences
+    ]
+    return sorted(out, key=lambda x: x["occurrences"], reverse=True)
+
+
 def signal_influence(
     db: Session,
     signal_code: str,
@@ -927,57 +859,81 @@ def signal_influence(
 ):
     """
     Finds signals that tend to lead or follow a given signal.
+    Base events are the signal's alerts of the last `window` ticks of
+    alert history; neighbours are other signals' alerts within
+    +/- lag_window ticks of each of them.
     """
 
-    base_events = (
-        db.query(AlertEvent)
-        .filter(AlertEvent.signal_code == signal_code)
-        .order_by(AlertEvent.tick_start)
-        .all()
-    )
+    ticks, codes, in_window = _influence_events(db, window, lag_window)
+    is_base = in_window & (codes == signal_code)
 
-    if not base_events:
-        return {"signal_code": signal_code, "leads": [], "follows": []}
+    if not is_base.any():
+        return {"signal_code": signal_code, "analysis_window": window, "leads": [], "follows": []}
 
-    lead_counts = defaultdict(list)
-    follow_counts = defaultdict(list)
+    base, other = _lag_pairs(ticks, lag_window)
+    keep = is_base[base] & (codes[other] != signal_code)
+    base, other = base[keep], other[keep]
 
-    for e in base_events:
-        t0 = e.tick_start
+    delta = ticks[other] - ticks[base]
+    lead = delta < 0
+    follow = delta > 0
+
+    return {
+        "signal_code": signal_code,
+        "analysis_window": window,
+        "leads": _lag_summary(codes[other[lead]], -delta[lead]),
+        "follows": _lag_summary(codes[other[follow]], delta[follow]),
+    }
 
-        neighbors = (
-            db.query(AlertEvent)
-            .filter(
-                AlertEvent.tick_start >= t0 - lag_window,
-                AlertEvent.tick_start <= t0 + lag_window,
-                AlertEvent.signal_code != signal_code,
-            )
-            .all()
-        )
 
-        for n in neighbors:
-            delta = n.tick_start - t0
-            if delta < 0:
-                lead_counts[n.signal_code].append(abs(delta))
-            elif delta > 0:
-                follow_counts[n.signal_code].append(delta)
-
-    def summarize(d):
-        out = []
-        for k, vals in d.items():
-            if len(vals) >= 3:
-                out.append({
-                    "signal_code": k,
-                    "avg_ticks": round(sum(vals) / len(vals), 2),
-                    "occurrences": len(vals),
-                })
-        return sorted(out, key=lambda x: x["occurrences"], reverse=True)
+def influence_matrix(
+    db: Session,
+    window: int = 500,
+    lag_window: int = 20,
+    min_occurrences: int = 3,
+    limit: int = 100,
+) -> Dict[str, Any]:
+    """
+    signal_influence for every signal at once: one load, one window
+    self-join, then (leader, follower) pairs aggregated with bincount.
+    A pair (A, B) counts how often an alert of A came 1..lag_window ticks
+    before an alert of B.
+    """
+    ticks, codes, in_window = _influence_events(db, window, lag_window)
+    if len(ticks) == 0:
+        return {"analysis_window": window, "lag_window": lag_window, "pairs": []}
+
+    base, other = _lag_pairs(ticks, lag_window)
+    delta = ticks[other] - ticks[base]
+
+    # each ordered (leader -> follower) occurrence once, anchored on the
+    # follower's event inside the analysis window (as signal_influence's leads)
+    keep = in_window[base] & (delta < 0) & (codes[other] != codes[base])
+    follower, leader, lag = base[keep], other[keep], -delta[keep]
+
+    signal_keys, signal_idx = np.unique(codes.astype(str), return_inverse=True)
+    S = len(signal_keys)
+    pair = signal_idx[leader] * S + signal_idx[follower]
+
+    counts = np.bincount(pair, minlength=S * S)
+    sums = np.bincount(pair, weights=lag, minlength=S * S)
+
+    hits = np.flatnonzero(counts >= min_occurrences)
+    hits = hits[np.argsort(-counts[hits], kind="stable")][:limit]
 
     return {
-        "signal_code": signal_code,
         "analysis_window": window,
-        "leads": summarize(lead_counts),
-        "follows": summarize(follow_counts),
+        "lag_window": lag_window,
+        "signals": int(S),
+        "pairs": [
+            {
+                "leader": str(signal_keys[p // S]),
+                "follower": str(signal_keys[p % S]),
+                "avg_lag_ticks": round(float(sums[p] / counts[p]), 2),
+                "occurrences": int(counts[p]),
+            }
+            for p in hits
+        ],
     }
 
 
@@ -1001,41 +957,34 @@ def signal_envelope(
 
     start_tick = max_tick - window
 
-    rows = (
-        db.query(
-            TimeSeriesPoint.tick,
-            TimeSeriesPoint.payload[signal.column_name].astext.cast(Float),
-        )
-        .filter(
-            TimeSeriesPoint.component_code == signal.component_code,
-            TimeSeriesPoint.tick >= start_tick,
-        )
-        .order_by(TimeSeriesPoint.tick)
-        .all()
+    rows = fetch_signal_points(
+        db,
+        signal.component_code,
+        signal.column_name,
+        from_tick=start_tick,
     )
 
     series = []
 
-    for i in range(0, len(rows), bucket):
-        chunk = rows[i : i + bucket]
-        values = [v for _, v in chunk if v is not None]
+    # buckets of `bucket` consecutive stored rows, statistics for all at once
+    ticks = np.array([t for t, _ in rows], dtype=np.int64)
+    values = np.array([np.nan if v is None else v for _, v in rows], dtype=float)
+    stats = column_stats(bucket_matrix(values, bucket))
 
-        if len(values) < 3:
+    for k in range(len(stats["n"])):
+        if stats["n"][k] < 3:
             continue
 
-        values_sorted = sorted(values)
-
+        p10, p90, mean = float(stats["p10"][k]), float(stats["p90"][k]), float(stats["mean"][k])
         series.append({
-            "from_tick": chunk[0][0],
-            "to_tick": chunk[-1][0],
-            "p10": statistics.quantiles(values_sorted, n=10)[0],
-            "p50": statistics.median(values_sorted),
-            "p90": statistics.quantiles(values_sorted, n=10)[8],
-            "mean": statistics.mean(values_sorted),
-            "out_of_band": (
-                statistics.mean(values_sorted) < statistics.quantiles(values_sorted, n=10)[0]
-                or statistics.mean(values_sorted) > statistics.quantiles(values_sorted, n=10)[8]
-            ),
+            "from_tick": int(ticks[k * bucket]),
+            "to_tick": int(ticks[min((k + 1) * bucket, len(ticks)) - 1]),
+            "p10": p10,
+            "p50": float(stats["p50"][k]),
+            "p90": p90,
+            "p95": float(stats["p95"][k]),
+            "mean": mean,
+            "out_of_band": mean < p10 or mean > p90,
         })
 
     return {
@@ -1049,22 +998,25 @@ def signal_envelope(
 
 def component_stress_curve(db: Session, component_code: str, window: int = 600, bucket: int = 20):
     max_tick = db.query(func.max(TimeSeriesPoint.tick)).scalar()
+    if max_tick is None:
+        return {"component_code": component_code, "window": window, "bucket": bucket, "series": []}
+
     start = max_tick - window
     series = []
 
-    for t in range(start, max_tick, bucket):
-        alerts = (
-            db.query(AlertEvent.severity, func.count(AlertEvent.id))
-            .filter(
-                AlertEvent.component_code == component_code,
-                AlertEvent.tick_start <= t + bucket,
-                AlertEvent.tick_end >= t
-            )
-            .group_by(AlertEvent.severity)
-            .all()
-        )
-
-        counts = {s: c for s, c in alerts}
+    starts = np.arange(start, max_tick, bucket)
+    index = AlertIntervalIndex.load(
+        db, component_code=component_code, from_tick=start, to_tick=max_tick + bucket,
+    )
+    # window [t, t + bucket] (inclusive upper edge, as before)
+    by_severity = index.overlap_counts_by_severity(starts, starts + bucket)
+
+    for i, t in enumerate(starts.tolist()):
+        counts = {
+            sev: int(c[i])
+            for sev, c in by_severity.items()
+            if c[i] > 0
+        }
         stress = (
             counts.get("critical", 0) * 30 +
             counts.get("warning", 0) * 10
@@ -1117,41 +1069,43 @@ def signal_change_impact(
     if not signal:
         return {"error": f"Signal '{signal_code}' not found"}
 
-    rows = (
-        db.query(
-            TimeSeriesPoint.tick,
-            TimeSeriesPoint.payload[signal.column_name].astext.cast(Float),
-        )
-        .filter(TimeSeriesPoint.component_code == signal.component_code)
-        .all()
+    # only the two windows around the pivot
+    rows = fetch_signal_points(
+        db,
+        signal.component_code,
+        signal.column_name,
+        from_tick=pivot_tick - window,
+        to_tick=pivot_tick + window,
     )
 
-    before = [v for t, v in rows if v is not None and pivot_tick - window <= t < pivot_tick]
-    after = [v for t, v in rows if v is not None and pivot_tick <= t <= pivot_tick + window]
+    ticks = np.array([t for t, _ in rows], dtype=np.int64)
+    values = np.array([np.nan if v is None else v for _, v in rows], dtype=float)
+
+    X = np.full((len(rows), 2), np.nan)
+    X[:, 0] = np.where(ticks < pivot_tick, values, np.nan)
+    X[:, 1] = np.where(ticks >= pivot_tick, values, np.nan)
+    stats = column_stats(X, quantiles=(95,))
 
-    if len(before) < 3 or len(after) < 3:
+    if stats["n"][0] < 3 or stats["n"][1] < 3:
         return {"error": "Not enough data around pivot"}
 
-    before_sorted = sorted(before)
-    after_sorted = sorted(after)
+    before_mean, after_mean = float(stats["mean"][0]), float(stats["mean"][1])
+    before_p95, after_p95 = float(stats["p95"][0]), float(stats["p95"][1])
 
     return {
         "signal_code": signal_code,
         "pivot_tick": pivot_tick,
         "before": {
-            "mean": statistics.mean(before_sorted),
-            "p95": statistics.quantiles(before_sorted, n=20)[18],
+            "mean": before_mean,
+            "p95": before_p95,
         },
         "after": {
-            "mean": statistics.mean(after_sorted),
-            "p95": statistics.quantiles(after_sorted, n=20)[18],
+            "mean": after_mean,
+            "p95": after_p95,
         },
         "delta": {
-            "mean_change": statistics.mean(after_sorted) - statistics.mean(before_sorted),
-            "p95_change": (
-                statistics.quantiles(after_sorted, n=20)[18]
-                - statistics.quantiles(before_sorted, n=20)[18]
-            ),
-            "improvement": statistics.mean(after_sorted) < statistics.mean(before_sorted),
+            "mean_change": after_mean - before_mean,
+            "p95_change": after_p95 - before_p95,
+            "improvement": after_mean < before_mean,
         },
     }
@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from typing import Dict, Any, List, Tuple, Optional
 from collections import defaultdict
 
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import text, func
 
@@ -13,7 +14,8 @@ from app.db.models.anomalies import InjectedAnomaly
 from app.db.models.alerts import AlertEvent
 from app.db.models.signals import Signal
 from app.observability.metric_families import detect_family
-from app.services.analytics_service import component_health, global_health
+from app.services.alert_interval_index import AlertIntervalIndex
+from app.services.analytics_service import components_health, global_health
 
 
 # --- Optional friendly names for UI narrative (you can edit freely) ---
@@ -145,27 +147,28 @@ def anomaly_full_analysis(db: Session) -> Dict[str, Any]:
 
     # ------------------------------
     # Compute deviation stats:
-    # original_value (stored) vs current value in timeseries_points
+    # original_value (stored) vs current value in signal_points
     #
-    # We'll fetch current values for all affected (component, tick, column)
+    # We'll fetch current values for all affected (signal, tick)
     # and compute:
     #   delta_abs, delta_pct
     # plus aggregations per signal and per component.
     # ------------------------------
-    # Build lookup: (component, tick) -> payload
-    payload_rows = db.execute(
+    # Build lookup: (signal_code, tick) -> current value
+    point_rows = db.execute(
         text("""
-            SELECT component_code, tick, payload
-            FROM timeseries_points
-            WHERE tick BETWEEN :from_tick AND :to_tick
-              AND component_code = ANY(:components)
+            SELECT s.signal_code, sp.tick, sp.value
+            FROM signal_points sp
+            JOIN signals s ON s.id = sp.signal_id
+            WHERE s.signal_code = ANY(:signals)
+              AND sp.tick BETWEEN :from_tick AND :to_tick
         """),
-        {"from_tick": from_tick, "to_tick": to_tick, "components": affected_components},
+        {"from_tick": from_tick, "to_tick": to_tick, "signals": affected_signals},
     ).fetchall()
 
-    payload_by_ct: Dict[Tuple[str, int], Dict[str, Any]] = {}
-    for r in payload_rows:
-        payload_by_ct[(r.component_code, int(r.tick))] = dict(r.payload)
+    value_by_st: Dict[Tuple[str, int], Optional[float]] = {}
+    for r in point_rows:
+        value_by_st[(r.signal_code, int(r.tick))] = r.value
 
     # Aggregate containers
     per_signal_stats = defaultdict(lambda: {
@@ -225,9 +228,7 @@ def anomaly_full_analysis(db: Session) -> Dict[str, Any]:
         if not col:
             continue
 
-        key = (a.component_code, int(a.tick))
-        payload = payload_by_ct.get(key, {})
-        current_val = _safe_float(payload.get(col))
+        current_val = _safe_float(value_by_st.get((s, int(a.tick))))
         original_val = _safe_float(a.original_value)
 
         if original_val is None or current_val is None:
@@ -349,44 +350,36 @@ def anomaly_full_analysis(db: Session) -> Dict[str, Any]:
         bucket = 2
 
     # count alerts overlapping each bucket window
-    # lightweight: using in-memory events
+    # (interval index over the in-memory events: two binary searches per bucket)
     timeline = []
     if duration > 0:
-        t = from_tick
-        while t <= to_tick:
-            t_end = min(to_tick, t + bucket - 1)
-            count = 0
-            crit = 0
-            warn = 0
-            for ev in open_alerts:
-                # overlapping window check
-                if ev.tick_start is None or ev.tick_end is None:
-                    continue
-                if ev.tick_start <= t_end and ev.tick_end >= t:
-                    count += 1
-                    if ev.severity == "critical":
-                        crit += 1
-                    else:
-                        warn += 1
+        t_from = np.arange(from_tick, to_tick + 1, bucket)
+        t_to = np.minimum(to_tick, t_from + bucket - 1)
+
+        index = AlertIntervalIndex.from_events(open_alerts)
+        counts = index.overlap_counts(t_from, t_to)
+        crits = index.with_severity("critical").overlap_counts(t_from, t_to)
+
+        for t, t_end, count, crit in zip(t_from.tolist(), t_to.tolist(), counts.tolist(), crits.tolist()):
             timeline.append({
                 "from_tick": t,
                 "to_tick": t_end,
                 "open_alerts": count,
                 "critical": crit,
-                "warning": warn,
+                "warning": count - crit,
             })
-            t += bucket
 
     # ------------------------------
     # Health ranking for impacted components
     # ------------------------------
     impacted_components = sorted(alerts_by_component.keys(), key=lambda c: alerts_by_component[c], reverse=True)
     health_table = []
+    try:
+        healths = components_health(db, impacted_components)
+    except Exception:
+        healths = {}
     for c in impacted_components:
-        try:
-            health = float(component_health(db, c))
-        except Exception:
-            health = None
+        health = float(healths[c]) if c in healths else None
         health_table.append({
             "component_code": c,
             "component_label": _component_label(c),
@@ -5,7 +5,7 @@ from typing import Dict, Any
 
 from app.db.models.alerts import AlertEvent
 from app.db.models.anomalies import InjectedAnomaly
-from app.services.analytics_service import component_health, global_health
+from app.services.analytics_service import components_health, global_health
 
 
 def anomaly_impact_summary(db: Session) -> Dict[str, Any]:
@@ -81,11 +81,15 @@ def anomaly_impact_summary(db: Session) -> Dict[str, Any]:
     # -------------------------------------------------
     component_impacts = []
 
+    try:
+        healths = components_health(db, list(affected_components))
+    except Exception:
+        healths = {}
+
     for component in affected_components:
-        try:
-            health = component_health(db, component)
-        except Exception:
+        if component not in healths:
             continue
+        health = healths[component]
 
         component_impacts.append({
             "component_code": component,
@@ -105,22 +109,24 @@ def anomaly_impact_summary(db: Session) -> Dict[str, Any]:
                 ia.signal_code,
                 AVG(
                     ABS(
-                        ((ts.payload ->> split_part(ia.signal_code, '.', 2))::double precision
+                        (sp.value
                          - (ia.original_value)::double precision)
                         / NULLIF((ia.original_value)::double precision, 0)
                     ) * 100
                 ) AS avg_delta_pct,
                 MAX(
                     ABS(
-                        ((ts.payload ->> split_part(ia.signal_code, '.', 2))::double precision
+                        (sp.value
                          - (ia.original_value)::double precision)
                         / NULLIF((ia.original_value)::double precision, 0)
                     ) * 100
                 ) AS max_delta_pct
             FROM injected_anomalies ia
-            JOIN timeseries_points ts
-              ON ts.component_code = ia.component_code
-             AND ts.tick = ia.tick
+            JOIN signals s
+              ON s.signal_code = ia.signal_code
+            JOIN signal_points sp
+              ON sp.signal_id = s.id
+             AND sp.tick = ia.tick
             GROUP BY ia.signal_code
         """)
     ).fetchall()
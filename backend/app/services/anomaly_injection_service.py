@@ -11,6 +11,11 @@ from sqlalchemy import text
 from app.db.models.signals import Signal
 from app.db.models.anomalies import InjectedAnomaly
 from app.observability.metric_families import detect_family
+from app.services.signal_points_service import upsert_signal_values, to_point_value
+from app.services.health_snapshot_service import refresh_health_snapshots
+from app.services.alert_service import invalidate_alert_state, reset_alert_state
+from app.observability.baseline import invalidate_baselines
+from app.services.forecast_service import invalidate_model_states
 
 
 PIPELINES = {
@@ -72,6 +77,8 @@ def inject_anomaly(
 
     affected = 0
     anomaly_rows: List[InjectedAnomaly] = []
+    point_values = []
+    health_keys = []
 
     for idx, component in enumerate(components):
         decay = 1.0 / (1 + idx) if propagates else 1.0
@@ -112,6 +119,7 @@ def inject_anomaly(
 
                 new_val = _apply_shift(old_val, factor)
                 payload[s.column_name] = new_val
+                point_values.append((s.id, row.tick, to_point_value(new_val)))
 
                 anomaly_rows.append(
                     InjectedAnomaly(
@@ -127,6 +135,7 @@ def inject_anomaly(
                 changed = True
 
             if changed:
+                health_keys.append((component, row.tick))
                 db.execute(
                     text("""
                         UPDATE timeseries_points
@@ -136,6 +145,27 @@ def inject_anomaly(
                     {"payload": json.dumps(payload), "id": row.id},
                 )
 
+    # keep signal_points in sync with the rewritten payloads
+    upsert_signal_values(db, point_values)
+    refresh_health_snapshots(db, health_keys)
+
+    # the rewritten ticks are below the rule watermarks: SIMULATED rules
+    # re-scan from scratch, REAL rules that already folded them re-scan too
+    reset_alert_state(db, "SIMULATED")
+    if point_values:
+        invalidate_alert_state(
+            db,
+            sorted({sid for sid, _, _ in point_values}),
+            min(tick for _, tick, _ in point_values),
+            "REAL",
+        )
+        invalidate_baselines(db, [sid for sid, _, _ in point_values])
+        invalidate_model_states(
+            db,
+            [sid for sid, _, _ in point_values],
+            min(tick for _, tick, _ in point_values),
+        )
+
     db.add_all(anomaly_rows)
     db.commit()
     return affected
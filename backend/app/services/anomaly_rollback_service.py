@@ -6,6 +6,12 @@ from sqlalchemy import text
 
 from app.db.models.anomalies import InjectedAnomaly
 from app.db.models.alerts import AlertEvent
+from app.db.models.signals import Signal
+from app.services.signal_points_service import upsert_signal_values, to_point_value
+from app.services.health_snapshot_service import refresh_health_snapshots
+from app.services.alert_service import invalidate_alert_state, reset_alert_state
+from app.observability.baseline import invalidate_baselines
+from app.services.forecast_service import invalidate_model_states
 
 
 def rollback_anomalies(db: Session) -> int:
@@ -18,7 +24,18 @@ def rollback_anomalies(db: Session) -> int:
     for a in anomalies:
         grouped.setdefault((a.component_code, a.tick), []).append(a)
 
+    signal_ids = {
+        code: signal_id
+        for code, signal_id in (
+            db.query(Signal.signal_code, Signal.id)
+            .filter(Signal.signal_code.in_(sorted({a.signal_code for a in anomalies})))
+            .all()
+        )
+    }
+
     restored = 0
+    point_values = []
+    health_keys = []
 
     for (component, tick), items in grouped.items():
         row = db.execute(
@@ -34,12 +51,17 @@ def rollback_anomalies(db: Session) -> int:
             continue
 
         payload: Dict[str, Any] = dict(row.payload)
+        health_keys.append((component, tick))
 
         for a in items:
             metric = a.signal_code.split(".", 1)[1]
             payload[metric] = a.original_value
             restored += 1
 
+            signal_id = signal_ids.get(a.signal_code)
+            if signal_id is not None:
+                point_values.append((signal_id, tick, to_point_value(a.original_value)))
+
         db.execute(
             text("""
                 UPDATE timeseries_points
@@ -49,6 +71,25 @@ def rollback_anomalies(db: Session) -> int:
             {"payload": json.dumps(payload), "id": row.id},
         )
 
+    upsert_signal_values(db, point_values)
+    refresh_health_snapshots(db, health_keys)
+
+    # restored ticks are below the rule watermarks (see inject_anomaly)
+    reset_alert_state(db, "SIMULATED")
+    if point_values:
+        invalidate_alert_state(
+            db,
+            sorted({sid for sid, _, _ in point_values}),
+            min(tick for _, tick, _ in point_values),
+            "REAL",
+        )
+        invalidate_baselines(db, [sid for sid, _, _ in point_values])
+        invalidate_model_states(
+            db,
+            [sid for sid, _, _ in point_values],
+            min(tick for _, tick, _ in point_values),
+        )
+
     # 🔥 Delete ONLY simulated alerts
     db.query(AlertEvent).filter(
         AlertEvent.origin == "SIMULATED"
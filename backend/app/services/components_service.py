@@ -7,6 +7,7 @@ from app.db.models.anomalies import InjectedAnomaly
 from app.services.analytics_service import component_health, forecast_signal
 from app.services.propagation_service import compute_propagation
 from app.services.analytics_service import signal_change_impact  # Reuse for deltas
+from app.services.signal_points_service import fetch_signal_points
 import statistics
 
 def get_related_signals(db: Session, component_code: str, limit: int, min_correlation: float):
@@ -84,13 +85,9 @@ def get_family_snapshot(db: Session, component_code: str, family: str, window: i
     values = []
     mini_series = []
     for s in signals:
-        rows = db.query(
-            TimeSeriesPoint.tick,
-            TimeSeriesPoint.payload[s.column_name].astext.cast(float).label('value')
-        ).filter(
-            TimeSeriesPoint.component_code == component_code,
-            TimeSeriesPoint.tick.between(start_tick, max_tick)
-        ).order_by(TimeSeriesPoint.tick).all()
+        rows = fetch_signal_points(
+            db, component_code, s.column_name, from_tick=start_tick, to_tick=max_tick
+        )
         
         sig_values = [r.value for r in rows if r.value is not None]
         values.extend(sig_values)
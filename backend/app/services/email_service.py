@@ -7,12 +7,12 @@ from typing import Optional
 from app.core.config import settings
 
 
-def send_email(
+def build_message(
     to_email: str,
     subject: str,
     text: str,
     html: Optional[str] = None,
-):
+) -> MIMEMultipart:
     msg = MIMEMultipart("alternative")
     msg["From"] = settings.SMTP_FROM_EMAIL
     msg["To"] = to_email
@@ -23,9 +23,31 @@ def send_email(
     if html:
         msg.attach(MIMEText(html, "html"))
 
-    with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-        server.sendmail(
-            settings.SMTP_FROM_EMAIL,
-            [to_email],
-            msg.as_string(),
-        )
+    return msg
+
+
+def smtp_connection() -> smtplib.SMTP:
+    """
+    One SMTP connection; use as a context manager and reuse it for several messages.
+    """
+    return smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT)
+
+
+def send_message(server: smtplib.SMTP, to_email: str, msg: MIMEMultipart):
+    server.sendmail(
+        settings.SMTP_FROM_EMAIL,
+        [to_email],
+        msg.as_string(),
+    )
+
+
+def send_email(
+    to_email: str,
+    subject: str,
+    text: str,
+    html: Optional[str] = None,
+):
+    msg = build_message(to_email, subject, text, html)
+
+    with smtp_connection() as server:
+        send_message(server, to_email, msg)
@@ -0,0 +1,163 @@
+# app/services/export_service.py
+import csv
+import io
+import json
+import math
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.models.signals import Signal
+
+# Streaming export of raw signal points.
+#
+# Signals are exported one after the other, each as a tick-ordered range
+# scan of signal_points (the (signal_id, tick) primary key serves it
+# without a sort), read through a server-side cursor in chunks of
+# EXPORT_CHUNK_SIZE rows. Every chunk is encoded and handed to the
+# response as soon as it arrives, so memory stays flat whatever the range
+# and the first bytes leave before the last query has even started.
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+EXPORT_COLUMNS = ["signal_code", "component_code", "tick", "timestamp", "value"]
+
+EXPORT_POINTS_SQL = """
+    SELECT
+        sp.tick,
+        ts.timestamp,
+        sp.value
+    FROM signal_points sp
+    LEFT JOIN LATERAL (
+        SELECT tp.timestamp
+        FROM timeseries_points tp
+        WHERE tp.component_code = :component_code
+          AND tp.tick = sp.tick
+        LIMIT 1
+    ) ts ON TRUE
+    WHERE sp.signal_id = :signal_id
+      AND (CAST(:from_tick AS BIGINT) IS NULL OR sp.tick >= :from_tick)
+      AND (CAST(:to_tick AS BIGINT) IS NULL OR sp.tick <= :to_tick)
+    ORDER BY sp.tick
+"""
+
+
+def resolve_export_signals(
+    db: Session,
+    signal_codes: Optional[List[str]] = None,
+    component_codes: Optional[List[str]] = None,
+) -> List[Dict]:
+    """
+    Signals named explicitly plus every signal of the given components,
+    in (component_code, signal_code) order, without duplicates.
+    """
+    signal_codes = [c.strip() for c in signal_codes or [] if c.strip()]
+    component_codes = [c.strip() for c in component_codes or [] if c.strip()]
+
+    if not signal_codes and not component_codes:
+        raise ValueError("Give at least one signal_code or component_code")
+
+    found: Dict[str, Signal] = {}
+
+    if signal_codes:
+        rows = db.query(Signal).filter(Signal.signal_code.in_(signal_codes)).all()
+        found.update({s.signal_code: s for s in rows})
+        missing = [c for c in signal_codes if c not in found]
+        if missing:
+            raise ValueError(f"Unknown signal_code(s): {', '.join(missing)}")
+
+    if component_codes:
+        rows = db.query(Signal).filter(Signal.component_code.in_(component_codes)).all()
+        found.update({s.signal_code: s for s in rows})
+        missing = sorted(set(component_codes) - {s.component_code for s in rows})
+        if missing:
+            raise ValueError(f"No signals for component(s): {', '.join(missing)}")
+
+    return [
+        {"id": s.id, "signal_code": s.signal_code, "component_code": s.component_code}
+        for s in sorted(found.values(), key=lambda s: (s.component_code, s.signal_code))
+    ]
+
+
+def stream_signal_points(
+    signals: List[Dict],
+    from_tick: Optional[int] = None,
+    to_tick: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Iterator[List[Dict]]:
+    """
+    Yield lists of at most chunk_size export rows.
+
+    Opens its own session: the generator outlives the request handler
+    (it is drained by the response), so it must not borrow get_db's.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    db = db_session.SessionLocal()
+    try:
+        for signal in signals:
+            # yield_per => stream_results: psycopg reads through a named
+            # server-side cursor, chunk_size rows per round trip
+            result = db.execute(
+                text(EXPORT_POINTS_SQL),
+                {
+                    "signal_id": signal["id"],
+                    "component_code": signal["component_code"],
+                    "from_tick": from_tick,
+                    "to_tick": to_tick,
+                },
+                execution_options={"yield_per": chunk_size},
+            )
+            try:
+                for rows in result.partitions():
+                    yield [
+                        {
+                            "signal_code": signal["signal_code"],
+                            "component_code": signal["component_code"],
+                            "tick": r.tick,
+                            "timestamp": r.timestamp,
+                            "value": None if r.value is None or math.isnan(r.value) else r.value,
+                        }
+                        for r in rows
+                    ]
+            finally:
+                result.close()
+    finally:
+        db.close()
+
+
+# ---------- ENCODERS ----------
+def _ndjson_chunks(chunks: Iterator[List[Dict]]) -> Iterator[bytes]:
+    for rows in chunks:
+        yield "".join(json.dumps(r) + "\n" for r in rows).encode()
+
+
+def _csv_chunks(chunks: Iterator[List[Dict]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=EXPORT_COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    yield buf.getvalue().encode()
+
+    for rows in chunks:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(rows)
+        yield buf.getvalue().encode()
+
+
+def export_stream(
+    signals: List[Dict],
+    fmt: str = "ndjson",
+    from_tick: Optional[int] = None,
+    to_tick: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Iterator[bytes]:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}' (expected one of {sorted(EXPORT_FORMATS)})")
+
+    chunks = stream_signal_points(signals, from_tick, to_tick, chunk_size)
+    if fmt == "csv":
+        return _csv_chunks(chunks)
+    return _ndjson_chunks(chunks)
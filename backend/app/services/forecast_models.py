@@ -0,0 +1,299 @@
+# app/services/forecast_models.py
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Incremental forecasting models, vectorized across signals.
+#
+# A model's state is a dict of arrays with one entry per signal (column).
+# update() folds ONE row of observations into it (columns where `observed`
+# is False are left untouched), so keeping a model current costs O(1) per
+# new tick. forecast() reads expected values and bands for the next
+# `horizon` ticks straight from the state.
+#
+# Every model tracks an exponentially weighted variance of its one-step
+# errors; bands are expected +/- 2 sigma.
+
+BAND_SIGMAS = 2.0
+
+
+class ForecastModel(ABC):
+    name = ""
+    description = ""
+
+    # error variance smoothing
+    error_alpha = 0.05
+
+    def init_state(self, size: int) -> Dict[str, np.ndarray]:
+        return {
+            "n": np.zeros(size),
+            "var": np.zeros(size),
+            "tick": np.full(size, np.nan),
+            "last_value": np.full(size, np.nan),
+        }
+
+    @abstractmethod
+    def one_step(self, state: Dict[str, np.ndarray], tick: int) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def _fold(self, state: Dict[str, np.ndarray], y: np.ndarray, observed: np.ndarray, tick: int) -> Dict[str, np.ndarray]:
+        ...
+
+    def update(self, state: Dict[str, np.ndarray], y: np.ndarray, observed: np.ndarray, tick: int):
+        seen = state["n"] > 0
+        with np.errstate(invalid="ignore"):
+            error = y - self.one_step(state, tick)
+            var = np.where(
+                seen & (state["n"] > 1),
+                (1 - self.error_alpha) * state["var"] + self.error_alpha * error ** 2,
+                state["var"],
+            )
+
+        new = self._fold(state, y, observed, tick)
+        new["var"] = var
+        new["n"] = state["n"] + 1
+        new["tick"] = np.full(len(y), float(tick))
+        new["last_value"] = y
+
+        for key, value in new.items():
+            mask = observed if value.ndim == 1 else observed[None, :]
+            state[key] = np.where(mask, value, state[key])
+
+    @abstractmethod
+    def expected(self, state: Dict[str, np.ndarray], steps: np.ndarray) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def trend(self, state: Dict[str, np.ndarray]) -> np.ndarray:
+        ...
+
+    def band_width(self, state: Dict[str, np.ndarray], steps: np.ndarray) -> np.ndarray:
+        # one-step error, widened like a random walk
+        return BAND_SIGMAS * np.sqrt(state["var"])[None, :] * np.sqrt(steps)[:, None]
+
+    def forecast(self, state: Dict[str, np.ndarray], horizon: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (expected, lower, upper), each horizon x signals.
+        """
+        steps = np.arange(1, horizon + 1)
+        expected = self.expected(state, steps)
+        width = self.band_width(state, steps)
+        return expected, expected - width, expected + width
+
+
+class LinearModel(ForecastModel):
+    """
+    Recursive least-squares line with forgetting factor 1 - 1/memory.
+    Weighted sums are kept relative to the last observed tick, so a new
+    observation shifts them in O(1) instead of refitting a window.
+    """
+    name = "linear"
+    description = "Recursive least-squares trend line (exponential forgetting)"
+    memory = 1440
+
+    def init_state(self, size: int):
+        state = super().init_state(size)
+        for key in ("anchor", "w", "sx", "sy", "sxx", "sxy"):
+            state[key] = np.zeros(size)
+        return state
+
+    def _line(self, state):
+        w, sx, sy, sxx, sxy = state["w"], state["sx"], state["sy"], state["sxx"], state["sxy"]
+        den = w * sxx - sx * sx
+        with np.errstate(invalid="ignore", divide="ignore"):
+            slope = np.where(np.abs(den) > 1e-12, (w * sxy - sx * sy) / np.where(den != 0, den, 1.0), 0.0)
+            intercept = np.where(w > 0, (sy - slope * sx) / np.where(w > 0, w, 1.0), np.nan)
+        return slope, intercept
+
+    def one_step(self, state, tick):
+        slope, intercept = self._line(state)
+        return intercept + slope * (tick - state["anchor"])
+
+    def _fold(self, state, y, observed, tick):
+        lam = 1.0 - 1.0 / self.memory
+        d = np.where(state["n"] > 0, tick - state["anchor"], 0.0)
+        w, sx, sy = state["w"], state["sx"], state["sy"]
+
+        # move the origin to `tick`, then decay and add the new point at x = 0
+        sxx = state["sxx"] - 2 * d * sx + d * d * w
+        sxy = state["sxy"] - d * sy
+        sx = sx - d * w
+
+        return {
+            "anchor": np.full(len(y), float(tick)),
+            "w": lam * w + 1.0,
+            "sx": lam * sx,
+            "sy": lam * sy + np.nan_to_num(y),
+            "sxx": lam * sxx,
+            "sxy": lam * sxy,
+        }
+
+    def expected(self, state, steps):
+        slope, intercept = self._line(state)
+        return intercept[None, :] + slope[None, :] * steps[:, None]
+
+    def trend(self, state) -> np.ndarray:
+        return self._line(state)[0]
+
+
+class HoltModel(ForecastModel):
+    """
+    Double exponential smoothing (level + trend).
+    """
+    name = "holt"
+    description = "Holt double exponential smoothing (level + trend)"
+    alpha = 0.3
+    beta = 0.1
+
+    def init_state(self, size: int):
+        state = super().init_state(size)
+        state["level"] = np.zeros(size)
+        state["trend"] = np.zeros(size)
+        return state
+
+    def one_step(self, state, tick):
+        return state["level"] + state["trend"]
+
+    def _fold(self, state, y, observed, tick):
+        first = state["n"] == 0
+        level = self.alpha * y + (1 - self.alpha) * (state["level"] + state["trend"])
+        trend = self.beta * (level - state["level"]) + (1 - self.beta) * state["trend"]
+        return {
+            "level": np.where(first, y, level),
+            "trend": np.where(first, 0.0, trend),
+        }
+
+    def expected(self, state, steps):
+        return state["level"][None, :] + state["trend"][None, :] * steps[:, None]
+
+    def trend(self, state) -> np.ndarray:
+        return state["trend"]
+
+
+class HoltWintersModel(HoltModel):
+    """
+    Additive Holt-Winters: Holt plus a seasonal profile of
+    `season_length` ticks (learned online from zero), indexed by
+    tick % season_length so gaps do not shift the season.
+    """
+    name = "holt_winters"
+    description = "Additive Holt-Winters (level + trend + season)"
+    # slower level / trend so the season, not the level, absorbs the cycle
+    alpha = 0.1
+    beta = 0.01
+    gamma = 0.3
+    season_length = 60
+
+    def init_state(self, size: int):
+        state = super().init_state(size)
+        state["season"] = np.zeros((self.season_length, size))
+        return state
+
+    def _season_at(self, state, ticks) -> np.ndarray:
+        pos = np.asarray(ticks, dtype=np.int64) % self.season_length
+        return state["season"][pos, np.arange(state["season"].shape[1])]
+
+    def one_step(self, state, tick):
+        return state["level"] + state["trend"] + self._season_at(state, np.full(len(state["n"]), tick))
+
+    def _fold(self, state, y, observed, tick):
+        first = state["n"] == 0
+        cols = np.arange(len(y))
+        pos = np.full(len(y), tick % self.season_length)
+        s = state["season"][pos, cols]
+
+        level = self.alpha * (y - s) + (1 - self.alpha) * (state["level"] + state["trend"])
+        level = np.where(first, y, level)
+        trend = self.beta * (level - state["level"]) + (1 - self.beta) * state["trend"]
+        trend = np.where(first, 0.0, trend)
+
+        season = state["season"].copy()
+        season[pos, cols] = np.where(
+            first, 0.0, self.gamma * (y - level) + (1 - self.gamma) * s
+        )
+
+        return {"level": level, "trend": trend, "season": season}
+
+    def expected(self, state, steps):
+        last = np.nan_to_num(state["tick"]).astype(np.int64)
+        pos = (last[None, :] + np.asarray(steps, dtype=np.int64)[:, None]) % self.season_length
+        seasonal = state["season"][pos, np.arange(state["season"].shape[1])[None, :]]
+        return super().expected(state, steps) + seasonal
+
+
+class EwmaModel(ForecastModel):
+    """
+    Flat EWMA level with EWMA volatility bands (no trend, no widening).
+    """
+    name = "ewma"
+    description = "EWMA level with EWMA volatility bands"
+    alpha = 0.1
+
+    def init_state(self, size: int):
+        state = super().init_state(size)
+        state["level"] = np.zeros(size)
+        return state
+
+    def one_step(self, state, tick):
+        return state["level"]
+
+    def _fold(self, state, y, observed, tick):
+        first = state["n"] == 0
+        level = self.alpha * y + (1 - self.alpha) * state["level"]
+        return {"level": np.where(first, y, level)}
+
+    def expected(self, state, steps):
+        return np.repeat(state["level"][None, :], len(steps), axis=0)
+
+    def band_width(self, state, steps):
+        return BAND_SIGMAS * np.repeat(np.sqrt(state["var"])[None, :], len(steps), axis=0)
+
+    def trend(self, state) -> np.ndarray:
+        return np.zeros_like(state["level"])
+
+
+FORECAST_MODELS: Dict[str, ForecastModel] = {
+    m.name: m for m in (LinearModel(), HoltModel(), HoltWintersModel(), EwmaModel())
+}
+
+
+def get_model(name: str) -> ForecastModel:
+    if name not in FORECAST_MODELS:
+        raise ValueError(f"Unknown forecast model '{name}' (expected one of {sorted(FORECAST_MODELS)})")
+    return FORECAST_MODELS[name]
+
+
+def list_models() -> List[Dict[str, str]]:
+    return [{"name": m.name, "description": m.description} for m in FORECAST_MODELS.values()]
+
+
+# ---------- (DE)SERIALIZATION ----------
+def stack_states(model: ForecastModel, states: List[dict]) -> Dict[str, np.ndarray]:
+    """
+    Per-signal JSON states (None = never fitted) -> one dict of arrays.
+    """
+    stacked = model.init_state(len(states))
+    for k, st in enumerate(states):
+        if not st:
+            continue
+        for key, value in st.items():
+            if key not in stacked:
+                continue
+            if stacked[key].ndim == 2:
+                stacked[key][:, k] = value
+            else:
+                stacked[key][k] = value
+    return stacked
+
+
+def split_states(state: Dict[str, np.ndarray]) -> List[dict]:
+    size = len(state["n"])
+    return [
+        {
+            key: (value[:, k].tolist() if value.ndim == 2 else float(value[k]))
+            for key, value in state.items()
+        }
+        for k in range(size)
+    ]
@@ -0,0 +1,459 @@
+# app/services/forecast_service.py
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+from app.db.models.alerts import AlertRule
+from app.db.models.signals import Signal
+from app.services.forecast_models import get_model, split_states, stack_states
+from app.services.signal_points_service import fetch_signal_matrix, fetch_signal_tails, latest_signal_ticks
+
+DEFAULT_HISTORY_TICKS = 1440
+MIN_FORECAST_POINTS = 10
+
+# operators the breach check understands
+BREACH_OPERATORS = {
+    "gt": np.greater,
+    "lt": np.less,
+}
+
+
+# ---------- NUMPY ----------
+def fit_linear_trends(ticks: np.ndarray, values: np.ndarray, present: np.ndarray, history: int) -> Dict[str, np.ndarray]:
+    """
+    Least-squares line value = slope * tick + intercept for every column of a
+    ticks x signals matrix at once, over each column's last `history` stored
+    rows (NULL values skipped).
+
+    Columns have different gaps, so instead of one lstsq per mask the
+    normal equations are solved with masked column sums (same solution).
+    """
+    S = values.shape[1]
+    if len(ticks) == 0:
+        nan = np.full(S, np.nan)
+        return {"n": np.zeros(S, dtype=np.int64), "slope": nan, "intercept": nan,
+                "stdev": nan, "last_tick": nan, "last_value": nan}
+
+    from_end = np.cumsum(present[::-1], axis=0)[::-1]
+    M = present & (from_end <= history) & ~np.isnan(values)
+
+    n = M.sum(axis=0)
+    safe_n = np.maximum(n, 1)
+    x = np.where(M, ticks[:, None].astype(float), 0.0)
+    y = np.where(M, values, 0.0)
+
+    x_mean = x.sum(axis=0) / safe_n
+    y_mean = y.sum(axis=0) / safe_n
+    dx = np.where(M, x - x_mean, 0.0)
+    dy = np.where(M, y - y_mean, 0.0)
+
+    den = (dx * dx).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.where(den != 0, (dx * dy).sum(axis=0) / np.where(den != 0, den, 1.0), 0.0)
+        stdev = np.sqrt((dy * dy).sum(axis=0) / np.maximum(n - 1, 1))
+    intercept = y_mean - slope * x_mean
+
+    any_rows = M.any(axis=0)
+    last_row = len(ticks) - 1 - np.argmax(M[::-1], axis=0)
+    cols = np.arange(S)
+
+    return {
+        "n": n,
+        "slope": slope,
+        "intercept": intercept,
+        "stdev": np.where(n >= 2, stdev, 0.0),
+        "last_tick": np.where(any_rows, ticks[last_row].astype(float), np.nan),
+        "last_value": np.where(any_rows, values[last_row, cols], np.nan),
+    }
+
+
+def first_breach(expected: np.ndarray, operators: List[Optional[str]], thresholds: np.ndarray) -> np.ndarray:
+    """
+    Row index of the first breach per column of a horizon x signals matrix
+    of predictions, -1 when there is none (or no usable rule).
+    """
+    if expected.shape[0] == 0:
+        # empty horizon: nothing can breach (argmax has no row to return)
+        return np.full(expected.shape[1], -1, dtype=np.int64)
+
+    breach = np.zeros(expected.shape, dtype=bool)
+    for name, op in BREACH_OPERATORS.items():
+        cols = np.flatnonzero(np.array([o == name for o in operators], dtype=bool))
+        if len(cols):
+            breach[:, cols] = op(expected[:, cols], thresholds[cols])
+
+    hit = breach.any(axis=0)
+    return np.where(hit, np.argmax(breach, axis=0), -1)
+
+
+# ---------- RULES ----------
+def _first_enabled_rules(db: Session, signal_codes: List[str]) -> Dict[str, AlertRule]:
+    rules: Dict[str, AlertRule] = {}
+    for rule in (
+        db.query(AlertRule)
+        .filter(AlertRule.signal_code.in_(signal_codes), AlertRule.enabled == True)
+        .order_by(AlertRule.id)
+        .all()
+    ):
+        rules.setdefault(rule.signal_code, rule)
+    return rules
+
+
+# ---------- BATCH FORECAST ----------
+def forecast_signals(
+    db: Session,
+    signals: Iterable[Signal],
+    horizon_ticks: int = 30,
+    history_ticks: int = DEFAULT_HISTORY_TICKS,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    {signal_code: forecast} for many signals (forecast_signal's shape).
+      - one latest-tick probe + one matrix fetch per component
+      - every linear trend fitted at once
+      - the first enabled rule of each signal checked against the whole
+        horizon in one comparison
+    """
+    by_component: Dict[str, List[Signal]] = {}
+    for s in signals:
+        by_component.setdefault(s.component_code, []).append(s)
+
+    rules = _first_enabled_rules(
+        db, sorted({s.signal_code for group in by_component.values() for s in group})
+    )
+    steps = np.arange(1, horizon_ticks + 1)
+
+    result: Dict[str, Dict[str, Any]] = {}
+
+    for component_signals in by_component.values():
+        ids = [s.id for s in component_signals]
+        latest = latest_signal_ticks(db, ids)
+
+        with_data = [s for s in component_signals if s.id in latest]
+        for s in component_signals:
+            if s.id not in latest:
+                result[s.signal_code] = {"signal_code": s.signal_code, "status": "INSUFFICIENT_DATA"}
+        if not with_data:
+            continue
+
+        # by row count, not tick range: sparse signals still get history_ticks rows
+        ticks, values, present = fetch_signal_tails(db, [s.id for s in with_data], history_ticks)
+        fit = fit_linear_trends(ticks, values, present, history_ticks)
+
+        # horizon x signals predictions
+        future = np.nan_to_num(fit["last_tick"])[None, :] + steps[:, None]
+        expected = fit["slope"][None, :] * future + fit["intercept"][None, :]
+
+        sig_rules = [rules.get(s.signal_code) for s in with_data]
+        breach_row = first_breach(
+            expected,
+            [r.operator if r else None for r in sig_rules],
+            np.array([r.threshold if r else np.nan for r in sig_rules], dtype=float),
+        )
+
+        for k, s in enumerate(with_data):
+            n = int(fit["n"][k])
+            if n < MIN_FORECAST_POINTS:
+                result[s.signal_code] = {"signal_code": s.signal_code, "status": "INSUFFICIENT_DATA"}
+                continue
+
+            slope = float(fit["slope"][k])
+            volatility = float(fit["stdev"][k])
+            rule = sig_rules[k]
+
+            risk_ahead = None
+            breach_tick = None
+            if rule:
+                if breach_row[k] >= 0:
+                    risk_ahead = "LIKELY"
+                    breach_tick = int(future[breach_row[k], k])
+                else:
+                    risk_ahead = "UNLIKELY"
+
+            result[s.signal_code] = {
+                "signal_code": s.signal_code,
+                "component_code": s.component_code,
+                "signal_type": s.signal_type,
+                "polarity": s.polarity,
+                "history_ticks_used": n,
+                "horizon_ticks": horizon_ticks,
+                "last_tick": int(fit["last_tick"][k]),
+                "last_value": float(fit["last_value"][k]),
+                "trend": {
+                    "slope_per_tick": slope,
+                    "direction": "UP" if slope > 0 else "DOWN" if slope < 0 else "FLAT",
+                },
+                "volatility": volatility,
+                "forecast": [
+                    {
+                        "tick": int(future[i, k]),
+                        "expected": float(expected[i, k]),
+                        "min": float(expected[i, k]) - 2 * volatility,
+                        "max": float(expected[i, k]) + 2 * volatility,
+                    }
+                    for i in range(horizon_ticks)
+                ],
+                "risk_ahead": {
+                    "status": risk_ahead,
+                    "breach_tick": breach_tick,
+                    "rule_threshold": rule.threshold if rule else None,
+                },
+            }
+
+    return result
+
+
+# ---------- INCREMENTAL MODELS ----------
+def _load_model_states(db: Session, model: str, signal_ids: List[int]) -> Dict[int, Any]:
+    rows = db.execute(
+        text("""
+            SELECT signal_id, last_tick, state
+            FROM forecast_model_states
+            WHERE model = :model AND signal_id = ANY(:ids)
+        """),
+        {"model": model, "ids": signal_ids},
+    ).fetchall()
+    return {r.signal_id: r for r in rows}
+
+
+# used by the COPY loader, on its raw cursor, right after the signal_points
+# upsert: (re)written ticks a state already folded in (see invalidate_model_states)
+STAGE_INVALIDATE_MODEL_STATES_SQL = """
+    DELETE FROM forecast_model_states m
+    USING (
+        SELECT signal_id, min(tick) AS first_tick
+        FROM _signal_points_stage
+        GROUP BY signal_id
+    ) s
+    WHERE m.signal_id = s.signal_id
+      AND m.last_tick >= s.first_tick
+"""
+
+
+def invalidate_model_states(db: Session, signal_ids: Iterable[int], from_tick: int):
+    """
+    Drop the persisted model states (every model) of signals whose ticks
+    >= from_tick were rewritten after being folded in; states cannot be
+    unfolded, so the next forecast warms those signals up again. States
+    that stop before from_tick fold the new values normally. Does NOT commit.
+    """
+    ids = sorted(set(int(i) for i in signal_ids))
+    if not ids:
+        return
+    db.execute(
+        text("""
+            DELETE FROM forecast_model_states
+            WHERE signal_id = ANY(:ids) AND last_tick >= :from_tick
+        """),
+        {"ids": ids, "from_tick": int(from_tick)},
+    )
+
+
+def _store_model_states(db: Session, model: str, rows: List[Dict[str, Any]]):
+    if not rows:
+        return
+    db.execute(
+        text("""
+            INSERT INTO forecast_model_states (signal_id, model, last_tick, state, updated_at)
+            VALUES (:signal_id, :model, :last_tick, CAST(:state AS jsonb), now())
+            ON CONFLICT (signal_id, model) DO UPDATE SET
+                last_tick = EXCLUDED.last_tick,
+                state = EXCLUDED.state,
+                updated_at = now()
+        """),
+        [{**r, "model": model} for r in rows],
+    )
+
+
+def model_forecasts(
+    db: Session,
+    signals: Iterable[Signal],
+    model: str,
+    horizon_ticks: int = 30,
+    history_ticks: int = DEFAULT_HISTORY_TICKS,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    {signal_code: forecast} served from persisted model state.
+
+    Each signal's state is folded forward over the ticks stored since its
+    last_tick only (a signal seen for the first time is warmed up on its
+    last `history_ticks` ticks), written back, and the forecast is read
+    from the state. Commits the updated states.
+    """
+    forecaster = get_model(model)
+
+    by_component: Dict[str, List[Signal]] = {}
+    for s in signals:
+        by_component.setdefault(s.component_code, []).append(s)
+
+    rules = _first_enabled_rules(
+        db, sorted({s.signal_code for group in by_component.values() for s in group})
+    )
+
+    result: Dict[str, Dict[str, Any]] = {}
+
+    for component_signals in by_component.values():
+        ids = [s.id for s in component_signals]
+        latest = latest_signal_ticks(db, ids)
+        stored = _load_model_states(db, model, ids)
+
+        with_data = [s for s in component_signals if s.id in latest]
+        for s in component_signals:
+            if s.id not in latest:
+                result[s.signal_code] = {"signal_code": s.signal_code, "status": "INSUFFICIENT_DATA"}
+        if not with_data:
+            continue
+
+        state = stack_states(
+            forecaster,
+            [stored[s.id].state if s.id in stored else None for s in with_data],
+        )
+        start = np.array([
+            stored[s.id].last_tick + 1 if s.id in stored else latest[s.id] - history_ticks + 1
+            for s in with_data
+        ])
+        last_tick = np.array([stored[s.id].last_tick if s.id in stored else -1 for s in with_data])
+
+        # ---- fold the new ticks only
+        if (start <= np.array([latest[s.id] for s in with_data])).any():
+            ticks, values, present = fetch_signal_matrix(
+                db, [s.id for s in with_data], from_tick=int(start.min()),
+            )
+            observed = present & ~np.isnan(values) & (ticks[:, None] >= start[None, :])
+
+            for r in np.flatnonzero(observed.any(axis=1)):
+                forecaster.update(state, values[r], observed[r], int(ticks[r]))
+
+            if len(ticks):
+                last_tick = np.maximum(last_tick, int(ticks[-1]))
+
+            _store_model_states(db, model, [
+                {"signal_id": s.id, "last_tick": int(last_tick[k]), "state": json.dumps(st)}
+                for k, (s, st) in enumerate(zip(with_data, split_states(state)))
+                if last_tick[k] >= 0
+            ])
+
+        # ---- forecast straight from the state
+        expected, lower, upper = forecaster.forecast(state, horizon_ticks)
+        future = np.nan_to_num(state["tick"])[None, :] + np.arange(1, horizon_ticks + 1)[:, None]
+        trend = forecaster.trend(state)
+
+        sig_rules = [rules.get(s.signal_code) for s in with_data]
+        breach_row = first_breach(
+            expected,
+            [r.operator if r else None for r in sig_rules],
+            np.array([r.threshold if r else np.nan for r in sig_rules], dtype=float),
+        )
+
+        for k, s in enumerate(with_data):
+            if state["n"][k] < MIN_FORECAST_POINTS:
+                result[s.signal_code] = {"signal_code": s.signal_code, "status": "INSUFFICIENT_DATA"}
+                continue
+
+            slope = float(trend[k])
+            rule = sig_rules[k]
+
+            risk_ahead = None
+            breach_tick = None
+            if rule:
+                if breach_row[k] >= 0:
+                    risk_ahead = "LIKELY"
+                    breach_tick = int(future[breach_row[k], k])
+                else:
+                    risk_ahead = "UNLIKELY"
+
+            result[s.signal_code] = {
+                "signal_code": s.signal_code,
+                "component_code": s.component_code,
+                "signal_type": s.signal_type,
+                "polarity": s.polarity,
+                "model": model,
+                "observations": int(state["n"][k]),
+                "horizon_ticks": horizon_ticks,
+                "last_tick": int(state["tick"][k]),
+                "last_value": float(state["last_value"][k]),
+                "trend": {
+                    "slope_per_tick": slope,
+                    "direction": "UP" if slope > 0 else "DOWN" if slope < 0 else "FLAT",
+                },
+                "volatility": float(np.sqrt(state["var"][k])),
+                "forecast": [
+                    {
+                        "tick": int(future[i, k]),
+                        "expected": float(expected[i, k]),
+                        "min": float(lower[i, k]),
+                        "max": float(upper[i, k]),
+                    }
+                    for i in range(horizon_ticks)
+                ],
+                "risk_ahead": {
+                    "status": risk_ahead,
+                    "breach_tick": breach_tick,
+                    "rule_threshold": rule.threshold if rule else None,
+                },
+            }
+
+    db.commit()
+    return result
+
+
+# ---------- FLEET-WIDE BREACH SCAN ----------
+def forecast_breaches(
+    db: Session,
+    horizon_ticks: int = 30,
+    history_ticks: int = DEFAULT_HISTORY_TICKS,
+    limit: int = 50,
+    model: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Every signal with an enabled gt / lt rule, forecast in component
+    batches (linear refit, or a persisted model); predicted breaches ranked
+    by how soon they happen (critical first on ties).
+    """
+    codes = [
+        c for (c,) in (
+            db.query(AlertRule.signal_code)
+            .filter(AlertRule.enabled == True, AlertRule.operator.in_(list(BREACH_OPERATORS)))
+            .distinct()
+            .all()
+        )
+    ]
+    signals = db.query(Signal).filter(Signal.signal_code.in_(codes)).all() if codes else []
+
+    if model is not None:
+        forecasts = model_forecasts(db, signals, model, horizon_ticks, history_ticks)
+    else:
+        forecasts = forecast_signals(db, signals, horizon_ticks, history_ticks)
+    rules = _first_enabled_rules(db, codes) if codes else {}
+
+    breaches = []
+    for code, f in forecasts.items():
+        risk = f.get("risk_ahead") or {}
+        if risk.get("status") != "LIKELY":
+            continue
+
+        rule = rules[code]
+        breaches.append({
+            "signal_code": code,
+            "component_code": f["component_code"],
+            "severity": rule.severity,
+            "operator": rule.operator,
+            "threshold": rule.threshold,
+            "last_tick": f["last_tick"],
+            "last_value": f["last_value"],
+            "breach_tick": risk["breach_tick"],
+            "ticks_to_breach": risk["breach_tick"] - f["last_tick"],
+            "slope_per_tick": f["trend"]["slope_per_tick"],
+        })
+
+    breaches.sort(key=lambda b: (b["ticks_to_breach"], b["severity"] != "critical", b["signal_code"]))
+
+    return {
+        "horizon_ticks": horizon_ticks,
+        "model": model or "linear_refit",
+        "signals_scanned": len(forecasts),
+        "breaches_count": len(breaches),
+        "breaches": breaches[:limit],
+    }
@@ -0,0 +1,144 @@
+# app/services/health_snapshot_service.py
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+
+# health of (component, tick) keys: 100 - mean of the yi values stored at
+# that tick (NULLs skipped), 100 when none is numeric
+_HEALTH_SELECT = """
+    SELECT k.component_code,
+           k.tick,
+           COALESCE(GREATEST(0.0, 100.0 - avg(sp.value)), 100.0) AS health
+    FROM ({keys}) k
+    JOIN signals s
+      ON s.component_code = k.component_code
+     AND s.signal_type = 'yi'
+    LEFT JOIN signal_points sp
+      ON sp.signal_id = s.id
+     AND sp.tick = k.tick
+    GROUP BY k.component_code, k.tick
+"""
+
+_UPSERT = """
+    INSERT INTO component_health_snapshots (component_code, tick, health)
+    {select}
+    ON CONFLICT (component_code, tick) DO UPDATE SET health = EXCLUDED.health
+"""
+
+_KEYS_FROM_ARRAYS = """
+    SELECT DISTINCT component_code, tick
+    FROM unnest(CAST(:components AS text[]), CAST(:ticks AS integer[])) AS u(component_code, tick)
+"""
+
+# used by the COPY loader, on its raw cursor, right after the upserts
+STAGE_SNAPSHOT_SQL = _UPSERT.format(select=_HEALTH_SELECT.format(
+    keys="SELECT DISTINCT component_code, tick FROM _timeseries_points_stage"
+))
+
+
+# ---------- WRITES ----------
+def refresh_health_snapshots(db: Session, keys: Iterable[Tuple[str, int]]) -> int:
+    """
+    Recompute the snapshots of (component_code, tick) pairs whose yi values
+    were just written. Does NOT commit.
+    """
+    keys = list(keys)
+    if not keys:
+        return 0
+
+    return db.execute(
+        text(_UPSERT.format(select=_HEALTH_SELECT.format(keys=_KEYS_FROM_ARRAYS))),
+        {
+            "components": [c for c, _ in keys],
+            "ticks": [int(t) for _, t in keys],
+        },
+    ).rowcount or 0
+
+
+def rebuild_health_snapshots(db: Session, component_codes: Optional[List[str]] = None) -> int:
+    """
+    Full recompute from timeseries_points (e.g. after yi signals were added
+    and backfilled). Does NOT commit.
+    """
+    keys = "SELECT component_code, tick FROM timeseries_points"
+    params: Dict[str, Any] = {}
+
+    if component_codes is not None:
+        if not component_codes:
+            return 0
+        keys += " WHERE component_code = ANY(:components)"
+        params["components"] = list(component_codes)
+
+    return db.execute(
+        text(_UPSERT.format(select=_HEALTH_SELECT.format(keys=keys))),
+        params,
+    ).rowcount or 0
+
+
+# ---------- READS ----------
+def latest_component_health(db: Session, component_codes: List[str]) -> Dict[str, float]:
+    """
+    Current health of many components in one query: an index probe on
+    component_health_snapshots per component (ORDER BY tick DESC LIMIT 1).
+    Components without any snapshot score 100.0, like component_health
+    always did for components without yi data.
+    """
+    if not component_codes:
+        return {}
+
+    rows = db.execute(
+        text("""
+            SELECT c.component_code, h.health
+            FROM unnest(CAST(:components AS text[])) AS c(component_code)
+            JOIN LATERAL (
+                SELECT health
+                FROM component_health_snapshots
+                WHERE component_code = c.component_code
+                ORDER BY tick DESC
+                LIMIT 1
+            ) h ON true
+        """),
+        {"components": list(component_codes)},
+    ).fetchall()
+
+    health = {code: 100.0 for code in component_codes}
+    health.update({r.component_code: float(r.health) for r in rows})
+    return health
+
+
+def component_health_history(
+    db: Session,
+    component_code: str,
+    from_tick: Optional[int] = None,
+    to_tick: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    [{tick, health}] in ascending tick order; with `limit`, the latest ones.
+    """
+    sql = """
+        SELECT tick, health
+        FROM component_health_snapshots
+        WHERE component_code = :component
+    """
+    params: Dict[str, Any] = {"component": component_code}
+
+    if from_tick is not None:
+        sql += " AND tick >= :from_tick"
+        params["from_tick"] = from_tick
+
+    if to_tick is not None:
+        sql += " AND tick <= :to_tick"
+        params["to_tick"] = to_tick
+
+    if limit is not None:
+        sql += " ORDER BY tick DESC LIMIT :limit"
+        params["limit"] = limit
+        rows = list(reversed(db.execute(text(sql), params).fetchall()))
+    else:
+        sql += " ORDER BY tick"
+        rows = db.execute(text(sql), params).fetchall()
+
+    return [{"tick": int(r.tick), "health": float(r.health)} for r in rows]
@@ -2,12 +2,15 @@
 from typing import Dict, List
 from collections import defaultdict
 
+from sqlalchemy.orm import Session
+
 from app.db.models.alerts import AlertEvent
 from app.db.models.incidents import Incident
-from app.services.email_service import send_email
+from app.services.notification_dispatcher import enqueue_email
 
 
-def send_incident_summary_email(
+def queue_incident_summary_email(
+    db: Session,
     incidents: List[Incident],
     alerts_by_incident: Dict[int, List[AlertEvent]],
     to_email: str,
@@ -66,7 +69,10 @@ def send_incident_summary_email(
         "This email was generated automatically by PlatformOPS.",
     ])
 
-    send_email(
+    # outbox row in the caller's transaction (does NOT commit)
+    enqueue_email(
+        db,
+        kind="incident_report",
         to_email=to_email,
         subject=subject,
         text="\n".join(lines),
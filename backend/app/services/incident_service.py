@@ -5,7 +5,7 @@ from collections import defaultdict
 from app.db.models.alerts import AlertEvent
 from app.db.models.incidents import Incident, IncidentAlert
 from app.core.config import settings
-from app.services.incident_notification_service import send_incident_summary_email
+from app.services.incident_notification_service import queue_incident_summary_email
 
 
 CRITICAL_THRESHOLD = 2
@@ -85,16 +85,17 @@ def evaluate_incidents(db: Session) -> dict:
                 )
                 resolved += 1
 
-    db.commit()
-
-    # 🔥 ONE EMAIL FOR ALL INCIDENTS
+    # 🔥 ONE EMAIL FOR ALL INCIDENTS (outbox, same transaction)
     if new_incidents:
-        send_incident_summary_email(
+        queue_incident_summary_email(
+            db,
             incidents=new_incidents,
             alerts_by_incident=alerts_by_incident,
             to_email=settings.SMTP_FROM_EMAIL,
         )
 
+    db.commit()
+
     return {
         "created_incidents": created,
         "resolved_incidents": resolved,
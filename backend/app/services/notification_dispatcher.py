@@ -0,0 +1,243 @@
+# app/services/notification_dispatcher.py
+import smtplib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.models.notifications import NotificationOutbox
+from app.services.email_service import build_message, send_message, smtp_connection
+
+
+# ---------- PRODUCER ----------
+def enqueue_email(
+    db: Session,
+    kind: str,
+    to_email: str,
+    subject: str,
+    text: str,
+    html: Optional[str] = None,
+) -> NotificationOutbox:
+    """
+    Queue an email in the outbox. Does NOT commit: the row must land in the
+    same transaction as the alerts / incidents it talks about.
+    """
+    row = NotificationOutbox(
+        kind=kind,
+        recipient=to_email,
+        subject=subject,
+        body_text=text,
+        body_html=html,
+        status="PENDING",
+        attempts=0,
+    )
+    db.add(row)
+    return row
+
+
+# ---------- DIGESTS ----------
+def _coalesce(rows) -> List[Tuple[List[int], str, str, str, Optional[str]]]:
+    """
+    Group claimed rows by (recipient, kind); several rows become one digest.
+    Returns (ids, recipient, subject, text, html) per message to send.
+    """
+    groups: Dict[Tuple[str, str], list] = {}
+    for r in rows:
+        groups.setdefault((r.recipient, r.kind), []).append(r)
+
+    messages = []
+    for (recipient, kind), items in groups.items():
+        ids = [r.id for r in items]
+
+        if len(items) == 1:
+            r = items[0]
+            messages.append((ids, recipient, r.subject, r.body_text, r.body_html))
+            continue
+
+        separator = "\n\n" + "=" * 60 + "\n\n"
+        body = (
+            f"PlatformOPS digest: {len(items)} {kind} notifications"
+            + separator
+            + separator.join(f"{r.subject}\n\n{r.body_text}" for r in items)
+        )
+
+        html = None
+        if all(r.body_html for r in items):
+            html = "<hr>".join(f"<h3>{r.subject}</h3>{r.body_html}" for r in items)
+
+        messages.append((
+            ids,
+            recipient,
+            f"[DIGEST] {len(items)} × {items[0].subject}",
+            body,
+            html,
+        ))
+
+    return messages
+
+
+# ---------- DISPATCH ----------
+def _mark_sent(db: Session, ids: List[int]):
+    db.execute(
+        text("""
+            UPDATE notification_outbox
+            SET status = 'SENT', sent_at = now(), attempts = attempts + 1, last_error = NULL
+            WHERE id = ANY(:ids)
+        """),
+        {"ids": ids},
+    )
+
+
+def _mark_failed(db: Session, ids: List[int], error: str):
+    db.execute(
+        text("""
+            UPDATE notification_outbox
+            SET attempts = attempts + 1,
+                last_error = :error,
+                status = CASE WHEN attempts + 1 >= :max_attempts THEN 'FAILED' ELSE 'PENDING' END,
+                next_attempt_at = now() + make_interval(secs => :backoff * power(2, attempts))
+            WHERE id = ANY(:ids)
+        """),
+        {
+            "ids": ids,
+            "error": error[:2000],
+            "max_attempts": settings.NOTIFY_MAX_ATTEMPTS,
+            "backoff": settings.NOTIFY_BACKOFF_SECONDS,
+        },
+    )
+
+
+def dispatch_due(db: Session, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Claim due PENDING rows (SKIP LOCKED: several app workers can run this),
+    coalesce them per recipient/kind and send everything over ONE SMTP
+    connection. Failures back off exponentially; after NOTIFY_MAX_ATTEMPTS
+    a row is parked as FAILED.
+    """
+    batch_size = batch_size or settings.NOTIFY_BATCH_SIZE
+
+    rows = db.execute(
+        text("""
+            SELECT id, kind, recipient, subject, body_text, body_html
+            FROM notification_outbox
+            WHERE status = 'PENDING' AND next_attempt_at <= now()
+            ORDER BY id
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        """),
+        {"limit": batch_size},
+    ).fetchall()
+
+    stats = {"claimed": len(rows), "sent_messages": 0, "digests": 0, "sent_rows": 0, "failed_rows": 0}
+    if not rows:
+        db.commit()
+        return stats
+
+    messages = _coalesce(rows)
+    pending = list(messages)
+
+    try:
+        with smtp_connection() as server:
+            while pending:
+                ids, recipient, subject, body, html = pending[0]
+                try:
+                    send_message(server, recipient, build_message(recipient, subject, body, html))
+                except (smtplib.SMTPServerDisconnected, OSError):
+                    # connection is gone: everything left is retried later
+                    raise
+                except smtplib.SMTPException as e:
+                    _mark_failed(db, ids, str(e))
+                    stats["failed_rows"] += len(ids)
+                else:
+                    _mark_sent(db, ids)
+                    stats["sent_messages"] += 1
+                    stats["sent_rows"] += len(ids)
+                    stats["digests"] += 1 if len(ids) > 1 else 0
+                pending.pop(0)
+
+    except (smtplib.SMTPException, OSError) as e:
+        for ids, *_ in pending:
+            _mark_failed(db, ids, f"{type(e).__name__}: {e}")
+            stats["failed_rows"] += len(ids)
+
+    db.commit()
+    return stats
+
+
+def outbox_stats(db: Session) -> Dict[str, Any]:
+    rows = db.execute(text("""
+        SELECT status,
+               count(*) AS n,
+               EXTRACT(EPOCH FROM (now() - min(created_at))) AS oldest_age_s
+        FROM notification_outbox
+        GROUP BY status
+    """)).fetchall()
+
+    return {
+        r.status: {
+            "count": r.n,
+            "oldest_age_seconds": round(float(r.oldest_age_s), 1) if r.oldest_age_s is not None else None,
+        }
+        for r in rows
+    }
+
+
+# ---------- BACKGROUND LOOP ----------
+class NotificationDispatcher:
+    """
+    Polls the outbox every NOTIFY_POLL_SECONDS. Bursts written between two
+    polls go out together (and are coalesced into digests).
+    """
+
+    def __init__(self, poll_seconds: int):
+        self.poll_seconds = poll_seconds
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        if db_session.SessionLocal is None:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            full_batch = False
+
+            db = db_session.SessionLocal()
+            try:
+                self.last_run = dispatch_due(db)
+                self.last_error = None
+                full_batch = self.last_run["claimed"] >= settings.NOTIFY_BATCH_SIZE
+            except Exception as e:
+                db.rollback()
+                self.last_error = str(e)
+            finally:
+                db.close()
+
+            if not full_batch:
+                self._stop.wait(self.poll_seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "poll_seconds": self.poll_seconds,
+            "last_run": self.last_run,
+            "last_error": self.last_error,
+        }
+
+
+notification_dispatcher = NotificationDispatcher(poll_seconds=settings.NOTIFY_POLL_SECONDS)
@@ -0,0 +1,251 @@
+# app/services/partition_service.py
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.models.signals import Signal
+
+
+# table -> may be sub-partitioned by component (LIST on component_code)
+PARTITIONED_TABLES = {
+    "timeseries_points": True,
+    "signal_points": False,
+}
+
+_BOUND_RE = re.compile(r"FROM \('?(-?\d+)'?\) TO \('?(-?\d+)'?\)")
+
+
+# ---------- NAMING ----------
+def _q(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def partition_start(tick: int, span: Optional[int] = None) -> int:
+    span = span or settings.PARTITION_TICK_SPAN
+    return (int(tick) // span) * span
+
+
+def partition_name(table: str, start: int) -> str:
+    return f"{table}_p{start:010d}" if start >= 0 else f"{table}_m{-start:010d}"
+
+
+def _component_suffix(component_code: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", component_code.lower())
+
+
+# ---------- INTROSPECTION ----------
+def list_partitions(db: Session, table: str) -> List[Dict[str, Any]]:
+    """
+    Direct partitions of `table` with their tick bounds.
+    """
+    rows = db.execute(
+        text("""
+            SELECT c.relname AS name,
+                   pg_get_expr(c.relpartbound, c.oid) AS bound,
+                   c.relkind = 'p' AS subpartitioned
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = :table
+            ORDER BY c.relname
+        """),
+        {"table": table},
+    ).fetchall()
+
+    partitions = []
+    for r in rows:
+        match = _BOUND_RE.search(r.bound or "")
+        partitions.append({
+            "name": r.name,
+            "is_default": (r.bound or "").strip().upper() == "DEFAULT",
+            "from_tick": int(match.group(1)) if match else None,
+            "to_tick": int(match.group(2)) if match else None,
+            "subpartitioned": bool(r.subpartitioned),
+        })
+
+    return partitions
+
+
+def _default_partition(partitions: List[Dict[str, Any]]) -> Optional[str]:
+    for p in partitions:
+        if p["is_default"]:
+            return p["name"]
+    return None
+
+
+# ---------- CREATION ----------
+def create_partition(
+    db: Session,
+    table: str,
+    start: int,
+    span: Optional[int] = None,
+    components: Optional[List[str]] = None,
+    default_partition: Optional[str] = None,
+) -> str:
+    """
+    Create the [start, start + span) partition of `table`.
+    Rows that already landed in the DEFAULT partition for that range are moved
+    into the new partition (Postgres refuses to create it otherwise).
+    """
+    span = span or settings.PARTITION_TICK_SPAN
+    end = start + span
+    name = partition_name(table, start)
+
+    staged = False
+    if default_partition:
+        staged = bool(db.execute(
+            text(f"SELECT 1 FROM {_q(default_partition)} WHERE tick >= :a AND tick < :b LIMIT 1"),
+            {"a": start, "b": end},
+        ).first())
+
+    if staged:
+        db.execute(text(f"CREATE TEMP TABLE _partition_move (LIKE {_q(table)}) ON COMMIT DROP"))
+        db.execute(
+            text(f"""
+                WITH moved AS (
+                    DELETE FROM {_q(default_partition)}
+                    WHERE tick >= :a AND tick < :b
+                    RETURNING *
+                )
+                INSERT INTO _partition_move SELECT * FROM moved
+            """),
+            {"a": start, "b": end},
+        )
+
+    ddl = f"CREATE TABLE {_q(name)} PARTITION OF {_q(table)} FOR VALUES FROM ({start}) TO ({end})"
+    if components:
+        ddl += " PARTITION BY LIST (component_code)"
+    db.execute(text(ddl))
+
+    for component in components or []:
+        db.execute(text(
+            f"CREATE TABLE {_q(name + '_' + _component_suffix(component))} "
+            f"PARTITION OF {_q(name)} FOR VALUES IN ({_literal(component)})"
+        ))
+    if components:
+        db.execute(text(f"CREATE TABLE {_q(name + '_default')} PARTITION OF {_q(name)} DEFAULT"))
+
+    if staged:
+        db.execute(text(f"INSERT INTO {_q(table)} SELECT * FROM _partition_move"))
+        db.execute(text("DROP TABLE _partition_move"))
+
+    return name
+
+
+def _missing_starts(db: Session, first: int, last: int, span: int) -> Dict[str, List[int]]:
+    missing: Dict[str, List[int]] = {}
+    for table in PARTITIONED_TABLES:
+        existing = {
+            p["from_tick"] for p in list_partitions(db, table) if p["from_tick"] is not None
+        }
+        starts = [s for s in range(first, last + 1, span) if s not in existing]
+        if starts:
+            missing[table] = starts
+    return missing
+
+
+def ensure_partitions(
+    db: Session,
+    to_tick: int,
+    from_tick: Optional[int] = None,
+    premake: Optional[int] = None,
+) -> List[str]:
+    """
+    Make sure every partitioned table covers [from_tick, to_tick] plus
+    `premake` spans ahead, so ingestion never lands in the DEFAULT partition.
+    Concurrent callers (parallel ingestion workers) are serialized with a
+    transaction-level advisory lock; callers should commit soon after a
+    non-empty result so the lock is released. Does NOT commit.
+    """
+    span = settings.PARTITION_TICK_SPAN
+    premake = settings.PARTITION_PREMAKE if premake is None else premake
+    first = partition_start(to_tick if from_tick is None else from_tick, span)
+    last = partition_start(to_tick, span) + premake * span
+
+    # fast path: nothing to create, no lock taken
+    if not _missing_starts(db, first, last, span):
+        return []
+
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext('partition_service'))"))
+    missing = _missing_starts(db, first, last, span)
+
+    components = None
+    if settings.PARTITION_BY_COMPONENT:
+        components = sorted(
+            c for (c,) in db.query(Signal.component_code).distinct().all() if c
+        )
+
+    created = []
+
+    for table, starts in missing.items():
+        default_partition = _default_partition(list_partitions(db, table))
+
+        for start in starts:
+            created.append(create_partition(
+                db,
+                table,
+                start,
+                span=span,
+                components=components if PARTITIONED_TABLES[table] else None,
+                default_partition=default_partition,
+            ))
+
+    return created
+
+
+# ---------- RETENTION ----------
+def expire_partitions(db: Session, before_tick: int, mode: Optional[str] = None) -> List[str]:
+    """
+    Detach (or drop) every partition whose whole range is older than before_tick.
+    Detached tables keep their data and can be archived / re-attached manually.
+    Does NOT commit.
+    """
+    mode = mode or settings.PARTITION_RETENTION_MODE
+    if mode not in ("detach", "drop"):
+        raise ValueError(f"Unknown retention mode: {mode}")
+
+    expired = []
+
+    for table in PARTITIONED_TABLES:
+        for p in list_partitions(db, table):
+            if p["to_tick"] is None or p["to_tick"] > before_tick:
+                continue
+
+            db.execute(text(f"ALTER TABLE {_q(table)} DETACH PARTITION {_q(p['name'])}"))
+            if mode == "drop":
+                db.execute(text(f"DROP TABLE {_q(p['name'])}"))
+            expired.append(p["name"])
+
+    return expired
+
+
+def maintain_partitions(db: Session) -> Dict[str, Any]:
+    """
+    Periodic job: create partitions ahead of the latest tick and apply retention.
+    """
+    latest = db.execute(text("SELECT max(tick) FROM timeseries_points")).scalar()
+    if latest is None:
+        latest = 0
+
+    created = ensure_partitions(db, to_tick=int(latest))
+
+    expired: List[str] = []
+    if settings.PARTITION_RETENTION_TICKS is not None:
+        cutoff = int(latest) - int(settings.PARTITION_RETENTION_TICKS)
+        expired = expire_partitions(db, before_tick=cutoff)
+
+    db.commit()
+
+    return {
+        "latest_tick": int(latest),
+        "created": created,
+        "expired": expired,
+        "retention_mode": settings.PARTITION_RETENTION_MODE,
+    }
@@ -1,8 +1,8 @@
 # app/services/patterns_service.py
 import statistics
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from app.db.models.signals import Signal
+from app.services.signal_points_service import fetch_signal_points
 
 
 def detect_spikes(db: Session, window: int = 50, zscore: float = 3.0):
@@ -11,23 +11,10 @@ def detect_spikes(db: Session, window: int = 50, zscore: float = 3.0):
     signals = db.query(Signal).all()
 
     for s in signals:
-        sql = """
-        SELECT tick, (payload ->> :column)::double precision AS value
-        FROM timeseries_points
-        WHERE component_code = :component
-          AND payload ? :column
-        ORDER BY tick DESC
-        LIMIT :window
-        """
-
-        rows = db.execute(
-            text(sql),
-            {
-                "component": s.component_code,
-                "column": s.column_name,
-                "window": window
-            }
-        ).fetchall()
+        # newest first (same scan order as before)
+        rows = list(reversed(
+            fetch_signal_points(db, s.component_code, s.column_name, limit=window)
+        ))
 
         values = [r.value for r in rows if r.value is not None]
 
@@ -60,23 +47,10 @@ def detect_recovery(db: Session, window: int = 30):
     signals = db.query(Signal).filter(Signal.signal_type == "yi").all()
 
     for s in signals:
-        sql = """
-        SELECT tick, (payload ->> :column)::double precision AS value
-        FROM timeseries_points
-        WHERE component_code = :component
-          AND payload ? :column
-        ORDER BY tick DESC
-        LIMIT :window
-        """
-
-        rows = db.execute(
-            text(sql),
-            {
-                "component": s.component_code,
-                "column": s.column_name,
-                "window": window
-            }
-        ).fetchall()
+        # newest first (same scan order as before)
+        rows = list(reversed(
+            fetch_signal_points(db, s.component_code, s.column_name, limit=window)
+        ))
 
         values = [r.value for r in rows if r.value is not None]
 
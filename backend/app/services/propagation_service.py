@@ -1,7 +1,66 @@
 # app/services/propagation_service.py
+from typing import Dict
+
 import numpy as np
 from sqlalchemy.orm import Session
-from app.services.timeseries_service import get_timeseries
+
+from app.db.models.signals import Signal
+from app.services.signal_points_service import fetch_signal_matrix
+
+MIN_LAG_PAIRS = 3
+
+
+def _xcorr(a: np.ndarray, b: np.ndarray, nfft: int, max_lag: int) -> np.ndarray:
+    """
+    c[L] = sum_i a[i + L] * b[i] for L in -max_lag..max_lag, via FFT.
+    """
+    c = np.fft.irfft(np.fft.rfft(a, nfft) * np.conj(np.fft.rfft(b, nfft)), nfft)
+    return np.concatenate([c[nfft - max_lag:], c[: max_lag + 1]])
+
+
+def lagged_correlation(src: np.ndarray, tgt: np.ndarray, max_lag: int) -> Dict[str, np.ndarray]:
+    """
+    Pearson correlation of src[i + lag] with tgt[i] for every lag in
+    -max_lag..max_lag, over the ticks where both values exist (NaN = gap).
+
+    The six sums behind each coefficient (pairs, sums, squares, cross
+    products over the overlap) are masked cross-correlations, so the whole
+    curve costs a handful of FFTs: O(n log n) whatever max_lag is.
+    """
+    ms = ~np.isnan(src)
+    mt = ~np.isnan(tgt)
+
+    # centre first: keeps the moment sums well conditioned
+    xs = np.where(ms, src - (np.nanmean(src) if ms.any() else 0.0), 0.0)
+    xt = np.where(mt, tgt - (np.nanmean(tgt) if mt.any() else 0.0), 0.0)
+    ms = ms.astype(float)
+    mt = mt.astype(float)
+
+    n = len(src)
+    max_lag = min(max_lag, max(n - 1, 0))
+    nfft = 1 << int(np.ceil(np.log2(max(2 * n, 2))))
+
+    pairs = np.rint(_xcorr(ms, mt, nfft, max_lag))
+    sx = _xcorr(xs, mt, nfft, max_lag)
+    sy = _xcorr(ms, xt, nfft, max_lag)
+    sxy = _xcorr(xs, xt, nfft, max_lag)
+    sxx = _xcorr(xs * xs, mt, nfft, max_lag)
+    syy = _xcorr(ms, xt * xt, nfft, max_lag)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = pairs * sxy - sx * sy
+        var = (pairs * sxx - sx * sx) * (pairs * syy - sy * sy)
+        corr = np.where(
+            (pairs >= MIN_LAG_PAIRS) & (var > 1e-12 * np.maximum(pairs, 1) ** 2),
+            cov / np.sqrt(np.clip(var, 0, None)),
+            np.nan,
+        )
+
+    return {
+        "lags": np.arange(-max_lag, max_lag + 1),
+        "correlation": np.clip(corr, -1.0, 1.0),
+        "pairs": pairs.astype(np.int64),
+    }
 
 
 def compute_propagation(
@@ -9,42 +68,44 @@ def compute_propagation(
     source_signal: str,
     target_signal: str,
     window: int = 30,
+    include_curve: bool = False,
 ):
-    src = get_timeseries(db, source_signal, None, None)
-    tgt = get_timeseries(db, target_signal, None, None)
-
-    if len(src) < window or len(tgt) < window:
-        raise ValueError("Insufficient data for propagation analysis")
-
-    # Align by tick
-    src_values = np.array([p["value"] for p in src], dtype=float)
-    tgt_values = np.array([p["value"] for p in tgt], dtype=float)
+    """
+    Best lagged correlation between two signals within +/- window ticks.
+    A positive lag pairs source[t + lag] with target[t].
+    Both series are aligned on tick (gaps stay gaps, they are never
+    shifted into each other's positions).
+    """
+    signals = {
+        s.signal_code: s
+        for s in db.query(Signal).filter(Signal.signal_code.in_([source_signal, target_signal])).all()
+    }
+    for code in (source_signal, target_signal):
+        if code not in signals:
+            raise ValueError(f"Unknown signal_code: {code}")
 
-    # Remove NaNs
-    mask = ~np.isnan(src_values) & ~np.isnan(tgt_values)
-    src_values = src_values[mask]
-    tgt_values = tgt_values[mask]
+    ids = [signals[source_signal].id, signals[target_signal].id]
+    ticks, values, present = fetch_signal_matrix(db, ids, from_tick=0)
 
-    # Normalize
-    src_z = (src_values - src_values.mean()) / src_values.std()
-    tgt_z = (tgt_values - tgt_values.mean()) / tgt_values.std()
+    if present[:, 0].sum() < window or present[:, 1].sum() < window:
+        raise ValueError("Insufficient data for propagation analysis")
 
-    best_corr = 0.0
-    best_lag = 0
+    # dense tick grid: one slot per tick, NaN where a signal has no value
+    grid = np.full((int(ticks[-1] - ticks[0]) + 1, 2), np.nan)
+    grid[ticks - ticks[0]] = values
 
-    for lag in range(-window, window + 1):
-        if lag < 0:
-            corr = np.corrcoef(src_z[:lag], tgt_z[-lag:])[0, 1]
-        elif lag > 0:
-            corr = np.corrcoef(src_z[lag:], tgt_z[:-lag])[0, 1]
-        else:
-            corr = np.corrcoef(src_z, tgt_z)[0, 1]
+    curve = lagged_correlation(grid[:, 0], grid[:, 1], window)
+    corr = curve["correlation"]
 
-        if abs(corr) > abs(best_corr):
-            best_corr = corr
-            best_lag = lag
+    if np.isnan(corr).all():
+        best_corr, best_lag, best_pairs = 0.0, 0, 0
+    else:
+        k = int(np.nanargmax(np.abs(corr)))
+        best_corr = float(corr[k])
+        best_lag = int(curve["lags"][k])
+        best_pairs = int(curve["pairs"][k])
 
-    confidence = abs(best_corr) * (len(src_z) / len(src))
+    confidence = abs(best_corr) * (best_pairs / int(present[:, 0].sum()))
 
     classification = (
         "strong_positive_propagation"
@@ -52,7 +113,7 @@ def compute_propagation(
         else "weak_or_no_propagation"
     )
 
-    return {
+    result = {
         "source_signal": source_signal,
         "target_signal": target_signal,
         "window": window,
@@ -61,3 +122,15 @@ def compute_propagation(
         "confidence": round(float(confidence), 3),
         "classification": classification,
     }
+
+    if include_curve:
+        result["curve"] = [
+            {
+                "lag": int(lag),
+                "correlation": None if np.isnan(c) else round(float(c), 4),
+                "pairs": int(p),
+            }
+            for lag, c, p in zip(curve["lags"], corr, curve["pairs"])
+        ]
+
+    return result
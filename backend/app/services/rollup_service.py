@@ -0,0 +1,310 @@
+# app/services/rollup_service.py
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+from app.core.config import settings
+
+# Rollup pyramid over signal_points.
+#
+# signal_rollups holds, per signal and per resolution r, one row for every
+# bucket [b, b + r) (b a multiple of r) with count / min / max / sum /
+# sum of squares of the non-NULL values. The finest level is aggregated
+# from signal_points; every coarser level from the largest finer level
+# that divides it (10 -> 60 -> 600 reads 6 and 10 child rows per bucket).
+#
+# Writers only recompute the buckets their ticks fall in, level by level,
+# so keeping the pyramid current costs a few index range reads per batch.
+
+
+# ---------- LEVELS ----------
+def rollup_levels() -> List[Tuple[int, Optional[int]]]:
+    """
+    [(resolution, child resolution or None = from signal_points)], finest first.
+    """
+    levels: List[Tuple[int, Optional[int]]] = []
+    for r in sorted(set(int(r) for r in settings.ROLLUP_RESOLUTIONS if int(r) > 1)):
+        child = None
+        for finer, _ in levels:
+            if r % finer == 0:
+                child = finer
+        levels.append((r, child))
+    return levels
+
+
+def _bucket(expr: str, resolution: int) -> str:
+    # floor to a multiple of resolution (also for negative ticks)
+    return f"{expr} - mod(mod({expr}, {resolution}) + {resolution}, {resolution})"
+
+
+_UPSERT = """
+    INSERT INTO signal_rollups (signal_id, resolution, bucket, n, vmin, vmax, vsum, vsumsq)
+    {select}
+    ON CONFLICT (signal_id, resolution, bucket) DO UPDATE SET
+        n = EXCLUDED.n,
+        vmin = EXCLUDED.vmin,
+        vmax = EXCLUDED.vmax,
+        vsum = EXCLUDED.vsum,
+        vsumsq = EXCLUDED.vsumsq
+"""
+
+_FROM_POINTS = """
+    SELECT k.signal_id, {r}, k.bucket,
+           count(sp.value),
+           min(sp.value),
+           max(sp.value),
+           COALESCE(sum(sp.value), 0),
+           COALESCE(sum(sp.value * sp.value), 0)
+    FROM ({keys}) k
+    JOIN signal_points sp
+      ON sp.signal_id = k.signal_id
+     AND sp.tick >= k.bucket
+     AND sp.tick < k.bucket + {r}
+    GROUP BY k.signal_id, k.bucket
+"""
+
+_FROM_CHILD = """
+    SELECT k.signal_id, {r}, k.bucket,
+           sum(c.n),
+           min(c.vmin),
+           max(c.vmax),
+           sum(c.vsum),
+           sum(c.vsumsq)
+    FROM ({keys}) k
+    JOIN signal_rollups c
+      ON c.signal_id = k.signal_id
+     AND c.resolution = {child}
+     AND c.bucket >= k.bucket
+     AND c.bucket < k.bucket + {r}
+    GROUP BY k.signal_id, k.bucket
+"""
+
+
+def _level_statements(source: str) -> List[str]:
+    """
+    One upsert per level, finest first. `source` yields (signal_id, tick)
+    rows that were just written.
+    """
+    statements = []
+    for r, child in rollup_levels():
+        keys = f"SELECT DISTINCT signal_id, {_bucket('tick', r)} AS bucket FROM ({source}) src"
+        template = _FROM_POINTS if child is None else _FROM_CHILD
+        statements.append(_UPSERT.format(select=template.format(keys=keys, r=r, child=child)))
+    return statements
+
+
+def stage_rollup_statements() -> List[str]:
+    """
+    Used by the COPY loader, on its raw cursor, right after the signal_points upsert.
+    """
+    return _level_statements("SELECT signal_id, tick FROM _signal_points_stage")
+
+
+_KEYS_FROM_ARRAYS = """
+    SELECT signal_id, tick
+    FROM unnest(CAST(:signal_ids AS integer[]), CAST(:ticks AS integer[])) AS u(signal_id, tick)
+"""
+
+
+# ---------- WRITES ----------
+def refresh_signal_rollups(db: Session, points: Iterable[Tuple[int, int]]) -> int:
+    """
+    Recompute the buckets containing the (signal_id, tick) points that were
+    just written. Does NOT commit.
+    """
+    points = list(points)
+    if not points:
+        return 0
+
+    params = {
+        "signal_ids": [int(s) for s, _ in points],
+        "ticks": [int(t) for _, t in points],
+    }
+    return sum(
+        db.execute(text(sql), params).rowcount or 0
+        for sql in _level_statements(_KEYS_FROM_ARRAYS)
+    )
+
+
+def rebuild_signal_rollups(db: Session, signal_codes: Optional[List[str]] = None) -> int:
+    """
+    Full recompute (e.g. after a backfill, or after ROLLUP_RESOLUTIONS
+    changed). Does NOT commit.
+    """
+    params: Dict[str, Any] = {}
+    where = ""
+
+    if signal_codes is not None:
+        if not signal_codes:
+            return 0
+        where = "WHERE signal_id IN (SELECT id FROM signals WHERE signal_code = ANY(:signal_codes))"
+        params["signal_codes"] = list(signal_codes)
+
+    # drop everything first: buckets of removed points and of resolutions
+    # no longer configured must not survive
+    db.execute(text(f"DELETE FROM signal_rollups {where}"), params)
+
+    return sum(
+        db.execute(text(sql), params).rowcount or 0
+        for sql in _level_statements(f"SELECT signal_id, tick FROM signal_points {where}")
+    )
+
+
+# ---------- READS ----------
+def pick_resolution(size: int, start: int) -> Optional[int]:
+    """
+    Coarsest rollup level whose buckets tile [start, start + k * size)
+    exactly; None when only raw points can answer.
+    """
+    best = None
+    for r, _ in rollup_levels():
+        if size % r == 0 and start % r == 0:
+            best = r
+    return best
+
+
+def budget_bucket_size(from_tick: int, to_tick: int, max_points: int) -> int:
+    """
+    Finest bucket size (1 = raw ticks, else a rollup level) that shows
+    [from_tick, to_tick] in at most max_points buckets. Falls back to a
+    multiple of the coarsest level when even that has too many.
+    """
+    span = to_tick - from_tick + 1
+    if span <= max_points:
+        return 1
+
+    levels = [r for r, _ in rollup_levels()]
+    for r in levels:
+        # aligned buckets can straddle both ends
+        if span // r + 2 <= max_points:
+            return r
+
+    coarsest = levels[-1] if levels else 1
+    return coarsest * -(-(span // coarsest + 2) // max_points)
+
+
+def bucket_moments(
+    db: Session,
+    signal_ids: List[int],
+    start: int,
+    size: int,
+    buckets: int,
+) -> Dict[str, Any]:
+    """
+    Moments of every signal over `buckets` consecutive buckets
+    [start + k * size, start + (k + 1) * size), read from the coarsest
+    rollup level that tiles them (raw signal_points otherwise).
+
+    Returns {"resolution": level used (1 = raw), "start": (B,) bucket
+    starts, "n", "min", "max", "sum", "sumsq": (B, S) arrays} with
+    columns in the order of signal_ids; min / max are NaN where n = 0.
+    """
+    B, S = max(int(buckets), 0), len(signal_ids)
+    out: Dict[str, Any] = {
+        "resolution": 1,
+        "start": start + size * np.arange(B, dtype=np.int64),
+        "n": np.zeros((B, S), dtype=np.int64),
+        "min": np.full((B, S), np.nan),
+        "max": np.full((B, S), np.nan),
+        "sum": np.zeros((B, S)),
+        "sumsq": np.zeros((B, S)),
+    }
+    if not B or not S:
+        return out
+
+    params = {"ids": list(signal_ids), "start": start, "end": start + B * size, "size": size}
+    resolution = pick_resolution(size, start)
+
+    if resolution is None:
+        sql = """
+            SELECT signal_id, (tick - :start) / :size AS k,
+                   count(value) AS n, min(value) AS vmin, max(value) AS vmax,
+                   COALESCE(sum(value), 0) AS vsum,
+                   COALESCE(sum(value * value), 0) AS vsumsq
+            FROM signal_points
+            WHERE signal_id = ANY(:ids)
+              AND tick >= :start AND tick < :end
+            GROUP BY signal_id, k
+        """
+    else:
+        out["resolution"] = resolution
+        params["resolution"] = resolution
+        sql = """
+            SELECT signal_id, (bucket - :start) / :size AS k,
+                   sum(n) AS n, min(vmin) AS vmin, max(vmax) AS vmax,
+                   sum(vsum) AS vsum, sum(vsumsq) AS vsumsq
+            FROM signal_rollups
+            WHERE resolution = :resolution
+              AND signal_id = ANY(:ids)
+              AND bucket >= :start AND bucket < :end
+            GROUP BY signal_id, k
+        """
+
+    rows = db.execute(text(sql), params).fetchall()
+    if not rows:
+        return out
+
+    col_of = {sid: c for c, sid in enumerate(signal_ids)}
+    k = np.fromiter((r.k for r in rows), dtype=np.int64, count=len(rows))
+    c = np.fromiter((col_of[r.signal_id] for r in rows), dtype=np.int64, count=len(rows))
+
+    out["n"][k, c] = [int(r.n) for r in rows]
+    out["min"][k, c] = [np.nan if r.vmin is None else r.vmin for r in rows]
+    out["max"][k, c] = [np.nan if r.vmax is None else r.vmax for r in rows]
+    out["sum"][k, c] = [float(r.vsum) for r in rows]
+    out["sumsq"][k, c] = [float(r.vsumsq) for r in rows]
+    return out
+
+
+def moments_std(n: np.ndarray, total: np.ndarray, sumsq: np.ndarray) -> np.ndarray:
+    """
+    Sample standard deviation from count / sum / sum of squares
+    (NaN below two values), same as statistics.stdev.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (sumsq - total * total / np.maximum(n, 1)) / (n - 1)
+    return np.where(n >= 2, np.sqrt(np.clip(var, 0.0, None)), np.nan)
+
+
+def signal_rollup_series(
+    db: Session,
+    signal_id: int,
+    from_tick: int,
+    to_tick: int,
+    max_points: int,
+) -> Dict[str, Any]:
+    """
+    [from_tick, to_tick] of one signal in at most max_points buckets, at
+    the finest resolution the budget allows (served by the pyramid).
+    """
+    size = budget_bucket_size(from_tick, to_tick, max_points)
+    start = from_tick - from_tick % size
+    buckets = (to_tick - start) // size + 1
+
+    m = bucket_moments(db, [signal_id], start, size, buckets)
+    n, total = m["n"][:, 0], m["sum"][:, 0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(n > 0, total / np.maximum(n, 1), np.nan)
+    std = moments_std(n, total, m["sumsq"][:, 0])
+
+    def _f(x):
+        return None if np.isnan(x) else float(x)
+
+    return {
+        "bucket_size": size,
+        "source_resolution": m["resolution"],
+        "buckets": [
+            {
+                "tick": int(m["start"][k]),
+                "count": int(n[k]),
+                "min": _f(m["min"][k, 0]),
+                "max": _f(m["max"][k, 0]),
+                "mean": _f(mean[k]),
+                "std": _f(std[k]),
+            }
+            for k in range(len(n))
+            if n[k] > 0
+        ],
+    }
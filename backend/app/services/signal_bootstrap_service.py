@@ -2,6 +2,8 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.db.models.signals import Signal
+from app.services.signal_points_service import backfill_signal_points
+from app.ingestion.live_writer import live_writer
 
 
 def bootstrap_signals_from_payload(db: Session):
@@ -22,6 +24,7 @@ def bootstrap_signals_from_payload(db: Session):
     }
 
     created = 0
+    new_codes = []
 
     for key in payload.keys():
         signal_code = f"{component}.{key}"
@@ -35,7 +38,13 @@ def bootstrap_signals_from_payload(db: Session):
                 column_name=key,
             )
         )
+        new_codes.append(signal_code)
         created += 1
 
+    db.flush()
+    backfill_signal_points(db, new_codes)
+
     db.commit()
+    # the live writer must map the new columns from its next drain on
+    live_writer.forget_signals()
     return created
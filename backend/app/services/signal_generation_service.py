@@ -2,6 +2,8 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.db.models.signals import Signal
+from app.services.signal_points_service import backfill_signal_points
+from app.ingestion.live_writer import live_writer
 
 def infer_signal_type(column_name: str) -> str:
     if column_name.startswith("y"):
@@ -58,6 +60,7 @@ def generate_signals(db: Session):
     """)).mappings().all()
 
     created = 0
+    new_codes = []
 
     for row in rows:
         component = row["component_code"]
@@ -88,7 +91,15 @@ def generate_signals(db: Session):
             )
 
             db.add(signal)
+            new_codes.append(signal_code)
             created += 1
 
+    db.flush()
+
+    # values ingested before the signal existed -> signal_points
+    backfill_signal_points(db, new_codes)
+
     db.commit()
+    # the live writer must map the new columns from its next drain on
+    live_writer.forget_signals()
     return created
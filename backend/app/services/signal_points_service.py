@@ -0,0 +1,267 @@
+# app/services/signal_points_service.py
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+from app.db.models.signals import Signal
+from app.services.health_snapshot_service import rebuild_health_snapshots
+from app.services.rollup_service import rebuild_signal_rollups, refresh_signal_rollups
+
+
+# ---------- VALUE NORMALIZATION ----------
+def to_point_value(value: Any) -> Optional[float]:
+    """
+    Convert a payload value to what signal_points stores.
+    NaN / inf / non-numeric -> NULL (same as the JSONB cast would yield).
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    value = float(value)
+    if math.isnan(value) or math.isinf(value):
+        return None
+    return value
+
+
+def signal_ids_by_column(db: Session, component_code: str) -> Dict[str, int]:
+    rows = (
+        db.query(Signal.column_name, Signal.id)
+        .filter(Signal.component_code == component_code)
+        .all()
+    )
+    return {column: signal_id for column, signal_id in rows}
+
+
+# ---------- WRITES ----------
+UPSERT_SQL = """
+    INSERT INTO signal_points (signal_id, tick, value)
+    VALUES (:signal_id, :tick, :value)
+    ON CONFLICT (signal_id, tick) DO UPDATE SET value = EXCLUDED.value
+"""
+
+
+def upsert_signal_values(db: Session, values: Iterable[Tuple[int, int, Optional[float]]]) -> int:
+    """
+    values: (signal_id, tick, value) triples. Their rollup buckets are
+    recomputed in the same transaction.
+    Does NOT commit: callers keep it in the same transaction as the payload write.
+    """
+    params = [
+        {"signal_id": signal_id, "tick": tick, "value": value}
+        for signal_id, tick, value in values
+    ]
+    if not params:
+        return 0
+
+    db.execute(text(UPSERT_SQL), params)
+    refresh_signal_rollups(db, [(p["signal_id"], p["tick"]) for p in params])
+    return len(params)
+
+
+def write_signal_points(
+    db: Session,
+    component_code: str,
+    points: Iterable[Tuple[int, Dict[str, Any]]],
+) -> int:
+    """
+    Dual write of (tick, payload) rows into signal_points.
+    Columns without a registered Signal are skipped; they are picked up by
+    backfill_signal_points() once the signal catalog knows them.
+    """
+    ids = signal_ids_by_column(db, component_code)
+    if not ids:
+        return 0
+
+    values: List[Tuple[int, int, Optional[float]]] = []
+    for tick, payload in points:
+        for column, raw in payload.items():
+            signal_id = ids.get(column)
+            if signal_id is not None:
+                values.append((signal_id, int(tick), to_point_value(raw)))
+
+    return upsert_signal_values(db, values)
+
+
+def backfill_signal_points(db: Session, signal_codes: Optional[List[str]] = None) -> int:
+    """
+    Rebuild signal_points from timeseries_points payloads.
+    Used for newly discovered signals (or all of them when signal_codes is None).
+    """
+    sql = """
+        INSERT INTO signal_points (signal_id, tick, value)
+        SELECT DISTINCT ON (s.id, tp.tick)
+               s.id,
+               tp.tick,
+               CASE
+                   WHEN jsonb_typeof(tp.payload -> s.column_name) = 'number'
+                   THEN (tp.payload ->> s.column_name)::double precision
+               END
+        FROM signals s
+        JOIN timeseries_points tp
+          ON tp.component_code = s.component_code
+         AND tp.payload ? s.column_name
+    """
+    params: Dict[str, Any] = {}
+
+    if signal_codes is not None:
+        if not signal_codes:
+            return 0
+        sql += " WHERE s.signal_code = ANY(:signal_codes)"
+        params["signal_codes"] = list(signal_codes)
+
+    sql += """
+        ORDER BY s.id, tp.tick, tp.id DESC
+        ON CONFLICT (signal_id, tick) DO UPDATE SET value = EXCLUDED.value
+    """
+
+    written = db.execute(text(sql), params).rowcount or 0
+
+    # new yi values change the health history of their components
+    yi_sql = "SELECT DISTINCT component_code FROM signals WHERE signal_type = 'yi'"
+    if signal_codes is not None:
+        yi_sql += " AND signal_code = ANY(:signal_codes)"
+    components = [r[0] for r in db.execute(text(yi_sql), params).fetchall()]
+    rebuild_health_snapshots(db, components)
+    rebuild_signal_rollups(db, signal_codes)
+
+    return written
+
+
+# ---------- READS ----------
+def fetch_signal_points(
+    db: Session,
+    component_code: str,
+    column_name: str,
+    from_tick: Optional[int] = None,
+    to_tick: Optional[int] = None,
+    limit: Optional[int] = None,
+):
+    """
+    Index range scan over signal_points for one signal.
+    With `limit`, the latest `limit` ticks are returned.
+    Rows (tick, value) are always returned in ascending tick order.
+    """
+    sql = """
+        SELECT sp.tick, sp.value
+        FROM signal_points sp
+        JOIN signals s ON s.id = sp.signal_id
+        WHERE s.component_code = :component
+          AND s.column_name = :column
+    """
+    params: Dict[str, Any] = {"component": component_code, "column": column_name}
+
+    if from_tick is not None:
+        sql += " AND sp.tick >= :from_tick"
+        params["from_tick"] = from_tick
+
+    if to_tick is not None:
+        sql += " AND sp.tick <= :to_tick"
+        params["to_tick"] = to_tick
+
+    if limit is not None:
+        sql += " ORDER BY sp.tick DESC LIMIT :limit"
+        params["limit"] = limit
+        rows = db.execute(text(sql), params).fetchall()
+        return list(reversed(rows))
+
+    sql += " ORDER BY sp.tick"
+    return db.execute(text(sql), params).fetchall()
+
+
+def latest_signal_ticks(db: Session, signal_ids: List[int]) -> Dict[int, int]:
+    """
+    Latest stored tick per signal (one backward index probe each).
+    """
+    if not signal_ids:
+        return {}
+
+    rows = db.execute(
+        text("""
+            SELECT ids.signal_id,
+                   (SELECT max(sp.tick) FROM signal_points sp WHERE sp.signal_id = ids.signal_id) AS tick
+            FROM unnest(CAST(:ids AS INTEGER[])) AS ids(signal_id)
+        """),
+        {"ids": list(signal_ids)},
+    ).fetchall()
+
+    return {r.signal_id: int(r.tick) for r in rows if r.tick is not None}
+
+
+def fetch_signal_matrix(
+    db: Session,
+    signal_ids: List[int],
+    from_tick: Optional[int],
+    to_tick: Optional[int] = None,
+):
+    """
+    Many signals in one query, pivoted to a dense ticks x signals matrix.
+    Returns (ticks, values, present):
+      ticks   (T,)   ascending
+      values  (T, S) float, NaN where NULL or missing
+      present (T, S) bool, True where a row exists (even with a NULL value)
+    Columns follow the order of `signal_ids`.
+    """
+    sql = """
+        SELECT sp.signal_id, sp.tick, sp.value
+        FROM signal_points sp
+        WHERE sp.signal_id = ANY(:ids)
+    """
+    params: Dict[str, Any] = {"ids": list(signal_ids)}
+
+    if from_tick is not None:
+        sql += " AND sp.tick >= :from_tick"
+        params["from_tick"] = from_tick
+
+    if to_tick is not None:
+        sql += " AND sp.tick <= :to_tick"
+        params["to_tick"] = to_tick
+
+    return _pivot(db.execute(text(sql), params).fetchall(), signal_ids)
+
+
+def fetch_signal_tails(db: Session, signal_ids: List[int], rows: int):
+    """
+    The last `rows` stored rows of every signal (one backward index range
+    each, whatever the gaps or sampling rate), pivoted like
+    fetch_signal_matrix.
+    """
+    result = db.execute(
+        text("""
+            SELECT sp.signal_id, sp.tick, sp.value
+            FROM unnest(CAST(:ids AS INTEGER[])) AS ids(signal_id)
+            JOIN LATERAL (
+                SELECT signal_id, tick, value
+                FROM signal_points
+                WHERE signal_id = ids.signal_id
+                ORDER BY tick DESC
+                LIMIT :rows
+            ) sp ON true
+        """),
+        {"ids": list(signal_ids), "rows": int(rows)},
+    ).fetchall()
+    return _pivot(result, signal_ids)
+
+
+def _pivot(rows, signal_ids: List[int]):
+    if not rows:
+        empty = np.empty((0, len(signal_ids)))
+        return np.empty(0, dtype=np.int64), empty, empty.astype(bool)
+
+    sid, tick, value = zip(*rows)
+    sid = np.asarray(sid, dtype=np.int64)
+    value = np.asarray([np.nan if v is None else v for v in value], dtype=float)
+
+    ticks, row = np.unique(np.asarray(tick, dtype=np.int64), return_inverse=True)
+
+    order = np.argsort(signal_ids)
+    sorted_ids = np.asarray(signal_ids, dtype=np.int64)[order]
+    col = order[np.searchsorted(sorted_ids, sid)]
+
+    values = np.full((len(ticks), len(signal_ids)), np.nan)
+    present = np.zeros((len(ticks), len(signal_ids)), dtype=bool)
+    values[row, col] = value
+    present[row, col] = True
+
+    return ticks, values, present
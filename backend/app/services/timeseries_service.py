@@ -1,20 +1,30 @@
 import statistics
 import math
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from sqlalchemy.orm import Session
-from sqlalchemy import Float, text
+from sqlalchemy import text
 
 from app.db.models.signals import Signal
-from app.db.models.timeseries import TimeSeriesPoint
+from app.services.signal_points_service import fetch_signal_matrix, fetch_signal_points
+from app.services.rollup_service import bucket_moments, signal_rollup_series
+from app.observability.downsample import DOWNSAMPLE_METHODS, downsample_indices, downsample_points
 
 
-def get_timeseries(
+def timeseries_columns(
     db: Session,
     signal_code: str,
     from_tick: Optional[int],
     to_tick: Optional[int],
-):
+    max_points: Optional[int] = None,
+    method: str = "lttb",
+) -> Dict[str, np.ndarray]:
+    """
+    One signal as columns: tick (int64), timestamp (int64, -1 = unknown)
+    and value (float64, NaN = NULL), downsampled to max_points if given.
+    """
     # 1️⃣ Load signal metadata
     signal = (
         db.query(Signal)
@@ -25,61 +35,163 @@ def get_timeseries(
     if not signal:
         raise ValueError(f"Unknown signal_code: {signal_code}")
 
-    component_code = signal.component_code
-    column_name = signal.column_name
-
-    # 2️⃣ Build SQL dynamically (JSONB extraction)
-    sql = f"""
+    # 2️⃣ Range scan over the narrow value table (timestamp via covering index)
+    sql = """
         SELECT
-            tick,
-            timestamp,
-            (payload ->> :column_name)::double precision AS value
-        FROM timeseries_points
-        WHERE component_code = :component_code
-          AND payload ? :column_name
+            sp.tick,
+            ts.timestamp,
+            sp.value
+        FROM signal_points sp
+        LEFT JOIN LATERAL (
+            SELECT tp.timestamp
+            FROM timeseries_points tp
+            WHERE tp.component_code = :component_code
+              AND tp.tick = sp.tick
+            LIMIT 1
+        ) ts ON TRUE
+        WHERE sp.signal_id = :signal_id
     """
 
     params = {
-        "component_code": component_code,
-        "column_name": column_name,
+        "component_code": signal.component_code,
+        "signal_id": signal.id,
     }
 
     if from_tick is not None:
-        sql += " AND tick >= :from_tick"
+        sql += " AND sp.tick >= :from_tick"
         params["from_tick"] = from_tick
 
     if to_tick is not None:
-        sql += " AND tick <= :to_tick"
+        sql += " AND sp.tick <= :to_tick"
         params["to_tick"] = to_tick
 
-    sql += " ORDER BY tick"
+    sql += " ORDER BY sp.tick"
 
     rows = db.execute(text(sql), params).fetchall()
 
-    # 3️⃣ Format for frontend charts
+    # 3️⃣ Columns (bounded by max_points when given)
+    n = len(rows)
+    ticks = np.fromiter((r.tick for r in rows), dtype=np.int64, count=n)
+    timestamps = np.fromiter(
+        (-1 if r.timestamp is None else r.timestamp for r in rows), dtype=np.int64, count=n
+    )
+    values = np.fromiter(
+        (np.nan if r.value is None else r.value for r in rows), dtype=np.float64, count=n
+    )
+
+    keep = downsample_indices(ticks, values, max_points, method)
+    if len(keep) < n:
+        ticks, timestamps, values = ticks[keep], timestamps[keep], values[keep]
+
+    return {"tick": ticks, "timestamp": timestamps, "value": values}
+
+
+def get_timeseries(
+    db: Session,
+    signal_code: str,
+    from_tick: Optional[int],
+    to_tick: Optional[int],
+    max_points: Optional[int] = None,
+    method: str = "lttb",
+):
+    columns = timeseries_columns(db, signal_code, from_tick, to_tick, max_points, method)
+    return columns_to_points(columns)
+
+
+def columns_to_points(columns: Dict[str, np.ndarray]):
+    # Format for frontend charts
     return [
         {
-            "tick": r.tick,
-            "timestamp": r.timestamp,
-            "value": r.value,
+            "tick": t,
+            "timestamp": None if ts < 0 else ts,
+            "value": None if math.isnan(v) else v,
         }
-        for r in rows
+        for t, ts, v in zip(
+            columns["tick"].tolist(),
+            columns["timestamp"].tolist(),
+            columns["value"].tolist(),
+        )
     ]
 
 
-def _extract_series(db, component_code, column_name, limit=30):
-    rows = (
-        db.query(
-            TimeSeriesPoint.tick,
-            TimeSeriesPoint.payload[column_name].astext.cast(Float)
-        )
-        .filter(TimeSeriesPoint.component_code == component_code)
-        .order_by(TimeSeriesPoint.tick.desc())
-        .limit(limit)
-        .all()
+def rollup_timeseries(
+    db: Session,
+    signal_code: str,
+    from_tick: Optional[int],
+    to_tick: Optional[int],
+    max_points: int = 500,
+):
+    """
+    Zoomable chart series: [from_tick, to_tick] (default: the whole signal)
+    as at most max_points count / min / max / mean / std buckets, at the
+    finest resolution the point budget allows.
+    """
+    signal = (
+        db.query(Signal)
+        .filter(Signal.signal_code == signal_code)
+        .one_or_none()
     )
+    if not signal:
+        raise ValueError(f"Unknown signal_code: {signal_code}")
 
-    return [r[1] for r in reversed(rows) if r[1] is not None]
+    if from_tick is None or to_tick is None:
+        first, last = db.execute(
+            text("SELECT min(tick), max(tick) FROM signal_points WHERE signal_id = :signal_id"),
+            {"signal_id": signal.id},
+        ).one()
+        if first is None:
+            return {
+                "signal_code": signal_code,
+                "from_tick": None,
+                "to_tick": None,
+                "bucket_size": None,
+                "source_resolution": None,
+                "buckets": [],
+            }
+        from_tick = first if from_tick is None else from_tick
+        to_tick = last if to_tick is None else to_tick
+
+    if to_tick < from_tick:
+        raise ValueError("to_tick must be >= from_tick")
+
+    series = signal_rollup_series(db, signal.id, from_tick, to_tick, max_points)
+    return {"signal_code": signal_code, "from_tick": from_tick, "to_tick": to_tick, **series}
+
+
+def component_timestamps(db: Session, component_code: str, ticks: np.ndarray) -> np.ndarray:
+    """
+    Timestamp of every tick in `ticks` (ascending) for one component,
+    -1 where unknown. One range query, whatever the number of ticks.
+    """
+    out = np.full(len(ticks), -1, dtype=np.int64)
+    if not len(ticks):
+        return out
+
+    rows = db.execute(
+        text("""
+            SELECT DISTINCT ON (tick) tick, timestamp
+            FROM timeseries_points
+            WHERE component_code = :component_code
+              AND tick BETWEEN :lo AND :hi
+            ORDER BY tick
+        """),
+        {"component_code": component_code, "lo": int(ticks[0]), "hi": int(ticks[-1])},
+    ).fetchall()
+    if not rows:
+        return out
+
+    known = np.fromiter((r.tick for r in rows), dtype=np.int64, count=len(rows))
+    stamps = np.fromiter((r.timestamp for r in rows), dtype=np.int64, count=len(rows))
+
+    pos = np.minimum(np.searchsorted(known, ticks), len(known) - 1)
+    hit = known[pos] == ticks
+    out[hit] = stamps[pos[hit]]
+    return out
+
+
+def _extract_series(db, component_code, column_name, limit=30):
+    rows = fetch_signal_points(db, component_code, column_name, limit=limit)
+    return [r.value for r in rows if r.value is not None]
 
 
 # ---------- VOLATILITY ----------
@@ -156,59 +268,209 @@ def global_health(db: Session):
     }
 
 
-def multi_signal(db, signal_codes):
-    result = {}
+def multi_signal_columns(
+    db: Session,
+    signal_codes: List[str],
+    from_tick: Optional[int] = None,
+    to_tick: Optional[int] = None,
+    max_points: Optional[int] = None,
+    method: str = "lttb",
+    align: bool = False,
+) -> Tuple[Dict[str, Dict[str, np.ndarray]], Dict[str, str]]:
+    """
+    Many signals planned per component: one Signal lookup for all codes,
+    then one signal_points query and one timestamp range query per
+    component (instead of one lookup + scan per signal).
+
+    Returns (series, errors). series maps code -> columns shaped like
+    timeseries_columns. With align=True every series shares one tick axis
+    (the union of all ticks, value NaN where a signal has no point),
+    downsampled once over all signals to at most max_points ticks.
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}' (expected one of {DOWNSAMPLE_METHODS})")
 
-    for code in signal_codes:
-        try:
-            result[code] = get_timeseries(
-                db=db,
-                signal_code=code.strip(),
-                from_tick=None,
-                to_tick=None,
+    codes = list(dict.fromkeys(c.strip() for c in signal_codes))
+    found = {
+        s.signal_code: s
+        for s in db.query(Signal).filter(Signal.signal_code.in_(codes)).all()
+    }
+    errors = {c: f"Unknown signal_code: {c}" for c in codes if c not in found}
+
+    by_component: Dict[str, List[Signal]] = {}
+    for code in codes:
+        if code in found:
+            by_component.setdefault(found[code].component_code, []).append(found[code])
+
+    # one (ticks, timestamps, values, present) block per component
+    blocks = []
+    for component_code, signals in by_component.items():
+        ticks, values, present = fetch_signal_matrix(db, [s.id for s in signals], from_tick, to_tick)
+        timestamps = component_timestamps(db, component_code, ticks)
+        blocks.append(([s.signal_code for s in signals], ticks, timestamps, values, present))
+
+    series: Dict[str, Dict[str, np.ndarray]] = {}
+
+    if not align:
+        for names, ticks, timestamps, values, present in blocks:
+            for k, code in enumerate(names):
+                rows = present[:, k]
+                t, ts, v = ticks[rows], timestamps[rows], values[rows, k]
+                keep = downsample_indices(t, v, max_points, method)
+                series[code] = {"tick": t[keep], "timestamp": ts[keep], "value": v[keep]}
+    else:
+        axis = (
+            np.unique(np.concatenate([b[1] for b in blocks]))
+            if blocks else np.empty(0, dtype=np.int64)
+        )
+        stamps = np.full(len(axis), -1, dtype=np.int64)
+        aligned: Dict[str, np.ndarray] = {}
+
+        for names, ticks, timestamps, values, present in blocks:
+            pos = np.searchsorted(axis, ticks)
+            stamps[pos] = np.where(stamps[pos] < 0, timestamps, stamps[pos])
+            for k, code in enumerate(names):
+                col = np.full(len(axis), np.nan)
+                col[pos] = values[:, k]
+                aligned[code] = col
+
+        if max_points and len(axis) > max_points and aligned:
+            # one pass over all columns together, so the shared axis keeps
+            # at most max_points ticks
+            keep = downsample_indices(
+                axis, np.column_stack(list(aligned.values())), max_points, method
             )
-        except Exception as e:
-            result[code] = {"error": str(e)}
+            axis, stamps = axis[keep], stamps[keep]
+            aligned = {code: col[keep] for code, col in aligned.items()}
+
+        for code, col in aligned.items():
+            series[code] = {"tick": axis, "timestamp": stamps, "value": col}
 
+    # requested order
+    return {c: series[c] for c in codes if c in series}, errors
+
+
+def multi_signal(
+    db,
+    signal_codes,
+    max_points: Optional[int] = None,
+    method: str = "lttb",
+    from_tick: Optional[int] = None,
+    to_tick: Optional[int] = None,
+    align: bool = False,
+):
+    series, errors = multi_signal_columns(
+        db, signal_codes, from_tick, to_tick, max_points, method, align
+    )
+
+    if align:
+        first = next(iter(series.values()), None)
+        return {
+            "tick": first["tick"].tolist() if first else [],
+            "timestamp": (
+                [None if ts < 0 else ts for ts in first["timestamp"].tolist()] if first else []
+            ),
+            "values": {
+                code: [None if math.isnan(v) else v for v in columns["value"].tolist()]
+                for code, columns in series.items()
+            },
+            "errors": errors,
+        }
+
+    result = {code: columns_to_points(columns) for code, columns in series.items()}
+    result.update({code: {"error": message} for code, message in errors.items()})
     return result
 
 
-def aggregate_signal(db, signal_code: str, window: int = 10, agg_type: str = "avg"):
-    points = get_timeseries(db, signal_code, None, None)
+AGGREGATIONS = ("avg", "min", "max", "sum")
 
-    if not points:
+
+def _first_value_ticks(db: Session, signal_id: int, starts: np.ndarray, window: int) -> np.ndarray:
+    """
+    First tick with a non-NULL value in each bucket [start, start + window)
+    of `starts` (all non-empty): one index probe per bucket.
+    """
+    if not len(starts):
+        return np.empty(0, dtype=np.int64)
+
+    rows = db.execute(
+        text("""
+            SELECT b.start, f.tick
+            FROM unnest(CAST(:starts AS BIGINT[])) AS b(start)
+            JOIN LATERAL (
+                SELECT tick
+                FROM signal_points
+                WHERE signal_id = :signal_id
+                  AND tick >= b.start AND tick < b.start + :window
+                  AND value IS NOT NULL
+                ORDER BY tick
+                LIMIT 1
+            ) f ON true
+        """),
+        {"starts": [int(t) for t in starts], "signal_id": signal_id, "window": window},
+    ).fetchall()
+
+    first = {r.start: r.tick for r in rows}
+    return np.fromiter((first.get(int(t), int(t)) for t in starts), dtype=np.int64, count=len(starts))
+
+
+def aggregate_signal(
+    db,
+    signal_code: str,
+    window: int = 10,
+    agg_type: str = "avg",
+    max_points: Optional[int] = None,
+    method: str = "lttb",
+):
+    """
+    One point per bucket of `window` ticks ([k * window, (k + 1) * window),
+    NULL values skipped), read from the signal_rollups pyramid whenever one
+    of its levels tiles the buckets and from signal_points otherwise. Each
+    point carries the tick / timestamp of its bucket's first stored value.
+    """
+    if agg_type not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation type: {agg_type}")
+    if window < 1:
+        raise ValueError("window must be >= 1")
+
+    signal = (
+        db.query(Signal)
+        .filter(Signal.signal_code == signal_code)
+        .one_or_none()
+    )
+    if not signal:
+        raise ValueError(f"Unknown signal_code: {signal_code}")
+
+    first, last = db.execute(
+        text("SELECT min(tick), max(tick) FROM signal_points WHERE signal_id = :signal_id"),
+        {"signal_id": signal.id},
+    ).one()
+    if first is None:
         return []
 
-    result = []
+    start = first - first % window
+    moments = bucket_moments(db, [signal.id], start, window, (last - start) // window + 1)
 
-    for i in range(0, len(points), window):
-        chunk = points[i:i + window]
-        if not chunk:
-            continue
+    n = moments["n"][:, 0]
+    filled = n > 0
+    if agg_type == "avg":
+        values = moments["sum"][:, 0][filled] / n[filled]
+    elif agg_type == "min":
+        values = moments["min"][:, 0][filled]
+    elif agg_type == "max":
+        values = moments["max"][:, 0][filled]
+    else:
+        values = moments["sum"][:, 0][filled]
 
-        values = [p["value"] for p in chunk]
-
-        if agg_type == "avg":
-            agg_value = sum(values) / len(values)
-        elif agg_type == "min":
-            agg_value = min(values)
-        elif agg_type == "max":
-            agg_value = max(values)
-        elif agg_type == "sum":
-            agg_value = sum(values)
-        else:
-            raise ValueError(f"Unknown aggregation type: {agg_type}")
-
-        result.append({
-            "tick": chunk[0]["tick"],
-            "timestamp": chunk[0]["timestamp"],
-            "value": agg_value
-        })
+    # stamped like the raw chunks were: the bucket's first stored value
+    ticks = _first_value_ticks(db, signal.id, moments["start"][filled], window)
+    timestamps = component_timestamps(db, signal.component_code, ticks)
 
-    return result
+    result = columns_to_points({"tick": ticks, "timestamp": timestamps, "value": values})
+    return downsample_points(result, max_points, method)
 
 
-def derivative_signal(db, signal_code: str):
+def derivative_signal(db, signal_code: str, max_points: Optional[int] = None, method: str = "lttb"):
     signal_code = signal_code.strip()
     points = get_timeseries(db, signal_code, None, None)
 
@@ -226,10 +488,10 @@ def derivative_signal(db, signal_code: str):
         })
         prev = curr
 
-    return derivatives
+    return downsample_points(derivatives, max_points, method)
 
 
-def normalize_signal(db, signal_code: str):
+def normalize_signal(db, signal_code: str, max_points: Optional[int] = None, method: str = "lttb"):
     signal_code = signal_code.strip()
     points = get_timeseries(db, signal_code, None, None)
 
@@ -241,14 +503,18 @@ def normalize_signal(db, signal_code: str):
     max_v = max(values)
 
     if max_v == min_v:
-        return [
-            {
-                "tick": p["tick"],
-                "timestamp": p["timestamp"],
-                "value": 0.0
-            }
-            for p in points
-        ]
+        return downsample_points(
+            [
+                {
+                    "tick": p["tick"],
+                    "timestamp": p["timestamp"],
+                    "value": 0.0
+                }
+                for p in points
+            ],
+            max_points,
+            method,
+        )
 
     normalized = []
     for p in points:
@@ -258,4 +524,4 @@ def normalize_signal(db, signal_code: str):
             "value": (p["value"] - min_v) / (max_v - min_v)
         })
 
-    return normalized
+    return downsample_points(normalized, max_points, method)
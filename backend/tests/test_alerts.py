@@ -0,0 +1,250 @@
+import numpy as np
+import pytest
+
+from app.db.models.alerts import AlertEvent, AlertRule, AlertRuleState
+from app.services.alert_engine import OPERATORS, fold_rule_matrix
+from app.services.alert_replay_service import replay_intervals
+from app.services.alert_service import _adopt_open_event
+
+
+# ---------- tick-by-tick reference ----------
+def reference_episodes(ticks, values, present, rule_cols, operators, thresholds, durations):
+    """
+    The streaming streak machine, one row at a time. Returns per rule the
+    list of episodes {tick_start, tick_end, peak, closed} in tick order.
+    """
+    episodes = []
+    for r, col in enumerate(rule_cols):
+        op = OPERATORS[operators[r]]
+        streak, start, peak, current = 0, None, None, None
+        found = []
+        for t, v, p in zip(ticks, values[:, col], present[:, col]):
+            if not p:
+                continue
+            if not np.isnan(v) and op(v, thresholds[r]):
+                streak += 1
+                start, peak = (t, v) if streak == 1 else (start, max(peak, v))
+                if current is not None:
+                    current.update(tick_end=int(t), peak=float(peak))
+                elif streak >= durations[r]:
+                    current = {"tick_start": int(start), "tick_end": int(t), "peak": float(peak), "closed": False}
+                    found.append(current)
+            else:
+                streak = 0
+                if current is not None:
+                    current["closed"] = True
+                    current = None
+        episodes.append(found)
+    return episodes
+
+
+def make_data(seed, n_ticks=700, n_signals=3):
+    rng = np.random.default_rng(seed)
+    ticks = np.sort(rng.choice(np.arange(5, 1200), size=n_ticks, replace=False)).astype(np.int64)
+    values = np.cumsum(rng.normal(size=(n_ticks, n_signals)), axis=0) * 0.5
+    values[rng.random(values.shape) < 0.04] = np.nan
+    present = rng.random(values.shape) < 0.85
+    values[~present] = np.nan
+    return ticks, values, present
+
+
+RULES = dict(
+    rule_cols=np.array([0, 0, 1, 2]),
+    operators=["gt", "lt", "gte", "gt"],
+    thresholds=np.array([0.5, -0.5, 0.0, 1.0]),
+    durations=np.array([3, 1, 5, 2]),
+)
+
+
+def fetcher(ticks, values, present):
+    def fetch(lo, hi):
+        rows = (ticks >= lo) & (ticks <= hi)
+        return ticks[rows], values[rows], present[rows]
+    return fetch
+
+
+# ---------- replay ----------
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("chunk_ticks", [13, 100, 5000])
+@pytest.mark.parametrize("window", [(300, 500), (0, 1199), (640, 650), (1100, None)])
+def test_partial_replay_matches_full_evaluation(seed, chunk_ticks, window):
+    ticks, values, present = make_data(seed)
+    from_tick, to_tick = window
+    end_tick = int(ticks[-1]) if to_tick is None else to_tick
+    before = ticks[ticks < from_tick]
+
+    result = replay_intervals(
+        fetcher(ticks, values, present),
+        **RULES,
+        from_tick=from_tick,
+        end_tick=end_tick,
+        first_stored=int(before[0]) if len(before) else None,
+        last_stored=int(ticks[-1]),
+        chunk_ticks=chunk_ticks,
+    )
+
+    full = reference_episodes(ticks, values, present, **RULES)
+    for r, episodes in enumerate(full):
+        # every episode overlapping the window, in full
+        overlapping = [
+            e for e in episodes
+            if e["tick_start"] <= end_tick and (e["tick_end"] >= from_tick or not e["closed"])
+        ]
+        expected_closed = [(e["tick_start"], e["tick_end"], e["peak"]) for e in overlapping if e["closed"]]
+        expected_open = [(e["tick_start"], e["tick_end"], e["peak"]) for e in overlapping if not e["closed"]]
+
+        got_closed = [(c["tick_start"], c["tick_end"], c["peak"]) for c in result["closed"] if c["rule"] == r]
+        running = result["running"][r]
+        got_open = [] if running is None else [(running["tick_start"], running["tick_end"], running["peak"])]
+
+        assert got_closed == pytest.approx(expected_closed)
+        assert got_open == pytest.approx(expected_open)
+
+        # the rebuilt span covers every rebuilt interval
+        assert all(e[1] <= result["scan_end"][r] for e in expected_closed)
+
+
+def test_interval_running_across_from_tick_keeps_its_start():
+    ticks = np.arange(0, 40, dtype=np.int64)
+    values = np.zeros((40, 1))
+    values[10:30, 0] = 5.0
+    present = np.ones((40, 1), dtype=bool)
+    rules = dict(rule_cols=np.array([0]), operators=["gt"], thresholds=np.array([1.0]), durations=np.array([3]))
+
+    result = replay_intervals(
+        fetcher(ticks, values, present), **rules,
+        from_tick=20, end_tick=25, first_stored=0, last_stored=39, chunk_ticks=4,
+    )
+
+    assert [(c["tick_start"], c["tick_end"]) for c in result["closed"]] == [(10, 29)]
+    assert result["scan_end"][0] == 29
+
+
+# ---------- fold ----------
+def fold_in_chunks(ticks, values, present, rules, splits, start_ticks=None, state=None, current=None):
+    """
+    Drive fold_rule_matrix over row ranges cut at `splits`, collecting
+    episodes the way evaluate_alerts does (adopted ones update the
+    episode they continue).
+    """
+    R = len(rules["rule_cols"])
+    streak, streak_start, peak, is_open = state or (
+        np.zeros(R, dtype=np.int64), np.full(R, np.nan), np.full(R, np.nan), np.zeros(R, dtype=bool),
+    )
+    if start_ticks is None:
+        start_ticks = np.full(R, ticks[0] if len(ticks) else 0, dtype=np.int64)
+    current = list(current or [None] * R)
+    episodes = [[] for _ in range(R)]
+
+    bounds = [0, *splits, len(ticks)]
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        out = fold_rule_matrix(
+            ticks[lo:hi], values[lo:hi], present[lo:hi],
+            rules["rule_cols"], rules["operators"], rules["thresholds"], rules["durations"],
+            start_ticks, streak, streak_start, peak, is_open,
+        )
+        for ep in out["episodes"]:
+            i = ep["rule"]
+            if ep["adopted"]:
+                episode = current[i]
+                if ep["tick_end"] is not None:
+                    episode["tick_end"] = ep["tick_end"]
+                    episode["peak"] = max(episode["peak"], ep["peak"])
+            else:
+                episode = {"tick_start": ep["tick_start"], "tick_end": ep["tick_end"], "peak": ep["peak"], "closed": False}
+                episodes[i].append(episode)
+            if ep["closed"]:
+                episode["closed"] = True
+                current[i] = None
+            else:
+                current[i] = episode
+        streak, streak_start, peak, is_open = out["streak"], out["streak_start"], out["peak"], out["is_open"]
+
+    return episodes, (streak, streak_start, peak, is_open)
+
+
+def _as_tuples(episodes):
+    return [[(e["tick_start"], e["tick_end"], e["peak"], e["closed"]) for e in eps] for eps in episodes]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+@pytest.mark.parametrize("n_chunks", [1, 2, 7, 50])
+def test_fold_matches_tick_by_tick_reference_across_chunks(seed, n_chunks):
+    ticks, values, present = make_data(seed)
+    rng = np.random.default_rng(seed + 100)
+    splits = sorted(rng.choice(np.arange(1, len(ticks)), size=n_chunks - 1, replace=False).tolist())
+
+    got, (streak, _, _, is_open) = fold_in_chunks(ticks, values, present, RULES, splits)
+    expected = reference_episodes(ticks, values, present, **RULES)
+
+    assert _as_tuples(got) == _as_tuples(expected)
+    assert [bool(eps and not eps[-1]["closed"]) for eps in expected] == is_open.tolist()
+
+
+def test_first_non_violating_tick_closes_and_missing_rows_do_not():
+    ticks = np.arange(10, dtype=np.int64)
+    values = np.array([[0, 5, 6, 7, 9, 8, 1, 5, 5, 5]], dtype=float).T
+    present = np.ones((10, 1), dtype=bool)
+    present[4, 0] = False  # a gap inside the run
+    values[4, 0] = np.nan
+    rules = dict(rule_cols=np.array([0]), operators=["gt"], thresholds=np.array([4.0]), durations=np.array([2]))
+
+    got, _ = fold_in_chunks(ticks, values, present, rules, [3])
+
+    assert _as_tuples(got) == [[(1, 5, 8.0, True), (7, 9, 5.0, False)]]
+
+
+def _stored_open_event(ticks, values, present, r, episode, midway):
+    """
+    The episode as evaluate_alerts had stored it (OPEN) after some tick t
+    inside it: still extending later when `midway`, else at its tick_end.
+    """
+    for t in ticks[(ticks > episode["tick_start"]) & (ticks <= episode["tick_end"])]:
+        before = ticks <= t
+        eps = reference_episodes(ticks[before], values[before], present[before], **RULES)[r]
+        if eps and not eps[-1]["closed"] and eps[-1]["tick_start"] == episode["tick_start"]:
+            if (eps[-1]["tick_end"] < episode["tick_end"]) == midway:
+                return eps[-1]
+    return None
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+@pytest.mark.parametrize("midway", [True, False])
+def test_adopted_open_event_resumes_after_its_tick_end(seed, midway):
+    ticks, values, present = make_data(seed)
+    full = reference_episodes(ticks, values, present, **RULES)
+
+    r, episode, stored = next(
+        (r, e, stored) for r, eps in enumerate(full) for e in eps
+        if e["closed"]
+        for stored in [_stored_open_event(ticks, values, present, r, e, midway)]
+        if stored is not None
+    )
+
+    # a rule without state adopts its OPEN event
+    rule = AlertRule(id=1, min_duration_ticks=int(RULES["durations"][r]))
+    event = AlertEvent(id=10, tick_start=stored["tick_start"], tick_end=stored["tick_end"], peak_value=stored["peak"])
+    state = AlertRuleState(rule_id=1, origin="REAL", streak=0)
+    _adopt_open_event(state, rule, event)
+    assert state.open_event_id == 10 and state.last_tick == stored["tick_end"]
+
+    adopted = {"tick_start": event.tick_start, "tick_end": event.tick_end, "peak": event.peak_value, "closed": False}
+    one = {key: (v[[r]] if key != "operators" else [v[r]]) for key, v in RULES.items()}
+    after = ticks > state.last_tick
+    got, _ = fold_in_chunks(
+        ticks[after], values[after], present[after], one, [3, 40],
+        start_ticks=np.array([state.last_tick + 1]),
+        state=(
+            np.array([state.streak]), np.array([float(state.streak_start_tick)]),
+            np.array([state.peak_value]), np.array([True]),
+        ),
+        current=[adopted],
+    )
+
+    # the adopted event extends and closes exactly like the reference episode,
+    # and nothing it already covers is re-created
+    assert (adopted["tick_end"], adopted["peak"], adopted["closed"]) == (
+        episode["tick_end"], pytest.approx(episode["peak"]), True,
+    )
+    later = [e for e in full[r] if e["tick_start"] > episode["tick_end"]]
+    assert _as_tuples(got) == _as_tuples([later])
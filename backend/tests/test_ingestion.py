@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import ingest
+from app.ingestion.csv_loader import FLOAT_DIGITS, _payload_frame, _signal_points_frame
+from app.ingestion.live_writer import parse_tick_batch
+
+VALUES = [0.1 + 0.2, 1 / 3, 2 ** -1074, 1.7976931348623157e308, -0.0, 123456789.12345679, np.nan]
+
+
+def _chunk():
+    return pd.DataFrame({
+        "tick": np.arange(len(VALUES)),
+        "timestamp": np.arange(len(VALUES)) * 1000,
+        "cpu": VALUES,
+        "count": np.arange(len(VALUES)),
+    })
+
+
+def _copy_text(frame):
+    # what _copy_csv hands to COPY ... FROM STDIN
+    buf = io.StringIO()
+    frame.to_csv(buf, header=False, index=False, na_rep="", float_format=f"%.{FLOAT_DIGITS}g")
+    return list(csv.reader(io.StringIO(buf.getvalue())))
+
+
+def test_payload_json_round_trips_every_float():
+    payloads = _payload_frame(_chunk(), "C1", ["cpu", "count"])
+
+    for row, value in zip(_copy_text(payloads), VALUES):
+        decoded = json.loads(row[3])
+        if np.isnan(value):
+            assert decoded["cpu"] is None
+        else:
+            assert decoded["cpu"] == value
+        assert isinstance(decoded["count"], int)
+
+
+def test_signal_point_values_round_trip_through_copy():
+    points = _signal_points_frame(_chunk(), {"cpu": 7})
+
+    for row, value in zip(_copy_text(points), VALUES):
+        assert row[0] == "7"
+        if np.isnan(value):
+            assert row[2] == ""
+        else:
+            assert float(row[2]) == value
+
+
+# ---------- live ingest ----------
+def test_records_without_component_code_are_rejected():
+    body = (
+        b'{"component_code": "C1", "tick": 1, "timestamp": 10, "cpu": 0.5}\n'
+        b'{"tick": 2, "timestamp": 20, "cpu": 0.7}\n'
+    )
+    with pytest.raises(ValueError, match="Record 1: missing component_code"):
+        parse_tick_batch(body, "application/x-ndjson")
+
+
+def test_ingest_endpoint_answers_400_for_unattributed_records():
+    app = FastAPI()
+    app.include_router(ingest.router)
+
+    response = TestClient(app).post(
+        "/api/ingest/ticks",
+        json=[{"component_code": "", "tick": 1, "timestamp": 10, "cpu": 0.5}],
+    )
+
+    assert response.status_code == 400
+    assert "component_code" in response.json()["detail"]
@@ -0,0 +1,194 @@
+# Outbox dispatcher against an in-process SMTP server (aiosmtpd).
+#
+# The outbox table is played by a small stub session that applies the
+# dispatcher's claim / sent / failed statements to in-memory rows, so the
+# test needs no database; everything on the SMTP side is real.
+import socket
+import time
+from email import message_from_bytes, policy
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller
+
+from app.core.config import settings
+from app.services import notification_dispatcher as nd
+
+
+class OutboxStub:
+    def __init__(self):
+        self.rows = {}
+
+    # ---- session API used by enqueue_email / dispatch_due ----
+    def add(self, row):
+        row.id = len(self.rows) + 1
+        self.rows[row.id] = {
+            "id": row.id,
+            "kind": row.kind,
+            "recipient": row.recipient,
+            "subject": row.subject,
+            "body_text": row.body_text,
+            "body_html": row.body_html,
+            "status": "PENDING",
+            "attempts": 0,
+            "last_error": None,
+            "next_attempt_at": 0.0,
+        }
+
+    def execute(self, stmt, params=None):
+        sql = str(stmt)
+        params = params or {}
+
+        if "FOR UPDATE SKIP LOCKED" in sql:
+            due = [
+                SimpleNamespace(**r)
+                for r in sorted(self.rows.values(), key=lambda r: r["id"])
+                if r["status"] == "PENDING" and r["next_attempt_at"] <= time.time()
+            ]
+            return SimpleNamespace(fetchall=lambda: due[: params["limit"]])
+
+        if "SET status = 'SENT'" in sql:
+            for i in params["ids"]:
+                self.rows[i].update(status="SENT", attempts=self.rows[i]["attempts"] + 1, last_error=None)
+        elif "last_error = :error" in sql:
+            for i in params["ids"]:
+                r = self.rows[i]
+                r["next_attempt_at"] = time.time() + params["backoff"] * 2 ** r["attempts"]
+                r["attempts"] += 1
+                r["last_error"] = params["error"]
+                r["status"] = "FAILED" if r["attempts"] >= params["max_attempts"] else "PENDING"
+        else:
+            raise AssertionError(f"unexpected statement: {sql}")
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class Recorder:
+    """
+    Keeps every delivered message; a recipient in `refuse` gets a 451 on
+    RCPT as many times as its count says.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+        self.refuse = {}
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if self.refuse.get(address, 0) > 0:
+            self.refuse[address] -= 1
+            return "451 4.3.0 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        message = message_from_bytes(envelope.content, policy=policy.default)
+        self.messages.append((list(envelope.rcpt_tos), message))
+        return "250 Message accepted"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    recorder = Recorder()
+    controller = Controller(recorder, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", controller.port)
+    monkeypatch.setattr(settings, "NOTIFY_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(settings, "NOTIFY_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "NOTIFY_BATCH_SIZE", 100)
+
+    yield recorder
+    controller.stop()
+
+
+def _enqueue(db, kind, recipient, subject):
+    nd.enqueue_email(db, kind, recipient, subject, f"body of {subject}", f"<p>{subject}</p>")
+
+
+def test_burst_is_batched_into_digests_over_one_connection(smtp):
+    db = OutboxStub()
+    for k in range(3):
+        _enqueue(db, "alert_summary", "admin@test", f"alert {k}")
+    _enqueue(db, "incident_report", "admin@test", "incident 1")
+    _enqueue(db, "alert_summary", "ops@test", "alert ops")
+
+    stats = nd.dispatch_due(db)
+
+    assert stats == {"claimed": 5, "sent_messages": 3, "digests": 1, "sent_rows": 5, "failed_rows": 0}
+    assert len(smtp.sessions) == 1
+    assert all(r["status"] == "SENT" for r in db.rows.values())
+
+    subjects = {(rcpt[0], msg["Subject"]) for rcpt, msg in smtp.messages}
+    assert ("admin@test", "incident 1") in subjects
+    assert ("ops@test", "alert ops") in subjects
+
+    digest = next(msg for _, msg in smtp.messages if msg["Subject"].startswith("[DIGEST]"))
+    assert digest["Subject"].startswith("[DIGEST] 3 ")
+    text = digest.get_body(preferencelist=("plain",)).get_content()
+    assert all(f"alert {k}" in text for k in range(3))
+
+
+def test_failed_send_is_retried_on_the_next_run(smtp):
+    smtp.refuse["ops@test"] = 1
+
+    db = OutboxStub()
+    _enqueue(db, "alert_summary", "admin@test", "alert a")
+    _enqueue(db, "alert_summary", "ops@test", "alert b")
+
+    first = nd.dispatch_due(db)
+    assert first["sent_rows"] == 1 and first["failed_rows"] == 1
+
+    ops = db.rows[2]
+    assert ops["status"] == "PENDING"
+    assert ops["attempts"] == 1
+    assert "451" in ops["last_error"]
+
+    second = nd.dispatch_due(db)
+    assert second["claimed"] == 1 and second["sent_rows"] == 1
+    assert ops["status"] == "SENT" and ops["attempts"] == 2
+    assert [rcpt for rcpt, _ in smtp.messages] == [["admin@test"], ["ops@test"]]
+
+
+def test_row_is_parked_after_max_attempts(smtp):
+    smtp.refuse["ops@test"] = 10
+
+    db = OutboxStub()
+    _enqueue(db, "alert_summary", "ops@test", "alert c")
+
+    nd.dispatch_due(db)
+    nd.dispatch_due(db)
+    assert db.rows[1]["status"] == "FAILED"
+
+    assert nd.dispatch_due(db)["claimed"] == 0
+    assert smtp.messages == []
+
+
+def test_failures_back_off_exponentially(smtp, monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFY_BACKOFF_SECONDS", 60)
+    monkeypatch.setattr(settings, "NOTIFY_MAX_ATTEMPTS", 5)
+    smtp.refuse["ops@test"] = 1
+
+    db = OutboxStub()
+    _enqueue(db, "alert_summary", "ops@test", "alert d")
+
+    nd.dispatch_due(db)
+    assert db.rows[1]["next_attempt_at"] > time.time() + 30
+
+    # not due yet: nothing claimed, nothing sent
+    assert nd.dispatch_due(db)["claimed"] == 0
+    assert smtp.messages == []
@@ -0,0 +1,93 @@
+# Regression benchmark: the component-wide views must issue a constant
+# number of statements whatever the number of components (no per-component
+# query creeping back into a loop).
+#
+# A stub session stands in for the database: it counts every statement
+# that would reach it (text() executes and terminal Query calls) and
+# answers with rows shaped like the real ones.
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.system import system_overview
+from app.db.models.alerts import AlertEvent
+from app.db.models.signals import Signal
+from app.services.analytics_service import component_rankings
+
+
+class CountingQuery:
+    def __init__(self, db, entities):
+        self.db = db
+        self.entities = entities
+
+    def distinct(self, *args):
+        return self
+
+    def filter(self, *args):
+        return self
+
+    def group_by(self, *args):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def all(self):
+        self.db.statements += 1
+        first = self.entities[0]
+        if first is Signal.component_code:
+            return [(c,) for c in self.db.components]
+        if first is AlertEvent.component_code:
+            # (component_code, total, open, critical_open, warning_open)
+            return [(c, 3, 2, 1, 1) for c in self.db.components[::2]]
+        raise AssertionError(f"unexpected query: {self.entities}")
+
+
+class CountingSession:
+    def __init__(self, n_components):
+        self.components = [f"C{i:03d}" for i in range(n_components)]
+        self.statements = 0
+
+    def query(self, *entities):
+        return CountingQuery(self, entities)
+
+    def execute(self, stmt, params=None):
+        self.statements += 1
+        sql = str(stmt)
+        if "component_health_snapshots" in sql:
+            rows = [
+                SimpleNamespace(component_code=c, health=30.0 + i % 70)
+                for i, c in enumerate(params["components"])
+            ]
+            return SimpleNamespace(fetchall=lambda: rows)
+        raise AssertionError(f"unexpected statement: {sql}")
+
+
+def _statements(view, n_components):
+    db = CountingSession(n_components)
+    view(db)
+    return db.statements
+
+
+@pytest.mark.parametrize(
+    "view",
+    [component_rankings, system_overview],
+    ids=["component_rankings", "system_overview"],
+)
+def test_statement_count_does_not_grow_with_components(view):
+    small = _statements(view, 3)
+    large = _statements(view, 300)
+
+    assert small == large
+    assert small <= 3
+
+
+def test_results_cover_every_component():
+    db = CountingSession(300)
+    overview = system_overview(db)
+    assert len(overview) == 300
+    assert {o["status"] for o in overview} == {"CRITICAL", "DEGRADED", "OK"}
+
+    ranked = component_rankings(CountingSession(300), limit=5)["ranked"]
+    assert len(ranked) == 5
+    assert ranked[0]["risk_score"] >= ranked[-1]["risk_score"]
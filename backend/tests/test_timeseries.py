@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from app.observability.downsample import downsample_indices
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_aligned_columns_share_one_bounded_axis(method):
+    rng = np.random.default_rng(0)
+    n = 5000
+    ticks = np.arange(n)
+    columns = np.column_stack([
+        rng.normal(size=n).cumsum(),
+        1000 * rng.normal(size=n),
+        np.full(n, np.nan),
+    ])
+    columns[rng.random(columns.shape) < 0.3] = np.nan
+
+    keep = downsample_indices(ticks, columns, 200, method)
+
+    assert len(keep) <= 200
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert np.all(np.diff(keep) > 0)
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_small_range_column_is_not_drowned_out(method):
+    rng = np.random.default_rng(1)
+    n = 5000
+    columns = np.column_stack([1000 * rng.normal(size=n), np.zeros(n)])
+    columns[2500, 1] = 1.0
+
+    assert 2500 in downsample_indices(np.arange(n), columns, 200, method)
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_single_column_matches_one_dimensional_picks(method):
+    rng = np.random.default_rng(2)
+    ticks = np.arange(1000)
+    values = rng.normal(size=1000).cumsum()
+
+    one = downsample_indices(ticks, values, 100, method)
+    two = downsample_indices(ticks, values[:, None], 100, method)
+
+    assert np.array_equal(one, two)